@@ -0,0 +1,333 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains custom filters for use in Ansible playbooks. Unlike the
+parsers in filter.py, these filters validate the structured data produced
+by the parsers against the user's specification, checking an entire list
+of neighbors, interfaces, or areas in a single call.
+https://www.ansible.com/
+"""
+
+import os
+import sys
+
+# Area ID normalization shared with the nots_results module, which Ansible
+# can only ship with a module from the module_utils directory
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../module_utils"))
+# pylint: disable=import-error,wrong-import-position
+from nots_areas import int_area_id
+
+# LSA counts which every router in an area must agree on, since each has a
+# copy of the same area LSDB; summary LSA counts differ between ABRs
+LSDB_KEYS = ("num_lsa1", "num_lsa2", "num_lsa7")
+
+
+class FilterModule(object):
+    """
+    Defines a filter module object.
+    """
+
+    @staticmethod
+    def filters():
+        """
+        Return a list of hashes where the key is the filter
+        name exposed to playbooks and the value is the function.
+        """
+        return {
+            "check_bfd_nbrs": FilterModule.check_bfd_nbrs,
+            "check_traffic": FilterModule.check_traffic,
+            "check_areas": FilterModule.check_areas,
+            "check_dup_rids": FilterModule.check_dup_rids,
+            "check_adjacencies": FilterModule.check_adjacencies,
+            "check_lsdb": FilterModule.check_lsdb,
+        }
+
+    @staticmethod
+    def check_bfd_nbrs(bfd_nbr_list, ospf_nbr_list):
+        """
+        Used to check every OSPF neighbor (list of dictionaries returned from
+        ios_ospf_neighbor function) against the BFD neighbor list in a single
+        call. Like check_bfd_up, this compares the OSPF neighbor interface IP
+        against the BFD peer IP. The BFD neighbors are indexed by peer IP once
+        so each lookup is constant time, rather than searching the BFD list
+        for every OSPF neighbor. Returns a dictionary with two lists of peer
+        IPs: "missing" (OSPF neighbors without a BFD session) and "down"
+        (BFD sessions which are not up locally and remotely). Both lists are
+        empty when all OSPF neighbors have a working BFD session.
+        """
+
+        bfd_index = {bfd_nbr["peer"]: bfd_nbr for bfd_nbr in bfd_nbr_list}
+        return_dict = {"missing": [], "down": []}
+        for ospf_nbr in ospf_nbr_list:
+            bfd_nbr = bfd_index.get(ospf_nbr["peer"])
+            if not bfd_nbr:
+                return_dict["missing"].append(ospf_nbr["peer"])
+            elif not (bfd_nbr["state"] == "up" and bfd_nbr["rhrs"] == "up"):
+                return_dict["down"].append(ospf_nbr["peer"])
+
+        return return_dict
+
+    @staticmethod
+    def check_traffic(traffic_list, stats):
+        """
+        Used to check every OSPF traffic counter on every interface (or
+        process on NX-OS) against the error thresholds in a single call.
+        The traffic_list is the output from any of the *_ospf_traffic
+        functions and stats is the "process.stats" dictionary mapping each
+        counter name to its inclusive upper bound. Counters not present in
+        stats are not checked, and thresholds for counters not present in
+        the traffic output are skipped, since not every platform reports
+        every counter. Returns a list of violations, each identified by "intf" or "pid",
+        which is empty when all counters are within their thresholds.
+        """
+
+        violations = []
+        for traffic in traffic_list:
+            name_key = "intf" if "intf" in traffic else "pid"
+            for counter, limit in sorted(stats.items()):
+                if counter in traffic and traffic[counter] > int(limit):
+                    violation = {
+                        name_key: traffic[name_key],
+                        "counter": counter,
+                        "value": traffic[counter],
+                        "limit": int(limit),
+                    }
+                    violations.append(violation)
+
+        return violations
+
+    @staticmethod
+    def _check_area(targets, db_area, basic_area):
+        """
+        Apply every area-specific rule to one area, returning a list of
+        (check, msg) tuples for the rules which failed. The targets come
+        from the user's all_areas dictionary, while the db_area and
+        basic_area are the parsed "dbsum" and "basic" areas respectively.
+        """
+
+        area_type = basic_area["type"]
+        errors = []
+        if targets["type"].lower() != area_type:
+            errors.append(
+                ("type", "expected type {0}, saw {1}".format(targets["type"], area_type))
+            )
+
+        for target_key, lsa in [("routers", 1), ("drs", 2)]:
+            saw = db_area["num_lsa{0}".format(lsa)]
+            if target_key in targets and int(targets[target_key]) != saw:
+                msg = "expected LSA{0} {1}, saw {2}".format(lsa, targets[target_key], saw)
+                errors.append(("lsa{0}".format(lsa), msg))
+
+        if "max_lsa3" in targets and int(targets["max_lsa3"]) < db_area["num_lsa3"]:
+            msg = "too many LSA3 {0} < {1}".format(
+                targets["max_lsa3"], db_area["num_lsa3"]
+            )
+            errors.append(("lsa3", msg))
+
+        if area_type != "standard" and db_area["num_lsa4"] != 0:
+            msg = "OSPF protocol error; saw {0} LSA4 in NSSA/stub area".format(
+                db_area["num_lsa4"]
+            )
+            errors.append(("lsa4", msg))
+
+        if area_type != "nssa" and db_area["num_lsa7"] != 0:
+            msg = "OSPF protocol error; saw {0} LSA7 in non-NSSA area".format(
+                db_area["num_lsa7"]
+            )
+            errors.append(("lsa7", msg))
+
+        max_lsa7 = targets.get("max_lsa7")
+        if area_type == "nssa" and max_lsa7 is not None:
+            if int(max_lsa7) < db_area["num_lsa7"]:
+                msg = "too many LSA7 {0} < {1}".format(max_lsa7, db_area["num_lsa7"])
+                errors.append(("lsa7", msg))
+
+        return errors
+
+    @staticmethod
+    def check_areas(db_areas, basic_areas, my_areas, all_areas):
+        """
+        Used to check every area on a router against the area targets in a
+        single call. The db_areas and basic_areas are the "areas" lists from
+        the *_ospf_dbsum and *_ospf_basic functions, my_areas is the list of
+        area IDs expected on the router, and all_areas is the dictionary of
+        targets keyed by "area<id>". The parsed areas are indexed by integer
+        area ID, so their order does not matter and the dotted-decimal IDs of
+        nxos_ospf_dbsum match the integer IDs of nxos_ospf_basic. An area in
+        my_areas without targets raises a ValueError as the specification is
+        incomplete. Returns a list of violations with keys "area_id", "check",
+        and "msg" which is empty when all areas meet their targets.
+        """
+
+        db_index = {int_area_id(area["id"]): area for area in db_areas}
+        basic_index = {int_area_id(area["id"]): area for area in basic_areas}
+        violations = []
+        for area_id in my_areas:
+            area_key = "area{0}".format(area_id)
+            if area_key not in all_areas:
+                raise ValueError("{0} not in all_areas".format(area_key))
+
+            area_id = int_area_id(area_id)
+            if area_id not in db_index or area_id not in basic_index:
+                violations.append(
+                    {"area_id": area_id, "check": "exists", "msg": "area not on device"}
+                )
+                continue
+
+            errors = FilterModule._check_area(
+                all_areas[area_key], db_index[area_id], basic_index[area_id]
+            )
+            for check, msg in errors:
+                violations.append({"area_id": area_id, "check": check, "msg": msg})
+
+        return violations
+
+    @staticmethod
+    def check_dup_rids(hostvars, group):
+        """
+        Used to check for duplicate OSPF router IDs across the network. The
+        hostvars argument is the Ansible "hostvars" dictionary and group is
+        the list of hosts to check, typically "groups.ospf_routers". Hosts
+        without parsed OSPF_BASIC data are skipped. Each RID is collected
+        into a dictionary of hosts in a single pass. Returns a dictionary
+        mapping each duplicate RID to the list of hosts using it, which is
+        empty when all RIDs are unique.
+        """
+
+        rid_hosts = {}
+        for host in group:
+            basic = hostvars[host].get("OSPF_BASIC")
+            if basic:
+                rid_hosts.setdefault(basic["process"]["rid"], []).append(host)
+
+        return {rid: hosts for rid, hosts in rid_hosts.items() if len(hosts) > 1}
+
+    @staticmethod
+    def _adjacency_index(hostvars, group):
+        """
+        Return the indexes used by check_adjacencies: the RID of each host
+        with parsed data, the host of each RID, the number of adjacencies
+        from each RID to each neighbor RID, and the host which owns each
+        neighbor interface IP, when the neighbor RID is a known host.
+        """
+        host_rids = {}
+        for host in group:
+            basic = hostvars[host].get("OSPF_BASIC")
+            if basic and hostvars[host].get("OSPF_NBR") is not None:
+                host_rids[host] = basic["process"]["rid"]
+        rid_hosts = {rid: host for host, rid in host_rids.items()}
+
+        links = {}
+        ip_hosts = {}
+        for host, rid in host_rids.items():
+            for nbr in hostvars[host]["OSPF_NBR"]:
+                key = (rid, nbr["rid"])
+                links[key] = links.get(key, 0) + 1
+                if nbr["rid"] in rid_hosts:
+                    ip_hosts[nbr["peer"]] = rid_hosts[nbr["rid"]]
+
+        return host_rids, rid_hosts, links, ip_hosts
+
+    @staticmethod
+    def check_adjacencies(hostvars, group):
+        """
+        Used to check every OSPF adjacency across the network. The hostvars
+        and group arguments are the same as check_dup_rids, and hosts
+        without parsed OSPF_BASIC and OSPF_NBR data are skipped. The hosts
+        are indexed by RID, then one pass over every neighbor counts the
+        adjacencies between each pair of RIDs and indexes each neighbor
+        interface IP by the host which owns it, and a second pass checks
+        each neighbor against these. Returns a dictionary with three lists
+        of neighbors, identified by "host", "rid", "intf", and "peer":
+        "one_sided" (the neighbor is a host which does not see this host
+        as often as this host sees it), "stuck" (the state is not full, or
+        2way with a drother), and "orphan" (the RID is not any host's RID).
+        Each orphan has an "owner", the host which other routers see at
+        that interface IP, or None. All lists are empty when every
+        adjacency is up and seen from both routers.
+        """
+
+        host_rids, rid_hosts, links, ip_hosts = FilterModule._adjacency_index(
+            hostvars, group
+        )
+
+        return_dict = {"one_sided": [], "stuck": [], "orphan": []}
+        for host, rid in host_rids.items():
+            for nbr in hostvars[host]["OSPF_NBR"]:
+                state = nbr["state"].lower()
+                stuck = state != "full" and not (
+                    state == "2way" and nbr["role"].lower() == "drother"
+                )
+                orphan = nbr["rid"] not in rid_hosts
+                one_sided = (
+                    not orphan
+                    and links.get((nbr["rid"], rid), 0) < links[(rid, nbr["rid"])]
+                )
+                # Most adjacencies are fine, so only build a record when not
+                if not (stuck or orphan or one_sided):
+                    continue
+
+                adj = {
+                    "host": host,
+                    "rid": nbr["rid"],
+                    "intf": nbr["intf"],
+                    "peer": nbr["peer"],
+                }
+                if stuck:
+                    return_dict["stuck"].append(dict(adj, state=state))
+                if orphan:
+                    return_dict["orphan"].append(
+                        dict(adj, owner=ip_hosts.get(nbr["peer"]))
+                    )
+                if one_sided:
+                    return_dict["one_sided"].append(adj)
+
+        return return_dict
+
+    @staticmethod
+    def check_lsdb(hostvars, group):
+        """
+        Used to check that every router in an area has the same view of the
+        area LSDB, without area targets. The hostvars and group arguments
+        are the same as check_dup_rids, and hosts without parsed OSPF_DB
+        data are skipped. In a single pass, each host's LSA1, LSA2, and
+        LSA7 counts for each area are grouped by integer area ID, so the
+        dotted-decimal IDs of NX-OS match the integer IDs of IOS and IOS-XR,
+        and then by the counts, and each area's majority view is the one seen by the most
+        hosts. Returns a list of violations with keys "area_id", "host",
+        "saw", and "majority" for each host with another view, which may
+        be a partition or stale LSAs. When no view is seen by the most
+        hosts, "majority" is None and every host in the area is listed.
+        The list is empty when all routers in each area agree.
+        """
+
+        area_views = {}
+        for host in group:
+            db_data = hostvars[host].get("OSPF_DB")
+            for area in db_data["areas"] if db_data else []:
+                view = tuple(area[key] for key in LSDB_KEYS)
+                views = area_views.setdefault(int_area_id(area["id"]), {})
+                views.setdefault(view, []).append(host)
+
+        violations = []
+        for area_id in sorted(area_views):
+            views = area_views[area_id]
+            if len(views) == 1:
+                continue
+
+            ranked = sorted(views.items(), key=lambda item: len(item[1]), reverse=True)
+            majority = None
+            if len(ranked[0][1]) > len(ranked[1][1]):
+                majority = dict(zip(LSDB_KEYS, ranked[0][0]))
+            for view, hosts in ranked[1:] if majority else ranked:
+                for host in hosts:
+                    violation = {
+                        "area_id": area_id,
+                        "host": host,
+                        "saw": dict(zip(LSDB_KEYS, view)),
+                        "majority": majority,
+                    }
+                    violations.append(violation)
+
+        return violations
@@ -0,0 +1,281 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains custom filters for use in Ansible playbooks. These filters
+turn the cumulative OSPF traffic counters produced by the *_ospf_traffic
+parsers into timestamped snapshots, then compute the change and rate of
+each counter since the previous snapshot, so error thresholds can be
+checked without clearing the counters on the device. The traffic_*
+filters below operate on the optional columnar output of the parsers
+(columnar=true), a dictionary of NumPy arrays, so analytics across every
+interface and host are array operations instead of nested loops.
+https://www.ansible.com/
+"""
+
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Fields which identify a traffic record rather than count packets
+ID_KEYS = ("host", "intf", "pid", "area_id")
+
+
+class FilterModule(object):
+    """
+    Defines a filter module object.
+    """
+
+    @staticmethod
+    def filters():
+        """
+        Return a list of hashes where the key is the filter
+        name exposed to playbooks and the value is the function.
+        """
+        return {
+            "traffic_snapshot": FilterModule.traffic_snapshot,
+            "traffic_delta": FilterModule.traffic_delta,
+            "traffic_columns": FilterModule.traffic_columns,
+            "traffic_records": FilterModule.traffic_records,
+            "traffic_threshold": FilterModule.traffic_threshold,
+            "traffic_sum": FilterModule.traffic_sum,
+            "traffic_top": FilterModule.traffic_top,
+            "traffic_concat": FilterModule.traffic_concat,
+        }
+
+    @staticmethod
+    def traffic_snapshot(traffic_list, timestamp=None):
+        """
+        Returns a snapshot dictionary of the traffic_list (output from any of
+        the *_ospf_traffic functions) along with the UNIX timestamp at which
+        it was taken, which defaults to the current time. Snapshots are
+        stored between playbook runs so they can be compared later.
+        """
+        return {
+            "time": time.time() if timestamp is None else float(timestamp),
+            "traffic": traffic_list,
+        }
+
+    @staticmethod
+    def traffic_delta(snapshot, previous, interval=60):
+        """
+        Compares two snapshots from the traffic_snapshot function and returns
+        a list of records, one per interface (or process on NX-OS) present
+        in both, with the same keys as the traffic records. Each counter
+        holds its rate of change, which is the number of new errors every
+        interval seconds (per minute by default), and the "interval_sec" key
+        holds the time between snapshots. Both snapshots are converted to
+        columns, so every counter's rate is one array operation. A counter lower than its
+        previous value was cleared or the device reloaded, so the current
+        value is used as the change. An empty list is returned when there is
+        no previous snapshot or time has not advanced.
+        """
+        if not previous or not previous.get("traffic") or not snapshot["traffic"]:
+            return []
+
+        elapsed = snapshot["time"] - previous["time"]
+        if elapsed <= 0:
+            return []
+
+        np = FilterModule._numpy()
+        current = FilterModule.traffic_columns(snapshot["traffic"])
+        before = FilterModule.traffic_columns(previous["traffic"])
+        rows, prev_rows = FilterModule._match_rows(current, before)
+        if not rows.size:
+            return []
+
+        rates = {"interval_sec": np.full(len(rows), round(elapsed, 3))}
+        for key, column in current.items():
+            value = column[rows]
+            if key not in ID_KEYS:
+                prior = before[key][prev_rows] if key in before else np.zeros_like(value)
+                delta = np.where(value >= prior, value - prior, value)
+                value = np.round(delta * (interval / elapsed), 4)
+            rates[key] = value
+
+        return FilterModule.traffic_records(rates)
+
+    @staticmethod
+    def _match_rows(current, before):
+        """
+        Helper function which returns two arrays of row numbers, the rows of
+        the current columns whose name is also in the previous columns and
+        the matching previous rows. The previous names are indexed once so
+        each lookup is constant time.
+        """
+        np = FilterModule._numpy()
+        name_key = "intf" if "intf" in before else "pid"
+        prev_index = {name: row for row, name in enumerate(before[name_key].tolist())}
+        pairs = [
+            (row, prev_index[name])
+            for row, name in enumerate(current[name_key].tolist())
+            if name in prev_index
+        ]
+        rows = np.array([pair[0] for pair in pairs], dtype=np.int64)
+        return rows, np.array([pair[1] for pair in pairs], dtype=np.int64)
+
+    @staticmethod
+    def _numpy():
+        """
+        Helper function which returns the NumPy module, an optional
+        dependency needed only by the columnar filters.
+        """
+        if numpy is None:
+            raise ImportError("columnar mode requires numpy")
+        return numpy
+
+    @staticmethod
+    def _name_keys(columns):
+        """
+        Helper function which returns the keys identifying each row of the
+        columns: the "host" when present, then "intf" or "pid" (NX-OS).
+        """
+        keys = ["host"] if "host" in columns else []
+        return keys + ["intf" if "intf" in columns else "pid"]
+
+    @staticmethod
+    def traffic_columns(traffic_list):
+        """
+        Converts the traffic_list (output from any of the *_ospf_traffic
+        functions, or traffic_delta) into the same columnar form returned by
+        the parsers when columnar is true: a dictionary mapping each key to a
+        NumPy array holding its value from every record. Columns of integers
+        become int64 arrays, columns of rates become float64 arrays, and all
+        other columns become string arrays.
+        """
+        np = FilterModule._numpy()
+        columns = {}
+        for key in traffic_list[0] if traffic_list else []:
+            column = [traffic[key] for traffic in traffic_list]
+            if all(isinstance(value, int) for value in column):
+                columns[key] = np.array(column, dtype=np.int64)
+            elif all(isinstance(value, (int, float)) for value in column):
+                columns[key] = np.array(column, dtype=np.float64)
+            else:
+                columns[key] = np.array(column, dtype=str)
+
+        return columns
+
+    @staticmethod
+    def traffic_records(columns):
+        """
+        Converts columns back into the list of dictionaries returned by the
+        parsers by default, with plain Python values. This is needed wherever
+        plain data is required, such as before storing the records as facts.
+        """
+        lists = {key: column.tolist() for key, column in columns.items()}
+        return [dict(zip(lists, row)) for row in zip(*lists.values())]
+
+    @staticmethod
+    def traffic_threshold(columns, stats):
+        """
+        Vectorized equivalent of check_traffic for columns, returning the
+        same list of violations in the same order. All counters in stats
+        are compared against their inclusive upper bounds at once, so only
+        the violations are visited in Python. Violations also include the
+        "host" for columns from traffic_concat. Thresholds for counters not
+        present in the columns are skipped, as in check_traffic.
+        """
+        np = FilterModule._numpy()
+        counters = sorted(counter for counter in stats if counter in columns)
+        if not columns or not counters:
+            return []
+
+        limits = np.array([int(stats[counter]) for counter in counters])
+        matrix = np.column_stack([columns[counter] for counter in counters])
+        rows, cols = np.nonzero(matrix > limits)
+        names = {
+            key: columns[key][rows].tolist() for key in FilterModule._name_keys(columns)
+        }
+
+        violations = []
+        for index, (row, col) in enumerate(zip(rows.tolist(), cols.tolist())):
+            violation = {key: values[index] for key, values in names.items()}
+            violation.update(
+                {
+                    "counter": counters[col],
+                    "value": matrix[row, col].item(),
+                    "limit": limits[col].item(),
+                }
+            )
+            violations.append(violation)
+
+        return violations
+
+    @staticmethod
+    def traffic_sum(columns, counters=None):
+        """
+        Returns a dictionary mapping each counter (or only those in the
+        counters list) to its total across every row of the columns, such
+        as the number of authentication errors across the whole fleet.
+        """
+        if counters is None:
+            counters = [
+                key
+                for key, column in columns.items()
+                if key not in ID_KEYS and column.dtype.kind in "if"
+            ]
+        return {counter: columns[counter].sum().item() for counter in counters}
+
+    @staticmethod
+    def traffic_top(columns, counter, count=10):
+        """
+        Returns the count rows with the highest value of a counter, highest
+        first, as a list of dictionaries holding the identifying keys of the
+        row and its "value". Rows with equal values keep their input order.
+        Only count rows are sorted, so this is fast even for large fleets.
+        """
+        np = FilterModule._numpy()
+        column = columns.get(counter)
+        if column is None:
+            raise ValueError("{0} not in traffic counters".format(counter))
+
+        count = min(int(count), len(column))
+        if count <= 0:
+            return []
+        # Partition first so only the top candidates are sorted, with ties at
+        # the boundary resolved by the stable sort of every equal value
+        cutoff = np.partition(column, len(column) - count)[len(column) - count]
+        candidates = np.nonzero(column >= cutoff)[0]
+        rows = candidates[np.argsort(-column[candidates], kind="stable")][:count]
+
+        names = FilterModule._name_keys(columns)
+        return [
+            dict(
+                {key: columns[key][row].item() for key in names}, value=column[row].item()
+            )
+            for row in rows.tolist()
+        ]
+
+    @staticmethod
+    def traffic_concat(host_columns):
+        """
+        Concatenates the columns of many hosts, a dictionary mapping each
+        host name to its columns, into fleet-wide columns with a leading
+        "host" column. Only keys present for every host are kept, since the
+        counters differ between platforms, and hosts with no rows are
+        skipped. Empty columns are returned when the hosts have no keys in
+        common.
+        """
+        np = FilterModule._numpy()
+        hosts = [host for host, columns in host_columns.items() if columns]
+        if not hosts:
+            return {}
+
+        keys = [
+            key
+            for key in host_columns[hosts[0]]
+            if all(key in host_columns[host] for host in hosts)
+        ]
+        if not keys:
+            return {}
+
+        lengths = [len(host_columns[host][keys[0]]) for host in hosts]
+        fleet = {"host": np.repeat(np.array(hosts, dtype=str), lengths)}
+        for key in keys:
+            fleet[key] = np.concatenate([host_columns[host][key] for host in hosts])
+
+        return fleet
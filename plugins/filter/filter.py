@@ -6,11 +6,61 @@ File contains custom filters for use in Ansible playbooks.
 https://www.ansible.com/
 """
 
-import re
+import hashlib
+import inspect
 import ipaddress
+import os
+import re
+import socket
+import sys
+
+# Helpers shared by the filters, outside of this directory so that Ansible
+# does not load them as filter plugins
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugin_utils"))
+# pylint: disable=import-error,wrong-import-position
+from nots_dispatch import dispatch, parse_jobs
+from nots_filter_stats import FilterStats
+from nots_nxos import (
+    NXOS_KEYS,
+    nxos_contexts,
+    nxos_record,
+    nxos_rows,
+    nxos_structured_basic,
+    nxos_structured_neighbors,
+)
+from nots_parse_budget import ParseBudget
+from nots_parse_cache import ParseCache
+from nots_parsing import IPV4_KEYS, PATTERNS, ParserHelpers
+
+
+def _source_version():
+    """
+    Return a short hash of this file and of the helper modules holding
+    parser logic, used as the parser version in cache keys so that any
+    change to the parsers invalidates cached results.
+    """
+    digest = hashlib.sha256()
+    for path in (__file__, inspect.getfile(ParserHelpers), inspect.getfile(nxos_record)):
+        with open(path, "rb") as handle:
+            digest.update(handle.read())
+    return digest.hexdigest()[:12]
+
+
+# Optional parse cache, disabled unless NOTS_PARSE_CACHE is set
+PARSER_VERSION = _source_version()
+PARSE_CACHE = ParseCache.from_env(version=PARSER_VERSION)
+
+# Optional filter instrumentation, disabled unless NOTS_FILTER_STATS is set
+FILTER_STATS = FilterStats.from_env()
+
+# Optional parse time budget, disabled unless NOTS_PARSE_BUDGET_MS is set
+PARSE_BUDGET = ParseBudget.from_env()
+
+# Filters accepting the "workers" keyword argument to parse shards in a pool
+SHARD_FILTERS = ("ios_ospf_dbsum", "nxos_ospf_dbsum")
 
 
-class FilterModule(object):
+class FilterModule(ParserHelpers):
     """
     Defines a filter module object.
     """
@@ -20,8 +70,11 @@ class FilterModule(object):
         """
         Return a list of hashes where the key is the filter
         name exposed to playbooks and the value is the function.
+        Parsers are wrapped with the parse cache and time budget when they
+        are enabled, and every filter is wrapped with instrumentation when
+        it is enabled.
         """
-        return {
+        filters = {
             "ios_ospf_neighbor": FilterModule.ios_ospf_neighbor,
             "ios_ospf_basic": FilterModule.ios_ospf_basic,
             "ios_ospf_dbsum": FilterModule.ios_ospf_dbsum,
@@ -36,53 +89,56 @@ class FilterModule(object):
             "nxos_ospf_neighbor": FilterModule.nxos_ospf_neighbor,
             "nxos_ospf_dbsum": FilterModule.nxos_ospf_dbsum,
             "nxos_ospf_traffic": FilterModule.nxos_ospf_traffic,
+            "compact_to_dict": FilterModule.compact_to_dict,
+            "ios_ospf_dispatch": FilterModule.ios_ospf_dispatch,
+            "iosxr_ospf_dispatch": FilterModule.iosxr_ospf_dispatch,
+            "nxos_ospf_dispatch": FilterModule.nxos_ospf_dispatch,
         }
+        for name, func in filters.items():
+            if name.startswith(("ios_", "iosxr_", "nxos_")) and not name.endswith(
+                "_dispatch"
+            ):
+                filters[name] = FilterModule._wrap_parser(name, func)
+        if FILTER_STATS:
+            for name, func in filters.items():
+                filters[name] = FILTER_STATS.wrap(name, func)
+
+        filters["filter_stats_report"] = FilterStats.report
+        return filters
 
     @staticmethod
-    def _read_match(match, key_filler_list=None):
-        """
-        Helper function which consumes a match object and an optional
-        list of keys to populate with None values if match is invalid.
-        Many operations follow this basic workflow, which iterates over
-        the items captured in the match, attempts to make them integers
-        whenever possible, and returns the resulting dict.
-        """
-        return_dict = None
-        if match:
-            return_dict = match.groupdict()
-            for key in return_dict.keys():
-                return_dict[key] = FilterModule._try_int(return_dict[key])
-        elif key_filler_list:
-            return_dict = {}
-            for key in key_filler_list:
-                return_dict.update({key: None})
-
-        return return_dict
-
-    @staticmethod
-    def _get_match_items(pattern, text, extra_flags=0):
-        """
-        Helper function that can perform iterative block matching
-        given a pattern and input text. Additional regex flags (re.DOTALL, etc)
-        can be optionally specified. Any fields that can be parsed as
-        integers are converted and the list of dictionaries containing the
-        matches of each block is returned.
-        """
-        regex = re.compile(pattern, re.VERBOSE + extra_flags)
-        items = [match.groupdict() for match in regex.finditer(text)]
-        for item in items:
-            for key in item.keys():
-                item[key] = FilterModule._try_int(item[key])
-
-        return items
+    def _wrap_parser(name, func):
+        """
+        Helper function which wraps a parser with the parse time budget and
+        the parse cache, when each is enabled. Cached results are returned
+        without arming the timer, and empty results from calls which ran out
+        of time are never cached. Cache lookups are also spooled when
+        instrumentation is enabled.
+        """
+        if PARSE_BUDGET:
+            func = PARSE_BUDGET.limit(name, func)
+        if PARSE_CACHE:
+            func = PARSE_CACHE.wrap(name, func)
+            if FILTER_STATS:
+                func = FILTER_STATS.count_cache(name, PARSE_CACHE, func)
+        if PARSE_BUDGET:
+            func = PARSE_BUDGET.fallback(name, func, getattr(FilterModule, name))
+        return func
 
     @staticmethod
-    def nxos_ospf_traffic(text):
+    def nxos_ospf_traffic(text, compact=False, columnar=False):
         """
         Parses information from the Cisco NXOS "show ip ospf traffic" command
         family. This is useful for verifying various characteristics of
-        an OSPF process/area statistics for troubleshooting.
+        an OSPF process/area statistics for troubleshooting. If columnar is
+        true, a dictionary of NumPy arrays is returned instead, with one
+        array per key holding the value from every process.
         """
+        FilterModule._check_output(compact, columnar)
+        contexts = nxos_contexts(text)
+        if contexts is not None:
+            records = [nxos_record(context, NXOS_KEYS["traffic"]) for context in contexts]
+            return FilterModule._traffic_output(records, compact, columnar)
 
         process_pattern = r"""
             OSPF\s+Process\s+ID\s+(?P<pid>\d+)\s+
@@ -118,16 +174,37 @@ class FilterModule(object):
             no\s+vrf\s+(?P<no_vrf>\d+)
         """
 
-        return FilterModule._get_match_items(process_pattern, text, re.DOTALL)
+        if columnar:
+            return FilterModule._get_match_columns(
+                "nxos_ospf_traffic.process", process_pattern, text, re.DOTALL
+            )
+        return FilterModule._get_match_items(
+            "nxos_ospf_traffic.process", process_pattern, text, re.DOTALL, compact
+        )
 
     @staticmethod
-    def nxos_ospf_dbsum(text):
+    def nxos_ospf_dbsum(text, workers=0):
         """
         Parses information from the Cisco NXOS
         "show ip ospf database database-summary" command family.
         This is useful for verifying various characteristics of
         an OSPF database to count LSAs for simple verification.
-        """
+        When workers is positive, very large output is split into shards
+        parsed in parallel, as described in _get_shard_items.
+        """
+        contexts = nxos_contexts(text)
+        if contexts is not None:
+            return {
+                "process": nxos_record(
+                    contexts[0] if contexts else {}, NXOS_KEYS["dbsum"]
+                ),
+                "areas": [
+                    nxos_record(row, NXOS_KEYS["dbsum_area"])
+                    for context in contexts
+                    for row in nxos_rows(context, "area")
+                ],
+            }
+
         return_dict = {}
         process_pattern = r"""
             Process\s+(?P<process_id>\d+)\s+database\s+summary\s+
@@ -141,7 +218,7 @@ class FilterModule(object):
             Opaque\s+Area\s+\d+\s+
             Type-5\s+AS\s+External\s+(?P<total_lsa5>\d+)
         """
-        regex = re.compile(process_pattern, re.VERBOSE)
+        regex = PATTERNS.compile("nxos_ospf_dbsum.process", process_pattern)
         match = regex.search(text)
         key_filler_list = [
             "process_id",
@@ -167,18 +244,25 @@ class FilterModule(object):
             Type-7\s+AS\s+External\s+(?P<num_lsa7>\d+)\s+
         """
 
-        areas = FilterModule._get_match_items(area_pattern, text)
+        areas = FilterModule._get_shard_items(
+            "nxos_ospf_dbsum.area", area_pattern, text, workers
+        )
 
         return_dict.update({"areas": areas})
         return return_dict
 
     @staticmethod
-    def nxos_ospf_neighbor(text):
+    def nxos_ospf_neighbor(text, compact=False):
         """
         Parses information from the Cisco NXOS "show ip ospf neighbor" command
         family. This is useful for verifying various characteristics of
         an OSPF neighbor's state.
         """
+        contexts = nxos_contexts(text)
+        if contexts is not None:
+            neighbors = nxos_structured_neighbors(contexts)
+            return FilterModule._compact(neighbors) if compact else neighbors
+
         pattern = r"""
             (?P<rid>\d+\.\d+\.\d+\.\d+)\s+
             (?P<priority>\d+)\s+
@@ -188,7 +272,9 @@ class FilterModule(object):
             (?P<peer>\d+\.\d+\.\d+\.\d+)\s+
             (?P<intf>[0-9A-Za-z./_-]+)
         """
-        return FilterModule._ospf_neighbor(pattern, text, ["uptime"])
+        return FilterModule._ospf_neighbor(
+            "nxos_ospf_neighbor.line", pattern, text, ["uptime"], compact
+        )
 
     @staticmethod
     def nxos_ospf_basic(text):
@@ -197,28 +283,37 @@ class FilterModule(object):
         family. This is useful for verifying various characteristics of
         an OSPF process and its basic configuration.
         """
+        contexts = nxos_contexts(text)
+        if contexts is not None:
+            return nxos_structured_basic(contexts)
+
         return_dict = {}
 
-        process_pattern = r"""
-            Routing\s+Process\s+(?P<id>\d+)\s+with\s+ID\s+(?P<rid>\d+\.\d+\.\d+\.\d+)
-            .*
-            \s*Reference\s+Bandwidth\s+is\s+(?P<ref_bw>\d+)\s+Mbps
-            .*
-            \s*SPF\s+throttling\s+delay\s+time\s+of\s+(?P<init_spf>\d+)(?:\.\d+)\s+msecs,
-            \s*SPF\s+throttling\s+hold\s+time\s+of\s+(?P<min_spf>\d+)(?:\.\d+)\s+msecs,
-            \s*SPF\s+throttling\s+maximum\s+wait\s+time\s+of\s+(?P<max_spf>\d+)(?:\.\d+)\s+msecs
-        """
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
-        match = regex.search(text)
-        process = FilterModule._read_match(match, ["process"])
+        process_sections = [
+            (
+                "header",
+                r"Routing\s+Process\s+(?P<id>\d+)\s+with\s+ID\s+(?P<rid>\d+\.\d+\.\d+\.\d+)",
+            ),
+            ("ref_bw", r"Reference\s+Bandwidth\s+is\s+(?P<ref_bw>\d+)\s+Mbps"),
+            (
+                "spf",
+                r"""
+                SPF\s+throttling\s+delay\s+time\s+of\s+(?P<init_spf>\d+)(?:\.\d+)\s+msecs,
+                \s*SPF\s+throttling\s+hold\s+time\s+of\s+(?P<min_spf>\d+)(?:\.\d+)\s+msecs,
+                \s*SPF\s+throttling\s+maximum\s+wait\s+time\s+of\s+(?P<max_spf>\d+)(?:\.\d+)\s+msecs
+                """,
+            ),
+        ]
+        process = FilterModule._read_sections(
+            "nxos_ospf_basic", text, process_sections, ["process"]
+        )
         if process:
-            is_abr = text.find("area border") != -1
-            is_asbr = text.find("autonomous system boundary") != -1
-            is_stub_rtr = text.find("Originating router LSA with max") != -1
-
-            process.update(
-                {"is_abr": is_abr, "is_asbr": is_asbr, "is_stub_rtr": is_stub_rtr,}
-            )
+            flags = [
+                ("is_abr", "area border"),
+                ("is_asbr", "autonomous system boundary"),
+                ("is_stub_rtr", "Originating router LSA with max"),
+            ]
+            process.update(FilterModule._find_flags(text, flags))
             return_dict.update({"process": process})
 
         area_pattern = r"""
@@ -229,7 +324,7 @@ class FilterModule(object):
             \s+(?:This\s+area\s+is\s+a\s+(?P<type>\w+)\s+area)?
         """
 
-        regex = re.compile(area_pattern, re.VERBOSE)
+        regex = PATTERNS.compile("nxos_ospf_basic.area", area_pattern)
         areas = [match.groupdict() for match in regex.finditer(text)]
         for area in areas:
             area["num_intfs"] = FilterModule._try_int(area["num_intfs"])
@@ -244,20 +339,7 @@ class FilterModule(object):
         return return_dict
 
     @staticmethod
-    def _try_int(text):
-        """
-        Attempts to parse an integer from the input text. If it fails, just
-        return the text as it was passed in. This is useful for iterating
-        across structures with many integers which should be stored as
-        integers, not strings.
-        """
-        try:
-            return int(text)
-        except ValueError:
-            return text
-
-    @staticmethod
-    def ios_ospf_neighbor(text):
+    def ios_ospf_neighbor(text, compact=False):
         """
         Parses information from the Cisco IOS "show ip ospf neighbor" command
         family. This is useful for verifying various characteristics of
@@ -272,7 +354,9 @@ class FilterModule(object):
             (?P<peer>\d+\.\d+\.\d+\.\d+)\s+
             (?P<intf>[0-9A-Za-z./_-]+)
         """
-        return FilterModule._ospf_neighbor(pattern, text, ["deadtime"])
+        return FilterModule._ospf_neighbor(
+            "ios_ospf_neighbor.line", pattern, text, ["deadtime"], compact
+        )
 
     @staticmethod
     def ios_ospf_basic(text):
@@ -283,29 +367,39 @@ class FilterModule(object):
         """
         return_dict = {}
 
-        process_pattern = r"""
-            Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+(?P<rid>\d+\.\d+\.\d+\.\d+)
-            .*
-            \s*Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
-            \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<min_spf>\d+)\s+msecs
-            \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive\s+SPFs\s+(?P<max_spf>\d+)\s+msecs
-            .*
-            \s*Reference\s+bandwidth\s+unit\s+is\s+(?P<ref_bw>\d+)\s+mbps
-        """
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
-        match = regex.search(text)
-        process = FilterModule._read_match(match, ["process"])
+        process_sections = [
+            (
+                "header",
+                r"""
+                Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+
+                (?P<rid>\d+\.\d+\.\d+\.\d+)
+                """,
+            ),
+            (
+                "spf",
+                r"""
+                Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
+                \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive
+                \s+SPFs\s+(?P<min_spf>\d+)\s+msecs
+                \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive
+                \s+SPFs\s+(?P<max_spf>\d+)\s+msecs
+                """,
+            ),
+            ("ref_bw", r"Reference\s+bandwidth\s+unit\s+is\s+(?P<ref_bw>\d+)\s+mbps"),
+        ]
+        process = FilterModule._read_sections(
+            "ios_ospf_basic", text, process_sections, ["process"]
+        )
         if process:
-            process.update(
-                {
-                    "is_abr": text.find("area border") != -1,
-                    "is_asbr": text.find("autonomous system boundary") != -1,
-                    "is_stub_rtr": text.find("Originating router-LSAs with") != -1,
-                    "has_ispf": text.find("Incremental-SPF enabled") != -1,
-                    "has_bfd": text.find("BFD is enabled") != -1,
-                    "has_ttlsec": text.find("Strict TTL checking enabled") != -1,
-                }
-            )
+            flags = [
+                ("is_abr", "area border"),
+                ("is_asbr", "autonomous system boundary"),
+                ("is_stub_rtr", "Originating router-LSAs with"),
+                ("has_ispf", "Incremental-SPF enabled"),
+                ("has_bfd", "BFD is enabled"),
+                ("has_ttlsec", "Strict TTL checking enabled"),
+            ]
+            process.update(FilterModule._find_flags(text, flags))
             return_dict.update({"process": process})
 
         area_pattern = r"""
@@ -314,7 +408,7 @@ class FilterModule(object):
             \s+(?:It\s+is\s+a\s+(?P<type>\w+)\s+area)?
         """
 
-        regex = re.compile(area_pattern, re.VERBOSE)
+        regex = PATTERNS.compile("ios_ospf_basic.area", area_pattern)
         areas = [match.groupdict() for match in regex.finditer(text)]
         for area in areas:
             area["num_intfs"] = FilterModule._try_int(area["num_intfs"])
@@ -328,13 +422,15 @@ class FilterModule(object):
         return return_dict
 
     @staticmethod
-    def ios_ospf_dbsum(text):
+    def ios_ospf_dbsum(text, workers=0):
         """
         Parses information from the Cisco IOS
         "show ip ospf database database-summary" command family.
         This is useful for verifying various characteristics of
         an OSPF database to count LSAs for simple verification.
         Note that this parser is generic enough to cover Cisco IOS-XR also.
+        When workers is positive, very large output is split into shards
+        parsed in parallel, as described in _get_shard_items.
         """
         return_dict = {}
         process_pattern = r"""
@@ -345,9 +441,13 @@ class FilterModule(object):
             Summary\s+Net\s+(?P<total_lsa3>\d+).*\n\s+
             Summary\s+ASBR\s+(?P<total_lsa4>\d+).*\n\s+
             Type-7\s+Ext\s+(?P<total_lsa7>\d+).*
+            (?:\n[\ \t].*)*?
             \s+Type-5\s+Ext\s+(?P<total_lsa5>\d+)
         """
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
+        # Only the indented lines of the process block may come between the
+        # Type-7 and Type-5 lines; a DOTALL ".*" would backtrack through the
+        # rest of the text and match the last Type-5 line of any process
+        regex = PATTERNS.compile("ios_ospf_dbsum.process", process_pattern)
         match = regex.search(text)
         key_filler_list = [
             "process_id",
@@ -371,18 +471,71 @@ class FilterModule(object):
             Type-7\s+Ext\s+(?P<num_lsa7>\d+)
         """
 
-        areas = FilterModule._get_match_items(area_pattern, text)
+        areas = FilterModule._get_shard_items(
+            "ios_ospf_dbsum.area", area_pattern, text, workers
+        )
 
         return_dict.update({"areas": areas})
         return return_dict
 
     @staticmethod
-    def ios_ospf_traffic(text):
+    def ios_ospf_traffic(text, engine="regex", compact=False, columnar=False):
         """
         Parses information from the Cisco IOS "show ip ospf traffic" command
         family. This is useful for verifying various characteristics of
-        an OSPF process/area statistics for troubleshooting.
-        """
+        an OSPF process/area statistics for troubleshooting. The default
+        "regex" engine matches each interface block with one large pattern
+        and is the fastest on well-formed output. The "stream" engine finds
+        counters by label, so it tolerates reordered or extra counters, and
+        uses less memory, but is slower on well-formed output. Both return
+        the same list of dictionaries. If columnar is true, a dictionary of
+        NumPy arrays is returned instead, with one array per key holding the
+        value from every interface, such as the "intf" names and each
+        counter. This turns analytics across many interfaces and hosts into
+        array operations (see the traffic_* filters in counters.py).
+        """
+        FilterModule._check_output(compact, columnar)
+        if engine == "stream":
+            sections = {
+                "OSPF header errors": [
+                    ("Length", "length"),
+                    ("Instance ID", "instance_id"),
+                    ("Checksum", "checksum"),
+                    ("Auth Type", "auth_type"),
+                    ("Version", "version"),
+                    ("Bad Source", "bad_src"),
+                    ("No Virtual Link", "no_vl"),
+                    ("Area Mismatch", "area_mismatch"),
+                    ("No Sham Link", "no_sl"),
+                    ("Self Originated", "self_orig"),
+                    ("Duplicate ID", "dup_rid"),
+                    ("Hello", "hello_pkt"),
+                    ("MTU Mismatch", "mtu_mismatch"),
+                    ("Nbr Ignored", "nbr_ignored"),
+                    ("LLS", "lls"),
+                    ("Unknown Neighbor", "unk_nbr"),
+                    ("Authentication", "auth"),
+                    ("TTL Check Fail", "ttlsec_fail"),
+                    ("Adjacency Throttle", "adj_throttle"),
+                    ("BFD", "bfd"),
+                    ("Test discard", "test_discard"),
+                ],
+                "OSPF LSA errors": [
+                    ("Type", "lsa_type"),
+                    ("Length", "lsa_length"),
+                    ("Data", "lsa_data"),
+                    ("Checksum", "lsa_checksum"),
+                ],
+            }
+            records = FilterModule._stream_counters(
+                "ios_ospf_traffic",
+                text,
+                r"\s*Interface\s+(?P<intf>[^s]\S+)",
+                sections,
+            )
+            return FilterModule._traffic_output(records, compact, columnar)
+
+        FilterModule._check_engine(engine)
 
         interface_pattern = r"""
             Interface\s+(?P<intf>[^s]\S+)\s+
@@ -416,7 +569,13 @@ class FilterModule(object):
             \s+Checksum\s+(?P<lsa_checksum>\d+)
         """
 
-        return FilterModule._get_match_items(interface_pattern, text, re.DOTALL)
+        if columnar:
+            return FilterModule._get_match_columns(
+                "ios_ospf_traffic.interface", interface_pattern, text, re.DOTALL
+            )
+        return FilterModule._get_match_items(
+            "ios_ospf_traffic.interface", interface_pattern, text, re.DOTALL, compact
+        )
 
     @staticmethod
     def ios_ospf_frr(text):
@@ -433,7 +592,7 @@ class FilterModule(object):
             (?P<rlfa>(Yes|No))\s+
             (?P<tilfa>(Yes|No))
         """
-        regex = re.compile(pattern, re.VERBOSE)
+        regex = PATTERNS.compile("ios_ospf_frr.line", pattern)
         frr_area_dict = {}
         for line in text.split("\n"):
             match = regex.search(line)
@@ -451,7 +610,7 @@ class FilterModule(object):
         return frr_area_dict
 
     @staticmethod
-    def ios_bfd_neighbor(text):
+    def ios_bfd_neighbor(text, compact=False):
         """
         Parses information from the Cisco IOS "show bfd neighbor" command
         family. This is useful for verifying various characteristics of
@@ -466,7 +625,7 @@ class FilterModule(object):
             (?P<state>\w+)\s+
             (?P<intf>[0-9A-Za-z./-]+)
         """
-        regex = re.compile(pattern, re.VERBOSE)
+        regex = PATTERNS.compile("ios_bfd_neighbor.line", pattern)
         bfd_neighbors = []
         for line in text.split("\n"):
             match = regex.search(line)
@@ -480,7 +639,84 @@ class FilterModule(object):
 
                 bfd_neighbors.append(gdict)
 
-        return bfd_neighbors
+        return FilterModule._compact(bfd_neighbors) if compact else bfd_neighbors
+
+    @staticmethod
+    def compact_to_dict(records):
+        """
+        Converts a list of compact records, returned by the neighbor, BFD,
+        and traffic parsers when compact is true, back into the list of
+        dictionaries those parsers return by default. Integer IPv4
+        addresses are restored to dotted-decimal strings. This is needed
+        wherever plain dictionaries are required, such as before storing
+        the records as facts or serializing them to JSON.
+        """
+        dict_records = []
+        for record in records:
+            record_dict = record._asdict()
+            for key in IPV4_KEYS:
+                if key in record_dict:
+                    record_dict[key] = socket.inet_ntoa(
+                        record_dict[key].to_bytes(4, "big")
+                    )
+            dict_records.append(dict(record_dict))
+
+        return dict_records
+
+    @staticmethod
+    def ios_ospf_dispatch(
+        outputs, commands, traffic_engine="regex", workers=0, lazy=False
+    ):
+        """
+        Parses the output of every IOS/IOS-XE command, such as
+        CLI_OUTPUT.stdout from ios_command, using the parser for that
+        command. Returns a dictionary keyed by fact name (OSPF_BASIC,
+        OSPF_NBR, OSPF_DB, OSPF_TRAF, BFD_NBR, and OSPF_FRR if collected).
+        When lazy is true, each output is only parsed when its fact is read.
+        """
+        jobs = dispatch("ios", outputs, commands, traffic_engine)
+        return parse_jobs(jobs, FilterModule._parse, workers, lazy)
+
+    @staticmethod
+    def iosxr_ospf_dispatch(
+        outputs, commands, traffic_engine="regex", workers=0, lazy=False
+    ):
+        """
+        Parses the output of every IOS-XR command, such as CLI_OUTPUT.stdout
+        from iosxr_command, using the parser for that command. Returns a
+        dictionary keyed by fact name (OSPF_BASIC, OSPF_NBR, OSPF_DB, and
+        OSPF_TRAF). When lazy is true, each output is only parsed when its
+        fact is read.
+        """
+        jobs = dispatch("iosxr", outputs, commands, traffic_engine)
+        return parse_jobs(jobs, FilterModule._parse, workers, lazy)
+
+    @staticmethod
+    def nxos_ospf_dispatch(
+        outputs, commands, traffic_engine="regex", workers=0, lazy=False
+    ):
+        """
+        Parses the output of every NX-OS command, such as CLI_OUTPUT.stdout
+        from nxos_command, using the parser for that command. Returns a
+        dictionary keyed by fact name (OSPF_BASIC, OSPF_NBR, OSPF_DB, and
+        OSPF_TRAF). NX-OS traffic has a single engine, so traffic_engine is
+        accepted only for consistency. When lazy is true, each output is
+        only parsed when its fact is read.
+        """
+        jobs = dispatch("nxos", outputs, commands, traffic_engine)
+        return parse_jobs(jobs, FilterModule._parse, workers, lazy)
+
+    @staticmethod
+    def _parse(name, text, kwargs, workers=0):
+        """
+        Helper function which parses text with the named parser, through
+        the parse cache and time budget when enabled. Parsers in SHARD_FILTERS are
+        also given workers when it is positive.
+        """
+        if workers and name in SHARD_FILTERS:
+            kwargs = dict(kwargs, workers=workers)
+        func = FilterModule._wrap_parser(name, getattr(FilterModule, name))
+        return func(text, **kwargs)
 
     @staticmethod
     def check_bfd_up(bfd_nbr_list, ospf_nbr):
@@ -500,7 +736,7 @@ class FilterModule(object):
         raise ValueError("{0} not in bfd_nbr_list".format(ospf_nbr["peer"]))
 
     @staticmethod
-    def iosxr_ospf_neighbor(text):
+    def iosxr_ospf_neighbor(text, compact=False):
         """
         Parses information from the Cisco IOS-XR "show ospf neighbor" command
         family. This is useful for verifying various characteristics of
@@ -516,10 +752,12 @@ class FilterModule(object):
             (?P<uptime>[0-9:hdwy]+)\s+
             (?P<intf>[0-9A-Za-z./_-]+)
         """
-        return FilterModule._ospf_neighbor(pattern, text, ["deadtime", "uptime"])
+        return FilterModule._ospf_neighbor(
+            "iosxr_ospf_neighbor.line", pattern, text, ["deadtime", "uptime"], compact
+        )
 
     @staticmethod
-    def _ospf_neighbor(pattern, text, time_keys=None):
+    def _ospf_neighbor(name, pattern, text, time_keys=None, compact=False):
         """
         Helper function specific to OSPF neighbor parsing. Each device type
         is slightly different in terms of the information provided, but
@@ -527,8 +765,10 @@ class FilterModule(object):
         which are expected to have values in the format "hh:mm:ss". These
         are commonly uptime, deadtime, etc ... and are most useful when
         converted into seconds as an integer for comparative purposes.
+        The name identifies the pattern in the shared registry. If compact
+        is true, compact records are returned instead of dictionaries.
         """
-        regex = re.compile(pattern, re.VERBOSE)
+        regex = PATTERNS.compile(name, pattern)
         ospf_neighbors = []
         for line in text.split("\n"):
             match = regex.search(line)
@@ -555,7 +795,7 @@ class FilterModule(object):
 
                 ospf_neighbors.append(gdict)
 
-        return ospf_neighbors
+        return FilterModule._compact(ospf_neighbors) if compact else ospf_neighbors
 
     @staticmethod
     def iosxr_ospf_basic(text):
@@ -566,39 +806,50 @@ class FilterModule(object):
         """
         return_dict = {}
 
-        process_pattern = r"""
-            Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+
-            (?P<rid>\d+\.\d+\.\d+\.\d+)
-            .*
-            \s*Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
-            \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive
-            \s+SPFs\s+(?P<min_spf>\d+)\s+msecs
-            \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive
-            \s+SPFs\s+(?P<max_spf>\d+)\s+msecs
-        """
-        regex = re.compile(process_pattern, re.VERBOSE + re.DOTALL)
-        match = regex.search(text)
-        process = FilterModule._read_match(match, ["process"])
+        process_sections = [
+            (
+                "header",
+                r"""
+                Routing\s+Process\s+"ospf\s+(?P<id>\d+)"\s+with\s+ID\s+
+                (?P<rid>\d+\.\d+\.\d+\.\d+)
+                """,
+            ),
+            (
+                "spf",
+                r"""
+                Initial\s+SPF\s+schedule\s+delay\s+(?P<init_spf>\d+)\s+msecs
+                \s*Minimum\s+hold\s+time\s+between\s+two\s+consecutive
+                \s+SPFs\s+(?P<min_spf>\d+)\s+msecs
+                \s*Maximum\s+wait\s+time\s+between\s+two\s+consecutive
+                \s+SPFs\s+(?P<max_spf>\d+)\s+msecs
+                """,
+            ),
+        ]
+        process = FilterModule._read_sections(
+            "iosxr_ospf_basic", text, process_sections, ["process"]
+        )
         if process:
-            is_abr = text.find("area border") != -1
-            is_asbr = text.find("autonomous system boundary") != -1
-            is_stub_rtr = text.find("Originating router-LSAs with max") != -1
-
-            process.update(
-                {"is_abr": is_abr, "is_asbr": is_asbr, "is_stub_rtr": is_stub_rtr,}
-            )
+            flags = [
+                ("is_abr", "area border"),
+                ("is_asbr", "autonomous system boundary"),
+                ("is_stub_rtr", "Originating router-LSAs with max"),
+            ]
+            process.update(FilterModule._find_flags(text, flags))
             return_dict.update({"process": process})
 
         area_pattern = r"""
             Area\s+(?:BACKBONE\()?(?P<id>\d+)(?:\))?\s+
-            Number\s+of\s+interfaces\s+in\s+this\s+area\s+is\s+(?P<num_intfs>\d+).*?\n
+            Number\s+of\s+interfaces\s+in\s+this\s+area\s+is\s+(?P<num_intfs>\d+)[^\n]*\n
             \s+(?:It\s+is\s+a\s+(?P<type>\w+)\s+area)?
             .*?
             Number\s+of\s+LFA\s+enabled\s+interfaces\s+(?P<frr_intfs>\d+)
         """
 
-        regex = re.compile(area_pattern, re.VERBOSE + re.DOTALL)
-        areas = [match.groupdict() for match in regex.finditer(text)]
+        regex = PATTERNS.compile("iosxr_ospf_basic.area", area_pattern, re.DOTALL)
+        areas = [
+            match.groupdict()
+            for match in FilterModule._finditer("iosxr_ospf_basic.area", regex, text)
+        ]
         for area in areas:
             area["num_intfs"] = FilterModule._try_int(area["num_intfs"])
             area["id"] = FilterModule._try_int(area["id"])
@@ -612,12 +863,62 @@ class FilterModule(object):
         return return_dict
 
     @staticmethod
-    def iosxr_ospf_traffic(text):
+    def iosxr_ospf_traffic(text, engine="regex", compact=False, columnar=False):
         """
         Parses information from the Cisco IOS-XR "show ip ospf traffic" command
         family. This is useful for verifying various characteristics of
-        an OSPF process/area statistics for troubleshooting.
-        """
+        an OSPF process/area statistics for troubleshooting. The engine
+        and columnar options are the same as the ios_ospf_traffic filter.
+        """
+        FilterModule._check_output(compact, columnar)
+        if engine == "stream":
+            sections = {
+                "OSPF Header Errors": [
+                    ("Version", "version"),
+                    ("LLS", "lls"),
+                    ("Type", "type"),
+                    ("Auth RX", "auth_rx"),
+                    ("Length", "length"),
+                    ("Auth TX", "auth_tx"),
+                    ("Checksum", "checksum"),
+                ],
+                "OSPF LSA Errors": [
+                    ("Type", "lsa_type"),
+                    ("Checksum", "lsa_checksum"),
+                    ("Length", "lsa_length"),
+                    ("Data", "lsa_data"),
+                ],
+                "OSPF Errors": [
+                    ("Bad Source", "bad_src"),
+                    ("Area Mismatch", "area_mismatch"),
+                    ("No Virtual Link", "no_vl"),
+                    ("Self Originated", "self_orig"),
+                    ("No Sham Link", "no_sl"),
+                    ("Duplicate ID", "dup_rid"),
+                    ("Nbr ignored", "nbr_ignored"),
+                    ("Graceful Shutdown", "gshut"),
+                    ("Unknown nbr", "unk_nbr"),
+                    ("Passive intf", "passive_intf"),
+                    ("No DR/BDR", "no_dr_bdr"),
+                    ("Disabled intf", "disable_intf"),
+                    ("Enqueue hello", "enq_hello"),
+                    ("Enqueue router", "enq_rtr"),
+                    ("Unspecified RX", "unspec_rx"),
+                    ("Unspecified TX", "unspec_tx"),
+                    ("Socket", "socket"),
+                ],
+            }
+            header_pattern = r"""
+                \s*Interface\s+(?P<intf>\S+)\s+
+                Process\s+ID\s+(?P<pid>\d+)\s+
+                Area\s+(?P<area_id>\d+)
+            """
+            records = FilterModule._stream_counters(
+                "iosxr_ospf_traffic", text, header_pattern, sections
+            )
+            return FilterModule._traffic_output(records, compact, columnar)
+
+        FilterModule._check_engine(engine)
 
         interface_pattern = r"""
             Interface\s+(?P<intf>\S+)\s+
@@ -657,4 +958,10 @@ class FilterModule(object):
             \s+Socket\s+(?P<socket>\d+)
         """
 
-        return FilterModule._get_match_items(interface_pattern, text, re.DOTALL)
+        if columnar:
+            return FilterModule._get_match_columns(
+                "iosxr_ospf_traffic.interface", interface_pattern, text, re.DOTALL
+            )
+        return FilterModule._get_match_items(
+            "iosxr_ospf_traffic.interface", interface_pattern, text, re.DOTALL, compact
+        )
@@ -0,0 +1,23 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the OSPF area ID normalization shared by the filters in
+plugins/filter/checks.py and the nots_results module. The NX-OS database
+summary parser returns dotted-decimal area IDs, while the other parsers
+return integers, so areas are always joined by their integer ID.
+https://www.ansible.com/
+"""
+
+import ipaddress
+
+
+def int_area_id(value):
+    """
+    Return an OSPF area ID as an integer, whether it is already an integer,
+    a decimal string such as "51" from my_areas, or a dotted-decimal string
+    such as "0.0.17.17" from nxos_ospf_dbsum. Invalid IDs raise a ValueError.
+    """
+    if isinstance(value, str) and "." in value:
+        return int(ipaddress.IPv4Address(value))
+    return int(value)
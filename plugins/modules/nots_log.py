@@ -0,0 +1,144 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Custom Ansible module which writes CLI output to a compressed log file.
+Each command is written as its own gzip member, so the file is a valid gzip
+file readable with zcat, while a small JSON sidecar index records the byte
+offset and length of each member so that one command's output can be read
+without decompressing the whole file.
+https://www.ansible.com/
+"""
+
+import gzip
+import io
+import json
+import os
+
+from ansible.module_utils.basic import AnsibleModule
+
+DOCUMENTATION = """
+---
+module: nots_log
+short_description: Write CLI output to a compressed log with an index
+options:
+  path:
+    description: Log file to write, such as logs/nots_<DTG>/csr1.txt.gz
+    required: true
+  commands:
+    description: List of commands issued, one per output
+    required: true
+  outputs:
+    description: List of command outputs, typically CLI_OUTPUT.stdout
+    required: true
+  newline:
+    description: Line terminator used in the log file
+    default: "\\r\\n"
+"""
+
+EXAMPLES = """
+- name: "LOG >> Write compressed CLI output (stdout) to log path"
+  nots_log:
+    path: "{{ LOG_PATH }}{{ inventory_hostname }}.txt.gz"
+    commands: "{{ commands }}"
+    outputs: "{{ CLI_OUTPUT.stdout }}"
+"""
+
+RETURN = """
+index:
+  description: Path to the JSON sidecar index of command offsets
+  type: str
+commands:
+  description: Number of commands written
+  type: int
+"""
+
+
+def index_path(path):
+    """
+    Return the path of the sidecar index for a compressed log file, such
+    as "csr1.idx.json" for "csr1.txt.gz".
+    """
+    base = path[: -len(".txt.gz")] if path.endswith(".txt.gz") else path
+    return base + ".idx.json"
+
+
+def write_log(path, commands, outputs, newline="\r\n"):
+    """
+    Write each command and its output, surrounded by the same markers as
+    templates/log.j2, as a separate gzip member. Output is streamed to the
+    file one line at a time so the full log is never rendered in memory.
+    The file is written to a temporary name then renamed, so readers never
+    see a partial log. Returns the index as a dictionary.
+    """
+    index = {"format": "gzip-members", "newline": newline, "commands": []}
+    temp = "{0}.{1}.tmp".format(path, os.getpid())
+    with open(temp, "wb") as handle:
+        for command, output in zip(commands, outputs):
+            offset = handle.tell()
+            size = 0
+            with gzip.GzipFile(fileobj=handle, mode="wb", mtime=0) as member:
+                for line in ["!!!", "!!! Start command: " + command, "!!!"]:
+                    size += member.write((line + newline).encode("utf-8"))
+                for line in _lines(output):
+                    size += member.write((line + newline).encode("utf-8"))
+                for line in ["!!!", "!!! End command:   " + command, "!!!"]:
+                    size += member.write((line + newline).encode("utf-8"))
+
+            index["commands"].append(
+                {
+                    "command": command,
+                    "offset": offset,
+                    "length": handle.tell() - offset,
+                    "size": size,
+                }
+            )
+
+    os.replace(temp, path)
+    with open(index_path(path), "w", encoding="utf-8") as handle:
+        json.dump(index, handle, indent=2)
+        handle.write("\n")
+    return index
+
+
+def _lines(output):
+    """
+    Generator which yields each line of a command's output without the
+    line terminator, without building a list of all lines.
+    """
+    for line in io.StringIO(output):
+        yield line.rstrip("\r\n")
+
+
+def main():
+    """
+    Execution starts here. Like the "template" task using force: false,
+    an existing log file is never overwritten.
+    """
+    module = AnsibleModule(
+        argument_spec={
+            "path": {"type": "path", "required": True},
+            "commands": {"type": "list", "required": True},
+            "outputs": {"type": "list", "required": True},
+            "newline": {"type": "str", "default": "\r\n"},
+        },
+        supports_check_mode=True,
+    )
+    params = module.params
+    if len(params["commands"]) != len(params["outputs"]):
+        module.fail_json(msg="commands and outputs must be the same length")
+
+    if os.path.exists(params["path"]) or module.check_mode:
+        module.exit_json(changed=False, index=index_path(params["path"]))
+
+    index = write_log(
+        params["path"], params["commands"], params["outputs"], params["newline"]
+    )
+    os.chmod(params["path"], 0o444)
+    module.exit_json(
+        changed=True, index=index_path(params["path"]), commands=len(index["commands"])
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Custom Ansible module which stores the parsed results of a playbook run in
+a local SQLite database, so trends can be queried across months of runs
+without re-parsing logs. Every host's results are inserted in a single
+transaction per run into normalized tables indexed by run, host, area,
+interface, and neighbor. Neighbor changes since each host's previous run
+are recorded as events when inserting, so flaps are counted from a small
+table rather than by comparing every stored run.
+https://www.ansible.com/
+"""
+
+import os
+import sqlite3
+import sys
+import time
+
+from ansible.module_utils.basic import AnsibleModule
+
+try:
+    from ansible.module_utils.nots_areas import int_area_id
+except ImportError:
+    # Imported outside of Ansible, such as by the benchmarks
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../module_utils"))
+    # pylint: disable=import-error
+    from nots_areas import int_area_id
+
+DOCUMENTATION = """
+---
+module: nots_results
+short_description: Store parsed OSPF results of a run in SQLite
+options:
+  path:
+    description: Database file to create or update, such as logs/results.db
+    required: true
+  run:
+    description: Unique name of the run, typically the DTG fact
+    default: Current local time, such as 20180522T194610
+  hosts:
+    description: List of hosts, one per item of each results list
+    required: true
+  basic:
+    description: List of OSPF_BASIC facts
+    required: true
+  nbr:
+    description: List of OSPF_NBR facts
+    required: true
+  db:
+    description: List of OSPF_DB facts
+    required: true
+  traf:
+    description: List of OSPF_TRAF facts
+    required: true
+  bfd:
+    description: List of BFD_NBR facts
+    required: true
+"""
+
+EXAMPLES = """
+- name: "STORE >> Insert parsed results of this run into database"
+  nots_results:
+    path: "logs/results.db"
+    run: "{{ DTG }}"
+    hosts: "{{ HOSTS }}"
+    basic: "{{ HOSTS | map('extract', hostvars, 'OSPF_BASIC') | list }}"
+    nbr: "{{ HOSTS | map('extract', hostvars, 'OSPF_NBR') | list }}"
+    db: "{{ HOSTS | map('extract', hostvars, 'OSPF_DB') | list }}"
+    traf: "{{ HOSTS | map('extract', hostvars, 'OSPF_TRAF') | list }}"
+    bfd: "{{ HOSTS | map('extract', hostvars, 'BFD_NBR') | list }}"
+  vars:
+    HOSTS: "{{ ansible_play_hosts }}"
+  run_once: true
+  delegate_to: "localhost"
+"""
+
+RETURN = """
+run_id:
+  description: Row ID of the run in the runs table
+  type: int
+rows:
+  description: Number of rows inserted into each table
+  type: dict
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS processes (
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    pid INTEGER,
+    rid TEXT,
+    is_abr INTEGER,
+    is_asbr INTEGER,
+    is_stub_rtr INTEGER,
+    init_spf INTEGER,
+    min_spf INTEGER,
+    max_spf INTEGER,
+    ref_bw INTEGER,
+    total_lsa1 INTEGER,
+    total_lsa2 INTEGER,
+    total_lsa3 INTEGER,
+    total_lsa4 INTEGER,
+    total_lsa5 INTEGER,
+    total_lsa7 INTEGER,
+    PRIMARY KEY (host_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS processes_run ON processes (run_id);
+CREATE TABLE IF NOT EXISTS areas (
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    area_id INTEGER NOT NULL,
+    type TEXT,
+    num_intfs INTEGER,
+    num_lsa1 INTEGER,
+    num_lsa2 INTEGER,
+    num_lsa3 INTEGER,
+    num_lsa4 INTEGER,
+    num_lsa7 INTEGER,
+    PRIMARY KEY (host_id, run_id, area_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS areas_area ON areas (area_id, run_id);
+CREATE TABLE IF NOT EXISTS neighbors (
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    rid TEXT NOT NULL,
+    intf TEXT NOT NULL,
+    peer TEXT,
+    state TEXT,
+    role TEXT,
+    priority INTEGER,
+    uptime_sec INTEGER,
+    PRIMARY KEY (host_id, run_id, rid, intf)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS neighbors_rid ON neighbors (rid, run_id);
+CREATE INDEX IF NOT EXISTS neighbors_intf ON neighbors (intf, run_id);
+CREATE TABLE IF NOT EXISTS bfd_neighbors (
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    peer TEXT NOT NULL,
+    intf TEXT NOT NULL,
+    state TEXT,
+    ld INTEGER,
+    rd INTEGER,
+    PRIMARY KEY (host_id, run_id, peer, intf)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bfd_neighbors_peer ON bfd_neighbors (peer, run_id);
+CREATE TABLE IF NOT EXISTS counters (
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    run_id INTEGER NOT NULL REFERENCES runs,
+    pid INTEGER NOT NULL,
+    intf TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (host_id, run_id, pid, intf, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counters_name ON counters (name, run_id);
+CREATE INDEX IF NOT EXISTS counters_intf ON counters (intf, run_id);
+CREATE TABLE IF NOT EXISTS neighbor_events (
+    run_id INTEGER NOT NULL REFERENCES runs,
+    host_id INTEGER NOT NULL REFERENCES hosts,
+    rid TEXT NOT NULL,
+    intf TEXT NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (run_id, host_id, rid, intf)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS neighbor_events_host
+    ON neighbor_events (host_id, rid, run_id);
+"""
+
+# Columns of each table filled from a parsed record, in order
+PROCESS_KEYS = (
+    "id",
+    "rid",
+    "is_abr",
+    "is_asbr",
+    "is_stub_rtr",
+    "init_spf",
+    "min_spf",
+    "max_spf",
+    "ref_bw",
+)
+DB_PROCESS_KEYS = tuple("total_lsa{0}".format(num) for num in (1, 2, 3, 4, 5, 7))
+AREA_KEYS = ("type", "num_intfs")
+DB_AREA_KEYS = tuple("num_lsa{0}".format(num) for num in (1, 2, 3, 4, 7))
+NBR_KEYS = ("peer", "state", "role", "priority", "uptime_sec")
+BFD_KEYS = ("state", "ld", "rd")
+
+# Fields which identify a traffic record rather than count packets
+ID_KEYS = ("host", "intf", "pid", "area_id")
+
+# Neighbor states which count as up; any other state, or a neighbor missing
+# from a run, counts as down
+UP_STATES = ("full", "2way")
+
+# Tables with rows for each host in a run
+TABLES = (
+    "processes",
+    "areas",
+    "neighbors",
+    "bfd_neighbors",
+    "counters",
+    "neighbor_events",
+)
+
+
+def connect(path):
+    """
+    Return a connection to the database at path, creating the tables and
+    indexes if they do not exist.
+    """
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _values(record, keys):
+    """
+    Return the values of the keys in a parsed record as a tuple, using None
+    for keys the platform does not have, such as "ref_bw" on IOS-XR.
+    """
+    record = record or {}
+    return tuple(record.get(key) for key in keys)
+
+
+def _area_rows(ids, basic, db_data):
+    """
+    Return a row per area, joining the OSPF_BASIC and OSPF_DB area records
+    by integer area ID, since NX-OS database summaries have dotted-decimal
+    IDs. Areas in only one of the two have None for the others.
+    """
+    basic_areas = (basic or {}).get("areas", [])
+    db_areas = (db_data or {}).get("areas", [])
+    basic_index = {int_area_id(area["id"]): area for area in basic_areas}
+    db_index = {int_area_id(area["id"]): area for area in db_areas}
+    rows = []
+    for area_id in sorted(set(basic_index) | set(db_index)):
+        rows.append(
+            ids
+            + (area_id,)
+            + _values(basic_index.get(area_id), AREA_KEYS)
+            + _values(db_index.get(area_id), DB_AREA_KEYS)
+        )
+    return rows
+
+
+def _counter_rows(ids, traffic_list):
+    """
+    Return a row per numeric counter of each OSPF_TRAF record. Records are
+    identified by process and interface, using 0 and "" where the platform
+    does not report one, such as the per-process NX-OS records.
+    """
+    rows = []
+    for traffic in traffic_list or []:
+        scope = (traffic.get("pid") or 0, traffic.get("intf") or "")
+        for key, value in traffic.items():
+            if key not in ID_KEYS and isinstance(value, int):
+                rows.append(ids + scope + (key, value))
+    return rows
+
+
+def _neighbor_events(previous, current):
+    """
+    Return the list of (rid, intf, event) tuples from comparing the
+    neighbors of a host's previous run to this run, where each is a
+    dictionary mapping (rid, intf) to (state, uptime_sec). A neighbor which
+    went down or came up has a "down" or "up" event. A neighbor up in both
+    runs whose uptime went backwards flapped in between, which is a "reset".
+    """
+    events = []
+    for key in sorted(set(previous) | set(current)):
+        before, after = previous.get(key, (None, None)), current.get(key, (None, None))
+        was_up, is_up = before[0] in UP_STATES, after[0] in UP_STATES
+        if was_up and not is_up:
+            events.append(key + ("down",))
+        elif is_up and not was_up:
+            events.append(key + ("up",))
+        elif is_up and None not in (before[1], after[1]) and after[1] < before[1]:
+            events.append(key + ("reset",))
+    return events
+
+
+def _previous_neighbors(conn, host_id):
+    """
+    Return the neighbors of the host's most recent stored run as a
+    dictionary mapping (rid, intf) to (state, uptime_sec), or None if the
+    host has no stored runs.
+    """
+    row = conn.execute(
+        "SELECT MAX(run_id) FROM processes WHERE host_id = ?", (host_id,)
+    ).fetchone()
+    if row[0] is None:
+        return None
+    cursor = conn.execute(
+        "SELECT rid, intf, state, uptime_sec FROM neighbors "
+        "WHERE host_id = ? AND run_id = ?",
+        (host_id, row[0]),
+    )
+    return {(rid, intf): (state, uptime) for rid, intf, state, uptime in cursor}
+
+
+def _host_ids(conn, hosts):
+    """
+    Return a dictionary mapping each host name to its host ID, adding the
+    hosts not seen before.
+    """
+    conn.executemany(
+        "INSERT OR IGNORE INTO hosts (name) VALUES (?)", [(host,) for host in hosts]
+    )
+    return dict(conn.execute("SELECT name, host_id FROM hosts"))
+
+
+def _host_rows(conn, ids, facts, tables):
+    """
+    Append the rows of one host's facts to the list of rows of each table,
+    where ids is the (host ID, run ID) tuple. Neighbor events are found by
+    comparing to the host's previous run, which must not yet include this
+    run's rows.
+    """
+    basic, db_data = facts.get("OSPF_BASIC"), facts.get("OSPF_DB")
+    tables["processes"].append(
+        ids
+        + _values((basic or {}).get("process"), PROCESS_KEYS)
+        + _values((db_data or {}).get("process"), DB_PROCESS_KEYS)
+    )
+    tables["areas"].extend(_area_rows(ids, basic, db_data))
+
+    current = {}
+    for nbr in facts.get("OSPF_NBR") or []:
+        tables["neighbors"].append(
+            ids + (nbr["rid"], nbr["intf"]) + _values(nbr, NBR_KEYS)
+        )
+        current[(nbr["rid"], nbr["intf"])] = (nbr["state"], nbr.get("uptime_sec"))
+    previous = _previous_neighbors(conn, ids[0])
+    if previous is not None:
+        tables["neighbor_events"].extend(
+            ids[::-1] + event for event in _neighbor_events(previous, current)
+        )
+
+    for bfd in facts.get("BFD_NBR") or []:
+        tables["bfd_neighbors"].append(
+            ids + (bfd["peer"], bfd["intf"]) + _values(bfd, BFD_KEYS)
+        )
+    tables["counters"].extend(_counter_rows(ids, facts.get("OSPF_TRAF")))
+
+
+def store_run(conn, run, results):
+    """
+    Insert the results of one run, a dictionary mapping each host to a
+    dictionary of its OSPF_BASIC, OSPF_NBR, OSPF_DB, OSPF_TRAF, and BFD_NBR
+    facts, in a single transaction. Returns the run ID and the number of
+    rows inserted into each table, or None if the run is already stored.
+    """
+    tables = {name: [] for name in TABLES}
+    with conn:
+        if conn.execute("SELECT 1 FROM runs WHERE name = ?", (run,)).fetchone():
+            return None
+        run_id = conn.execute(
+            "INSERT INTO runs (name, time) VALUES (?, ?)", (run, time.time())
+        ).lastrowid
+        host_ids = _host_ids(conn, results)
+        for host, facts in results.items():
+            _host_rows(conn, (host_ids[host], run_id), facts, tables)
+
+        # Parsers never repeat a neighbor or counter, but if the same key
+        # appears twice, the first row is kept rather than losing the run
+        for name, rows in tables.items():
+            if rows:
+                marks = ", ".join("?" * len(rows[0]))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO {0} VALUES ({1})".format(name, marks), rows
+                )
+
+    return run_id, {name: len(rows) for name, rows in tables.items()}
+
+
+def main():
+    """
+    Execution starts here. Like the "nots_log" module, a run which is
+    already stored is never overwritten.
+    """
+    module = AnsibleModule(
+        argument_spec={
+            "path": {"type": "path", "required": True},
+            "run": {"type": "str"},
+            "hosts": {"type": "list", "required": True},
+            "basic": {"type": "list", "required": True},
+            "nbr": {"type": "list", "required": True},
+            "db": {"type": "list", "required": True},
+            "traf": {"type": "list", "required": True},
+            "bfd": {"type": "list", "required": True},
+        },
+        supports_check_mode=True,
+    )
+    params = module.params
+    facts = {
+        "OSPF_BASIC": params["basic"],
+        "OSPF_NBR": params["nbr"],
+        "OSPF_DB": params["db"],
+        "OSPF_TRAF": params["traf"],
+        "BFD_NBR": params["bfd"],
+    }
+    if any(len(values) != len(params["hosts"]) for values in facts.values()):
+        module.fail_json(msg="hosts and every results list must be the same length")
+    if module.check_mode:
+        module.exit_json(changed=False)
+
+    results = {
+        host: {name: values[index] for name, values in facts.items()}
+        for index, host in enumerate(params["hosts"])
+    }
+    run = params["run"] or time.strftime("%Y%m%dT%H%M%S")
+    conn = connect(params["path"])
+    try:
+        stored = store_run(conn, run, results)
+    finally:
+        conn.close()
+
+    if stored is None:
+        module.exit_json(changed=False, run=run)
+    module.exit_json(changed=True, run=run, run_id=stored[0], rows=stored[1])
+
+
+if __name__ == "__main__":
+    main()
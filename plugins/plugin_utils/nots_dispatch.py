@@ -0,0 +1,166 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the command routing used by the *_ospf_dispatch filters in
+plugins/filter/filter.py, which matches each command to its parser and
+parses the outputs in this process, in a process pool, or lazily.
+https://www.ansible.com/
+"""
+
+import collections.abc
+import concurrent.futures
+import functools
+import multiprocessing
+import re
+
+# Each platform maps to a list of (command regex, fact name, filter name)
+# routes, using the same fact names as devices/<platform>/main.yml. Commands
+# without a route, such as "show version", are not parsed.
+ROUTES = {
+    "ios": [
+        (r"show ip ospf \d+$", "OSPF_BASIC", "ios_ospf_basic"),
+        (r"show ip ospf \d+ neighbor$", "OSPF_NBR", "ios_ospf_neighbor"),
+        (r"show ip ospf \d+ database database-summary$", "OSPF_DB", "ios_ospf_dbsum"),
+        (r"show ip ospf \d+ traffic$", "OSPF_TRAF", "ios_ospf_traffic"),
+        (r"show bfd neighbor client ospf$", "BFD_NBR", "ios_bfd_neighbor"),
+        (r"show ip ospf \d+ fast-reroute$", "OSPF_FRR", "ios_ospf_frr"),
+    ],
+    "iosxr": [
+        (r"show ospf \d+$", "OSPF_BASIC", "iosxr_ospf_basic"),
+        (r"show ospf \d+ neighbor area-sorted$", "OSPF_NBR", "iosxr_ospf_neighbor"),
+        (r"show ospf \d+ database database-summary$", "OSPF_DB", "ios_ospf_dbsum"),
+        (r"show ospf \d+ statistics interface$", "OSPF_TRAF", "iosxr_ospf_traffic"),
+    ],
+    "nxos": [
+        (r"show ip ospf \d+( \| (json|xml))?$", "OSPF_BASIC", "nxos_ospf_basic"),
+        (
+            r"show ip ospf \d+ neighbor( \| (json|xml))?$",
+            "OSPF_NBR",
+            "nxos_ospf_neighbor",
+        ),
+        (
+            r"show ip ospf \d+ database database-summary( \| (json|xml))?$",
+            "OSPF_DB",
+            "nxos_ospf_dbsum",
+        ),
+        (r"show ip ospf \d+ traffic( \| (json|xml))?$", "OSPF_TRAF", "nxos_ospf_traffic"),
+    ],
+}
+
+# Filters accepting the "engine" keyword argument
+ENGINE_FILTERS = ("ios_ospf_traffic", "iosxr_ospf_traffic")
+
+# Compiled routes, created on first use for each platform
+ROUTE_TABLES = {}
+
+# Outputs at least this long are parsed in a process pool, when enabled
+PARALLEL_CHARS = 512 * 1024
+
+
+class LazyResults(collections.abc.Mapping):
+    """
+    Dispatch results which are parsed on first access. Each fact maps to
+    the filter name, text, and keyword arguments of its parser, which are
+    only passed to the parse function when the fact is read, after which
+    the result is kept. Facts never read in a template are never parsed.
+    The proxy is a read-only mapping, so Jinja and the to_json filter treat
+    it as a dictionary, and it pickles as a plain dictionary of every
+    result, so it can be returned from a worker process. Ansible converts any other
+    type to a plain dictionary when storing it as a fact, which parses
+    everything, so the facts in use should be read in the same template.
+    """
+
+    def __init__(self, jobs, parse):
+        self._jobs = {job[0]: job[1:] for job in jobs}
+        self._parse = parse
+        self._results = {}
+
+    def __getitem__(self, fact):
+        if fact not in self._results:
+            self._results[fact] = self._parse(*self._jobs[fact])
+        return self._results[fact]
+
+    def __iter__(self):
+        return iter(self._jobs)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+    def parsed(self):
+        """
+        Return the list of facts parsed so far, in the order read.
+        """
+        return list(self._results)
+
+
+def routes(platform):
+    """
+    Return the list of (compiled regex, fact name, filter name) routes for
+    a platform, compiling them on first use.
+    """
+    if platform not in ROUTE_TABLES:
+        ROUTE_TABLES[platform] = [
+            (re.compile(cmd), fact, name) for cmd, fact, name in ROUTES[platform]
+        ]
+    return ROUTE_TABLES[platform]
+
+
+def dispatch(platform, outputs, commands, traffic_engine="regex"):
+    """
+    Return the list of (fact name, filter name, text, keyword arguments)
+    jobs to parse, matching each command to a parser using the platform's
+    ROUTES, so outputs are not identified by their position in the list.
+    Commands without a route are skipped.
+    """
+    if len(outputs) != len(commands):
+        raise ValueError(
+            "{0} outputs do not match {1} commands".format(len(outputs), len(commands))
+        )
+
+    jobs = []
+    for command, output in zip(commands, outputs):
+        for regex, fact, name in routes(platform):
+            if regex.match(command.strip()):
+                kwargs = {"engine": traffic_engine} if name in ENGINE_FILTERS else {}
+                jobs.append((fact, name, output, kwargs))
+                break
+
+    return jobs
+
+
+def parse_jobs(jobs, parse, workers=0, lazy=False):
+    """
+    Parse a list of jobs from dispatch by calling parse with the filter
+    name, text, keyword arguments, and workers of each job, and return a
+    dictionary of results keyed by fact name. When workers is positive and
+    more than one output is at least PARALLEL_CHARS long, those outputs are
+    parsed in a pool of up to that many processes while the rest are parsed
+    in this process. When lazy is true, nothing is parsed yet and
+    LazyResults is returned instead, which parses each output in this
+    process when its fact is first read, still passing workers to parse.
+    """
+    if lazy:
+        return LazyResults(jobs, functools.partial(parse, workers=workers))
+
+    large = [job for job in jobs if workers and len(job[2]) >= PARALLEL_CHARS]
+    if len(large) < 2:
+        # A single large database summary can still be parsed in shards
+        return {job[0]: parse(*job[1:], workers) for job in jobs}
+
+    # Fork so the pool inherits the filter module as loaded by Ansible
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=min(workers, len(large)),
+        mp_context=multiprocessing.get_context("fork"),
+    ) as pool:
+        futures = {job[0]: pool.submit(parse, *job[1:]) for job in large}
+        results = {job[0]: parse(*job[1:]) for job in jobs if job[0] not in futures}
+        results.update((fact, future.result()) for fact, future in futures.items())
+
+    return results
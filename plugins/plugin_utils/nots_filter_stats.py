@@ -0,0 +1,261 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the optional filter instrumentation used by the filters in
+plugins/filter/, which records the wall time, input size, and number of
+records of each call and reports them per filter and host, along with the
+parse cache counters.
+https://www.ansible.com/
+"""
+
+import cProfile
+import functools
+import json
+import os
+import time
+
+try:
+    import jinja2
+except ImportError:
+    jinja2 = None
+
+# Summary keys reported as Prometheus metrics, with metric name, type, and help
+FILTER_METRICS = [
+    ("calls", "calls_total", "counter", "Number of calls per filter and host"),
+    ("total_sec", "seconds_total", "counter", "Total wall time in seconds"),
+    ("max_sec", "seconds_max", "gauge", "Longest single call in seconds"),
+    ("input_bytes", "input_bytes_total", "counter", "Bytes of text input parsed"),
+    ("records", "records_total", "counter", "Records returned"),
+]
+
+# Parse cache counters reported as Prometheus metrics, with the same fields
+CACHE_METRICS = [
+    ("hits", "hits_total", "counter", "Results found in memory"),
+    ("disk_hits", "disk_hits_total", "counter", "Results found on disk"),
+    ("misses", "misses_total", "counter", "Results which were parsed"),
+    ("evictions", "evictions_total", "counter", "Results evicted from memory"),
+    ("disk_evictions", "disk_evictions_total", "counter", "Files evicted from disk"),
+    ("saved_sec", "saved_seconds_total", "counter", "Parse time saved by hits"),
+    ("hit_ratio", "hit_ratio", "gauge", "Share of lookups found in memory or disk"),
+]
+
+
+class FilterStats(object):
+    """
+    Optional per-filter instrumentation. Every call records the filter name,
+    the host whose variables were being templated, the wall time, the input
+    size in bytes, and the number of records returned. Ansible templates
+    each task in a short-lived worker process, so records are appended as
+    JSON lines to a spool file per process in the stats directory rather
+    than kept in memory, then summarized by report() at the end of the run.
+    Parse cache lookups are spooled the same way by count_cache().
+    Calls slower than profile_ms are repeated under cProfile and the profile
+    is saved in the "profiles" subdirectory for inspection with pstats.
+    """
+
+    def __init__(self, path, profile_ms=None):
+        self.path = path
+        self.profile_ms = profile_ms
+        self.profiles = 0
+        os.makedirs(os.path.join(path, "profiles"), exist_ok=True)
+
+    @staticmethod
+    def from_env(environ=None):
+        """
+        Return a FilterStats configured from environment variables, or None
+        if instrumentation is disabled (the default). NOTS_FILTER_STATS is
+        the directory of the spool files and report, such as
+        "logs/filter_stats", and the optional NOTS_FILTER_PROFILE_MS is the
+        wall time in milliseconds above which a call is profiled.
+        """
+        environ = os.environ if environ is None else environ
+        setting = environ.get("NOTS_FILTER_STATS")
+        if not setting:
+            return None
+
+        profile_ms = environ.get("NOTS_FILTER_PROFILE_MS")
+        return FilterStats(setting, float(profile_ms) if profile_ms else None)
+
+    def wrap(self, name, func):
+        """
+        Return a wrapper which times each call to func and records it. The
+        wrapper asks Jinja for the template context, which identifies the
+        host, but also accepts calls from Python without one.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            host = None
+            if jinja2 and args and isinstance(args[0], jinja2.runtime.Context):
+                host = args[0].get("inventory_hostname")
+                args = args[1:]
+
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            seconds = time.perf_counter() - start
+            entry = FilterStats.entry(name, host, seconds, args, result)
+            if self.profile_ms is not None and seconds * 1000 >= self.profile_ms:
+                entry["profile"] = self._profile(name, host, func, args, kwargs)
+            self.record(entry)
+            return result
+
+        return wrapper if not jinja2 else FilterStats._pass_context(wrapper)
+
+    @staticmethod
+    def _pass_context(func):
+        """
+        Mark a filter so that Jinja passes the template context as its first
+        argument, using the decorator of the installed Jinja version.
+        """
+        pass_context = getattr(jinja2, "pass_context", None)
+        # pylint: disable=no-member
+        return (pass_context or jinja2.contextfilter)(func)
+
+    @staticmethod
+    def entry(name, host, seconds, args, result):
+        """
+        Return the record of one call. Input bytes are only counted when
+        the first argument is text, and a result counts as one record
+        unless it is a list.
+        """
+        data = args[0] if args else None
+        return {
+            "filter": name,
+            "host": host,
+            "sec": seconds,
+            "bytes": len(data.encode("utf-8")) if isinstance(data, str) else 0,
+            "records": len(result) if isinstance(result, (list, tuple)) else 1,
+        }
+
+    def record(self, entry):
+        """
+        Append the record of one call to this process's spool file.
+        """
+        filename = os.path.join(self.path, "calls-{0}.jsonl".format(os.getpid()))
+        with open(filename, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry) + "\n")
+
+    def count_cache(self, name, cache, func):
+        """
+        Return a wrapper around func, a parser wrapped by cache, which
+        appends the cache counters changed by each call to this process's
+        cache spool file, since the counters of a ParseCache only live as
+        long as the Ansible worker process.
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            before = dict(cache.counters)
+            result = func(*args, **kwargs)
+            changed = {
+                key: value - before[key]
+                for key, value in cache.counters.items()
+                if value != before[key]
+            }
+            if changed:
+                filename = os.path.join(self.path, "cache-{0}.jsonl".format(os.getpid()))
+                with open(filename, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(dict(changed, filter=name)) + "\n")
+            return result
+
+        return wrapper
+
+    def _profile(self, name, host, func, args, kwargs):
+        """
+        Repeat a slow call under cProfile, discarding the result, and save
+        the profile. Returns the path of the profile file.
+        """
+        self.profiles += 1
+        filename = os.path.join(
+            self.path,
+            "profiles",
+            "{0}-{1}-{2}-{3}.prof".format(name, host, os.getpid(), self.profiles),
+        )
+        profiler = cProfile.Profile()
+        profiler.runcall(func, *args, **kwargs)
+        profiler.dump_stats(filename)
+        return filename
+
+    @staticmethod
+    def summarize(path, slowest=10):
+        """
+        Read every spool file in the stats directory and return a dictionary
+        with a "filters" list, holding the call count, total and maximum
+        wall time, input bytes, and records for each filter and host, a
+        "slowest" list of the slowest individual calls, and a "cache"
+        dictionary of parse cache counters summed over every process, with
+        the hit ratio. The lists are empty and the counters zero when the
+        directory is empty or missing, or path is empty, as when
+        instrumentation was disabled for the run.
+        """
+        totals = {}
+        calls = []
+        cache = {key: 0 for key, _, _, _ in CACHE_METRICS}
+        for entry in os.scandir(path) if path and os.path.isdir(path) else []:
+            if entry.name.startswith("cache-") and entry.name.endswith(".jsonl"):
+                with open(entry.path, "r", encoding="utf-8") as handle:
+                    for line in handle:
+                        for key, value in json.loads(line).items():
+                            if key in cache:
+                                cache[key] += value
+                continue
+            if not (entry.name.startswith("calls-") and entry.name.endswith(".jsonl")):
+                continue
+            with open(entry.path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    call = json.loads(line)
+                    calls.append(call)
+                    stats = totals.setdefault(
+                        (call["filter"], call["host"] or ""),
+                        {"calls": 0, "total_sec": 0.0, "max_sec": 0.0},
+                    )
+                    stats["calls"] += 1
+                    stats["total_sec"] += call["sec"]
+                    stats["max_sec"] = max(stats["max_sec"], call["sec"])
+                    stats["input_bytes"] = stats.get("input_bytes", 0) + call["bytes"]
+                    stats["records"] = stats.get("records", 0) + call["records"]
+
+        # Same hit ratio as ParseCache.stats(), but over every process
+        lookups = cache["hits"] + cache["disk_hits"] + cache["misses"]
+        cache["hit_ratio"] = round((lookups - cache["misses"]) / (lookups or 1), 4)
+        cache["saved_sec"] = round(cache["saved_sec"], 6)
+        calls.sort(key=lambda call: call["sec"], reverse=True)
+        return {
+            "filters": [
+                dict(stats, filter=name, host=host)
+                for (name, host), stats in sorted(totals.items())
+            ],
+            "slowest": calls[:slowest],
+            "cache": cache,
+        }
+
+    @staticmethod
+    def report(path, fmt="json"):
+        """
+        Return the summary of the stats directory as JSON text, or as text
+        in the Prometheus exposition format when fmt is "prometheus".
+        """
+        summary = FilterStats.summarize(path)
+        if fmt == "json":
+            return json.dumps(summary, indent=2, sort_keys=True)
+        if fmt != "prometheus":
+            raise ValueError("fmt must be json or prometheus, not {0}".format(fmt))
+
+        lines = []
+        for key, name, kind, text in FILTER_METRICS:
+            metric = "nots_filter_" + name
+            lines.append("# HELP {0} {1}".format(metric, text))
+            lines.append("# TYPE {0} {1}".format(metric, kind))
+            for stats in summary["filters"]:
+                labels = 'filter="{0}",host="{1}"'.format(
+                    stats["filter"],
+                    stats["host"].replace("\\", "\\\\").replace('"', '\\"'),
+                )
+                lines.append("{0}{{{1}}} {2}".format(metric, labels, stats[key]))
+        for key, name, kind, text in CACHE_METRICS:
+            metric = "nots_parse_cache_" + name
+            lines.append("# HELP {0} {1}".format(metric, text))
+            lines.append("# TYPE {0} {1}".format(metric, kind))
+            lines.append("{0} {1}".format(metric, summary["cache"][key]))
+        return "\n".join(lines) + "\n"
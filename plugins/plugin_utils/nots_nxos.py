@@ -0,0 +1,303 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the reading of NX-OS structured output, "| json" or "| xml",
+used by the nxos_ospf_* filters in plugins/filter/filter.py, which returns
+the same keys as parsing the text output. Neighbor uptimes differ: they are
+ISO 8601 durations, such as "P1Y2W3DT4H" where text has "1y2w3d4h", and
+uptime_sec always holds their seconds, where text gives 0 beyond one day.
+https://www.ansible.com/
+"""
+
+import ipaddress
+import json
+
+# Only used for NX-OS "| xml" output, which is checked for a DTD first
+from xml.etree import ElementTree  # nosec B405
+
+from nots_parsing import PATTERNS
+
+# NX-API keys of NX-OS "| json" and "| xml" output, as lists of (parser key,
+# NX-API key) in the order of the keys returned when parsing text. Each
+# process is a ROW_ctx of TABLE_ctx, and the areas and neighbors of each
+# process are ROW_area and ROW_nbr rows of TABLE_area and TABLE_nbr.
+NXOS_KEYS = {
+    "basic": [("id", "ptag"), ("rid", "rid"), ("ref_bw", "ref_bw")],
+    "basic_spf": [
+        ("init_spf", "spf_start_time"),
+        ("min_spf", "spf_hold_time"),
+        ("max_spf", "spf_max_time"),
+    ],
+    "basic_flags": [
+        ("is_abr", "is_abr"),
+        ("is_asbr", "is_asbr"),
+        ("is_stub_rtr", "max_metric_adver"),
+    ],
+    "basic_area": [("id_dd", "aname"), ("num_intfs", "if_cnt")],
+    "neighbor": [
+        ("rid", "rid"),
+        ("priority", "priority"),
+        ("state", "state"),
+        ("role", "drstate"),
+        ("uptime", "uptime"),
+        ("peer", "addr"),
+        ("intf", "intf"),
+    ],
+    "dbsum": [
+        ("process_id", "ptag"),
+        ("total_lsa1", "router_cnt"),
+        ("total_lsa2", "network_cnt"),
+        ("total_lsa3", "sum_net_cnt"),
+        ("total_lsa4", "sum_asbr_cnt"),
+        ("total_lsa5", "type5_cnt"),
+        ("total_lsa7", "type7_cnt"),
+    ],
+    "dbsum_area": [
+        ("id", "aname"),
+        ("num_lsa1", "router_cnt"),
+        ("num_lsa2", "network_cnt"),
+        ("num_lsa3", "sum_net_cnt"),
+        ("num_lsa4", "sum_asbr_cnt"),
+        ("num_lsa7", "type7_cnt"),
+    ],
+    "traffic": [
+        ("pid", "ptag"),
+        ("ignore_lsa", "ignored_lsas"),
+        ("lsa_drop_spf", "lsas_dropped_spf"),
+        ("lsa_drop_gr", "lsas_dropped_gr"),
+        ("drops_in", "drops_in"),
+        ("drops_out", "drops_out"),
+        ("errors_in", "errors_in"),
+        ("errors_out", "errors_out"),
+        ("hellos_in", "hellos_in"),
+        ("dbds_in", "dbds_in"),
+        ("lsreq_in", "lsreq_in"),
+        ("lsu_in", "lsu_in"),
+        ("lsacks_in", "lsacks_in"),
+        ("unk_in", "unknown_in"),
+        ("unk_out", "unknown_out"),
+        ("no_ospf", "no_ospf"),
+        ("bad_ver", "bad_version"),
+        ("bad_crc", "bad_crc"),
+        ("dup_rid", "dup_rid"),
+        ("dup_src", "dup_src"),
+        ("inv_src", "invalid_src"),
+        ("inv_dst", "invalid_dst"),
+        ("no_nbr", "no_nbr"),
+        ("passive", "passive"),
+        ("wrong_area", "wrong_area"),
+        ("pkt_len", "pkt_length"),
+        ("nbr_change", "nbr_changed"),
+        ("bad_auth", "bad_auth"),
+        ("no_vrf", "no_vrf"),
+    ],
+}
+
+# Structured XML output is read in chunks of this many characters
+XML_CHUNK_CHARS = 64 * 1024
+
+
+def nxos_contexts(data):
+    """
+    Helper function which returns the list of process rows (ROW_ctx)
+    of NX-OS structured output: "| json" output as text or as the
+    dictionary returned by nxos_command, or "| xml" output as text.
+    Returns None for any other input, which is then parsed as text,
+    including text which cannot be decoded.
+    """
+    if isinstance(data, str):
+        text = data.strip()
+        try:
+            if text.startswith("{"):
+                data = json.loads(text)
+            elif text.startswith("<"):
+                data = _xml_to_dict(text)
+        except (ValueError, ElementTree.ParseError):
+            return None
+
+    nodes = [data] if isinstance(data, dict) else []
+    while nodes:
+        node = nodes.pop()
+        if "TABLE_ctx" in node:
+            return nxos_rows(node, "ctx")
+        nodes.extend(value for value in node.values() if isinstance(value, dict))
+
+    return None
+
+
+def _xml_to_dict(text):
+    """
+    Helper function which decodes XML text into nested dictionaries in
+    the same form as NX-OS JSON output. Elements with children become
+    dictionaries and other elements become their text, except that ROW_
+    elements always become lists. The text is fed to a pull parser in
+    chunks and each element is cleared once read, so the element tree is
+    never held in memory. XML with a DTD is rejected to prevent entity
+    expansion attacks.
+    """
+    if "<!DOCTYPE" in text or "<!ENTITY" in text:
+        raise ElementTree.ParseError("XML with a DTD is not supported")
+
+    # NX-OS ends XML output with the NETCONF end of message marker
+    if text.endswith("]]>]]>"):
+        text = text[:-6]
+
+    parser = ElementTree.XMLPullParser(("start", "end"))
+    stack = [{}]
+    for start in range(0, len(text), XML_CHUNK_CHARS):
+        parser.feed(text[start : start + XML_CHUNK_CHARS])
+        _xml_events(parser, stack)
+    parser.close()
+    _xml_events(parser, stack)
+    return stack[0]
+
+
+def _xml_events(parser, stack):
+    """
+    Helper function which adds the elements read by the pull parser since
+    the last call to the stack of dictionaries being built.
+    """
+    for event, elem in parser.read_events():
+        if event == "start":
+            stack.append({})
+            continue
+
+        node = stack.pop()
+        tag = elem.tag.rsplit("}", 1)[-1]
+        value = node or (elem.text or "").strip()
+        if tag.startswith("ROW_"):
+            stack[-1].setdefault(tag, []).append(value)
+        else:
+            stack[-1][tag] = value
+        elem.clear()
+
+
+def nxos_rows(node, name):
+    """
+    Helper function which returns the list of ROW_<name> rows from the
+    TABLE_<name> of a structured output node. NX-OS JSON output holds a
+    single row as a dictionary rather than a list of one.
+    """
+    table = node.get("TABLE_" + name)
+    rows = table.get("ROW_" + name, []) if isinstance(table, dict) else []
+    return rows if isinstance(rows, list) else [rows]
+
+
+def nxos_record(row, keys):
+    """
+    Helper function which returns a dictionary of the values of a
+    structured output row for a list of (parser key, NX-API key) tuples
+    from NXOS_KEYS, with whole numbers converted to integers. Missing
+    values are None. Unlike _try_int, which raises and catches an
+    exception for every non-numeric value, the digits are checked first,
+    since most rows hold as many names and addresses as counters.
+    """
+    record = {}
+    for key, nx_key in keys:
+        value = row.get(nx_key)
+        if isinstance(value, str) and value.lstrip("-").isdecimal():
+            value = int(value)
+        record[key] = value
+    return record
+
+
+def _nxos_flag(value):
+    """
+    Helper function which returns True when a structured output value is
+    "true", in any case, and False otherwise.
+    """
+    return str(value).lower() == "true"
+
+
+def _nxos_seconds(value):
+    """
+    Helper function which returns the number of seconds in an ISO 8601
+    duration, such as "P1DT2H3M4S", which NX-OS structured output uses
+    for times, or None if the value is not a duration. Years count as
+    365 days and months as 30 days.
+    """
+    pattern = r"""
+        P(?:(?P<y>\d+)Y)?(?:(?P<mo>\d+)M)?(?:(?P<w>\d+)W)?(?:(?P<d>\d+)D)?
+        (?:T(?:(?P<h>\d+)H)?(?:(?P<mi>\d+)M)?(?:(?P<s>\d+(?:\.\d+)?)S)?)?
+    """
+    value = str(value)
+    if not value.startswith("P"):
+        return None
+
+    match = PATTERNS.compile("nxos_structured.duration", pattern).fullmatch(value)
+    if not match:
+        return None
+
+    units = {"y": 31536000, "mo": 2592000, "w": 604800, "d": 86400, "h": 3600}
+    units.update({"mi": 60, "s": 1})
+    parts = match.groupdict()
+    return sum(float(parts[unit]) * secs for unit, secs in units.items() if parts[unit])
+
+
+def _nxos_msecs(value):
+    """
+    Helper function which returns a structured output time in whole
+    milliseconds, from either a duration or a number of milliseconds
+    such as "200.000", or None when missing.
+    """
+    seconds = _nxos_seconds(value)
+    if seconds is not None:
+        return int(round(seconds * 1000))
+    if value is None:
+        return None
+
+    value = str(value).split(".", 1)[0]
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def nxos_structured_basic(contexts):
+    """
+    Helper function which returns the nxos_ospf_basic dictionary of the
+    first process of structured output. As with text, a missing process
+    leaves {"process": None} in place of the process fields.
+    """
+    context = contexts[0] if contexts else {}
+    process = {"process": None}
+    if context:
+        process = nxos_record(context, NXOS_KEYS["basic"])
+        for key, nx_key in NXOS_KEYS["basic_spf"]:
+            process[key] = _nxos_msecs(context.get(nx_key))
+    for key, nx_key in NXOS_KEYS["basic_flags"]:
+        process[key] = _nxos_flag(context.get(nx_key))
+
+    areas = []
+    for row in nxos_rows(context, "area"):
+        area = nxos_record(row, NXOS_KEYS["basic_area"])
+        area["type"] = "standard"
+        for area_type in ("stub", "nssa"):
+            if _nxos_flag(row.get(area_type)):
+                area["type"] = area_type
+        area["id"] = int(ipaddress.IPv4Address(area["id_dd"]))
+        areas.append(area)
+
+    return {"process": process, "areas": areas}
+
+
+def nxos_structured_neighbors(contexts):
+    """
+    Helper function which returns the nxos_ospf_neighbor list of
+    dictionaries of structured output. The uptime key holds the ISO 8601
+    duration as read, not the text format, and uptime_sec holds its seconds.
+    """
+    neighbors = []
+    for context in contexts:
+        for row in nxos_rows(context, "nbr"):
+            nbr = nxos_record(row, NXOS_KEYS["neighbor"])
+            nbr["role"] = nbr["role"] or "-"
+            for key in ("state", "role", "intf"):
+                if isinstance(nbr[key], str):
+                    nbr[key] = nbr[key].lower()
+            seconds = _nxos_seconds(nbr["uptime"])
+            nbr["uptime_sec"] = int(seconds) if seconds is not None else 0
+            neighbors.append(nbr)
+
+    return neighbors
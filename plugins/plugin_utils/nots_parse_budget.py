@@ -0,0 +1,116 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the optional parse time budget used by the parsing filters in
+plugins/filter/filter.py, which stops one parser call from running longer
+than the budget and returns an empty result instead.
+https://www.ansible.com/
+"""
+
+import collections
+import functools
+import os
+import signal
+import threading
+import warnings
+
+try:
+    from ansible.utils.display import Display
+except ImportError:
+    Display = None
+
+
+class ParseTimeout(Exception):
+    """
+    Raised by a parser wrapped with ParseBudget.limit when it runs out of
+    time, and turned into an empty result by ParseBudget.fallback.
+    """
+
+
+class ParseBudget(object):
+    """
+    Optional wall time budget for each parser call, which stops truncated
+    or malformed output from one device holding up a whole fork. Each call
+    arms a SIGALRM interval timer whose handler raises ParseTimeout, which
+    the regular expression engine checks for periodically, so no process is
+    created per call. The parser then returns the same empty result as for
+    output with nothing to match, and a warning is displayed. Signals are
+    only handled by the main thread, so calls in other threads, or while
+    another timer is already armed (such as an Ansible task timeout), are
+    not limited.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expired = collections.Counter()
+
+    @staticmethod
+    def from_env(environ=None):
+        """
+        Return a ParseBudget configured from environment variables, or None
+        if there is no budget (the default). NOTS_PARSE_BUDGET_MS is the
+        wall time in milliseconds allowed for each parser call.
+        """
+        environ = os.environ if environ is None else environ
+        setting = environ.get("NOTS_PARSE_BUDGET_MS")
+        if not setting:
+            return None
+
+        return ParseBudget(float(setting) / 1000)
+
+    def limit(self, name, func):
+        """
+        Return a wrapper which calls func with an interval timer armed for
+        the budget and raises ParseTimeout if the timer expires first. The
+        previous SIGALRM handler is restored after every call.
+        """
+
+        def expire(signum, frame):
+            # pylint: disable=unused-argument
+            raise ParseTimeout(
+                "{0} exceeded its {1:.0f} ms budget".format(name, self.seconds * 1000)
+            )
+
+        @functools.wraps(func)
+        def wrapper(text, *args, **kwargs):
+            if (
+                threading.current_thread() is not threading.main_thread()
+                or signal.getitimer(signal.ITIMER_REAL)[0]
+            ):
+                return func(text, *args, **kwargs)
+
+            previous = signal.signal(signal.SIGALRM, expire)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+            try:
+                return func(text, *args, **kwargs)
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous)
+
+        return wrapper
+
+    def fallback(self, name, func, parser):
+        """
+        Return a wrapper which returns the result of parser for empty text,
+        with the same arguments, and displays a warning when func raises
+        ParseTimeout. Wrapping the parse cache with this, rather than the
+        parser, means empty results are never cached.
+        """
+
+        @functools.wraps(func)
+        def wrapper(text, *args, **kwargs):
+            try:
+                return func(text, *args, **kwargs)
+            except ParseTimeout as exc:
+                self.expired[name] += 1
+                message = "{0} on {1} characters; returning an empty result".format(
+                    exc, len(text)
+                )
+                if Display:
+                    Display().warning(message)
+                else:
+                    warnings.warn(message, RuntimeWarning)
+                return parser("", *args, **kwargs)
+
+        return wrapper
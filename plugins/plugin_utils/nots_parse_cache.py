@@ -0,0 +1,238 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the optional parse cache used by the parsing filters in
+plugins/filter/filter.py, which stores parser results by the hash of their
+input text so identical CLI output is only parsed once.
+https://www.ansible.com/
+"""
+
+import collections
+import functools
+import hashlib
+import inspect
+import json
+import os
+import time
+
+
+def _named_args(signature, text, args, kwargs):
+    """
+    Return the positional and keyword arguments of a parser call after the
+    text as one dictionary of keyword arguments, using the parser's
+    signature, so that ios_ospf_traffic('stream') and
+    ios_ospf_traffic(engine='stream') are cached the same way.
+    Invalid arguments raise a TypeError, as calling the parser would.
+    """
+    named = dict(signature.bind(text, *args, **kwargs).arguments)
+    del named[next(iter(signature.parameters))]
+    return named
+
+
+class ParseCache(object):
+    """
+    Optional content-addressed cache of parser results. Each result is keyed
+    by the filter name, the parser version, any keyword arguments, and a
+    hash of the input text, so identical CLI output is only parsed once.
+    Results are stored as JSON text in a bounded in-memory LRU and, when a
+    directory is given, also as one file per key on disk. The disk store is
+    shared between Ansible worker processes and later playbook runs, and
+    the oldest files are evicted once the total size exceeds max_bytes.
+    """
+
+    def __init__(
+        self, path=None, max_entries=256, max_bytes=64 * 1024 * 1024, version=""
+    ):
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory = collections.OrderedDict()
+        self._disk_bytes = None
+        self.counters = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "saved_sec": 0.0,
+        }
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def from_env(environ=None, version=""):
+        """
+        Return a ParseCache for the parser version configured from
+        environment variables, or None if caching is disabled (the
+        default). NOTS_PARSE_CACHE is either "memory" for an in-memory
+        cache only, or the directory of the on-disk store, such as
+        "logs/parse_cache". The optional
+        NOTS_PARSE_CACHE_ENTRIES and NOTS_PARSE_CACHE_MB variables bound the
+        number of in-memory entries and the size of the disk store.
+        """
+        environ = os.environ if environ is None else environ
+        setting = environ.get("NOTS_PARSE_CACHE")
+        if not setting:
+            return None
+
+        return ParseCache(
+            path=None if setting == "memory" else setting,
+            max_entries=int(environ.get("NOTS_PARSE_CACHE_ENTRIES", 256)),
+            max_bytes=int(environ.get("NOTS_PARSE_CACHE_MB", 64)) * 1024 * 1024,
+            version=version,
+        )
+
+    def key(self, name, text, kwargs=None):
+        """
+        Return the cache key for a filter name, input text, and optional
+        keyword arguments. The parser version is included so that results
+        cached by an older version of the parsers are never returned.
+        """
+        digest = hashlib.sha256(text.encode("utf-8"))
+        for arg, value in sorted((kwargs or {}).items()):
+            digest.update("\0{0}={1}".format(arg, value).encode("utf-8"))
+        return "{0}-{1}-{2}".format(name, self.version, digest.hexdigest())
+
+    def get(self, key):
+        """
+        Return a fresh copy of the cached result for key, or None on a
+        miss. Disk hits are promoted into memory and their modification
+        time is updated so eviction removes the least recently used files.
+        """
+        entry = self._memory.get(key)
+        if entry:
+            self._memory.move_to_end(key)
+            self.counters["hits"] += 1
+        elif self.path:
+            filename = os.path.join(self.path, key + ".json")
+            try:
+                with open(filename, "r", encoding="utf-8") as handle:
+                    entry = json.load(handle)
+                os.utime(filename)
+            except (OSError, ValueError):
+                entry = None
+            if entry:
+                self._remember(key, entry)
+                self.counters["disk_hits"] += 1
+
+        if not entry:
+            self.counters["misses"] += 1
+            return None
+
+        self.counters["saved_sec"] += entry["sec"]
+        return json.loads(entry["data"])
+
+    def put(self, key, result, seconds=0.0):
+        """
+        Store a result under key, along with the time it took to parse,
+        which is used to estimate the time saved by later hits.
+        """
+        entry = {"data": json.dumps(result), "sec": seconds}
+        self._remember(key, entry)
+        if self.path:
+            self._write(key, entry)
+
+    def stats(self):
+        """
+        Return the hit and miss counters for this process, along with the
+        hit ratio and the number of entries currently in memory.
+        """
+        stats = dict(self.counters)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / (lookups or 1), 4)
+        stats["saved_sec"] = round(stats["saved_sec"], 6)
+        stats["entries"] = len(self._memory)
+        return stats
+
+    def wrap(self, name, func):
+        """
+        Return a wrapper which returns results of the parser func from this
+        cache when the same text was parsed before.
+        """
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(text, *args, **kwargs):
+            # Positional arguments are keyed the same as keyword arguments
+            kwargs = _named_args(signature, text, args, kwargs)
+
+            # Compact and columnar results are not JSON serializable, so are
+            # never cached, and neither is already structured input
+            if (
+                kwargs.get("compact")
+                or kwargs.get("columnar")
+                or not isinstance(text, str)
+            ):
+                return func(text, **kwargs)
+
+            # The number of workers does not change the result
+            key_args = {arg: val for arg, val in kwargs.items() if arg != "workers"}
+            key = self.key(name, text, key_args)
+            result = self.get(key)
+            if result is None:
+                start = time.perf_counter()
+                result = func(text, **kwargs)
+                self.put(key, result, time.perf_counter() - start)
+            return result
+
+        return wrapper
+
+    def _remember(self, key, entry):
+        """
+        Add an entry to the in-memory LRU, evicting the least recently used
+        entries beyond max_entries.
+        """
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def _write(self, key, entry):
+        """
+        Write an entry to the disk store atomically, so concurrent Ansible
+        workers never read a partial file, then evict if needed.
+        """
+        filename = os.path.join(self.path, key + ".json")
+        temp = "{0}.{1}.tmp".format(filename, os.getpid())
+        with open(temp, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle)
+        os.replace(temp, filename)
+
+        if self._disk_bytes is None:
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+        else:
+            self._disk_bytes += os.path.getsize(filename)
+        if self._disk_bytes > self.max_bytes:
+            self._evict_disk()
+
+    def _disk_files(self):
+        """
+        Return a list of (mtime, size, path) tuples for every cached file.
+        """
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def _evict_disk(self):
+        """
+        Remove the least recently used files until the disk store is
+        below 75% of max_bytes, leaving room for new entries before the
+        next (relatively expensive) directory scan.
+        """
+        files = sorted(self._disk_files())
+        self._disk_bytes = sum(size for _, size, _ in files)
+        for _, size, filename in files:
+            if self._disk_bytes <= self.max_bytes * 0.75:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+            self.counters["disk_evictions"] += 1
@@ -0,0 +1,474 @@
+#!/usr/bin/python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+File contains the pattern registry and the helper functions shared by the
+parsing filters in plugins/filter/filter.py, which read regex matches into
+dictionaries, compact records, or numpy columns.
+https://www.ansible.com/
+"""
+
+import collections
+import concurrent.futures
+import multiprocessing
+import re
+import socket
+import sys
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class PatternRegistry(object):
+    """
+    Stores compiled regular expressions by name so that each parser pattern
+    is compiled only once per process (on first use) rather than on every
+    filter invocation. The compile cost and number of uses for each pattern
+    are recorded to support simple introspection and benchmarking.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def compile(self, name, pattern, flags=0):
+        """
+        Return the compiled regex registered under name, compiling it with
+        re.VERBOSE plus any extra flags if this is the first use. Names are
+        in the format "<filter>.<section>" and must be unique per pattern.
+        """
+        entry = self._entries.get(name)
+        if not entry:
+            start = time.perf_counter()
+            regex = re.compile(pattern, re.VERBOSE + flags)
+            entry = {
+                "regex": regex,
+                "compile_usec": round((time.perf_counter() - start) * 1e6, 1),
+                "uses": 0,
+            }
+            self._entries[name] = entry
+
+        entry["uses"] += 1
+        return entry["regex"]
+
+    def describe(self):
+        """
+        Return a list of dictionaries, sorted by name, which describe each
+        registered pattern, its flags, its one-time compile cost in
+        microseconds, and how many times it has been used.
+        """
+        return [
+            {
+                "name": name,
+                "flags": int(entry["regex"].flags),
+                "groups": entry["regex"].groups,
+                "compile_usec": entry["compile_usec"],
+                "uses": entry["uses"],
+            }
+            for name, entry in sorted(self._entries.items())
+        ]
+
+    def clear(self):
+        """
+        Remove all compiled patterns, forcing recompilation on next use.
+        """
+        self._entries.clear()
+
+
+# Shared by all parsers; patterns are added on first use
+PATTERNS = PatternRegistry()
+
+# Keys holding IPv4 addresses, stored as integers in compact records
+IPV4_KEYS = ("rid", "peer")
+
+# Compact record types, created on first use for each set of fields
+COMPACT_TYPES = {}
+
+# Database summaries at least this long are split into shards parsed in a
+# process pool, when enabled
+SHARD_CHARS = 2 * 1024 * 1024
+
+# Header of each block matched by the named DOTALL patterns, whose ".*?"
+# spans would otherwise scan the rest of the text for every block when
+# the output is truncated or malformed (see _finditer)
+BLOCK_HEADERS = {
+    "ios_ospf_traffic.interface": r"Interface\s+[^s]",
+    "iosxr_ospf_traffic.interface": r"Interface\s+\S+\s+Process\s+ID",
+    "nxos_ospf_traffic.process": r"OSPF\s+Process\s+ID\s+\d",
+    "iosxr_ospf_basic.area": r"Area\s+(?:BACKBONE\()?\d",
+}
+
+
+class ParserHelpers(object):
+    """
+    Defines the helper functions of the parsing filters, which the filter
+    module inherits so they remain available as FilterModule._<name>.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    @staticmethod
+    def _read_match(match, key_filler_list=None):
+        """
+        Helper function which consumes a match object and an optional
+        list of keys to populate with None values if match is invalid.
+        Many operations follow this basic workflow, which iterates over
+        the items captured in the match, attempts to make them integers
+        whenever possible, and returns the resulting dict.
+        """
+        return_dict = None
+        if match:
+            return_dict = match.groupdict()
+            for key in return_dict.keys():
+                return_dict[key] = ParserHelpers._try_int(return_dict[key])
+        elif key_filler_list:
+            return_dict = {}
+            for key in key_filler_list:
+                return_dict.update({key: None})
+
+        return return_dict
+
+    @staticmethod
+    def _read_sections(name, text, sections, key_filler_list=None):
+        """
+        Helper function which reads the same fields as one DOTALL pattern
+        made of the section patterns joined by greedy ".*", but without its
+        backtracking, which rescans the rest of the text for every section.
+        The sections argument is a list of (section, pattern) tuples in the
+        order they appear in the text. The first section is matched at its
+        first occurrence and each later section is scanned forward once
+        from there. Working backwards from the last section, each section
+        uses its last match ending before the next one starts, which is the
+        match the greedy pattern would find. Fields are converted as in
+        _read_match, including the key_filler_list if nothing matches.
+        """
+        regexes = [
+            PATTERNS.compile("{0}.{1}".format(name, section), pattern)
+            for section, pattern in sections
+        ]
+        first = regexes[0].search(text)
+        chain = [first]
+        if first:
+            limit = len(text)
+            for regex in reversed(regexes[1:]):
+                matches = [
+                    m for m in regex.finditer(text, first.end()) if m.end() <= limit
+                ]
+                if not matches:
+                    return ParserHelpers._read_match(None, key_filler_list)
+                chain.insert(1, matches[-1])
+                limit = matches[-1].start()
+
+        return_dict = ParserHelpers._read_match(first, key_filler_list)
+        for match in chain[1:]:
+            return_dict.update(ParserHelpers._read_match(match))
+        return return_dict
+
+    @staticmethod
+    def _find_flags(text, flags):
+        """
+        Helper function which returns a dictionary mapping the key of each
+        (key, literal) tuple in flags to whether the literal appears in the
+        text. Each literal is found with str.find, and all of them together
+        take far less time than one regex scan for every literal at once,
+        since the regex engine visits each character in Python's C loop
+        while str.find skips ahead. For this reason, the basic parsers read
+        the process fields, these flags, and the areas in separate scans
+        rather than in a single scan (see tests/bench/bench_basic.py).
+        """
+        return {key: text.find(literal) != -1 for key, literal in flags}
+
+    @staticmethod
+    def _get_match_items(name, pattern, text, extra_flags=0, compact=False):
+        """
+        Helper function that can perform iterative block matching
+        given a pattern and input text. Additional regex flags (re.DOTALL, etc)
+        can be optionally specified. Any fields that can be parsed as
+        integers are converted and the list of dictionaries containing the
+        matches of each block is returned. The name identifies the pattern
+        in the shared registry so it is compiled only once. If compact is
+        true, compact records are returned instead of dictionaries.
+        """
+        regex = PATTERNS.compile(name, pattern, extra_flags)
+        items = [
+            match.groupdict() for match in ParserHelpers._finditer(name, regex, text)
+        ]
+        for item in items:
+            for key in item.keys():
+                item[key] = ParserHelpers._try_int(item[key])
+
+        return ParserHelpers._compact(items) if compact else items
+
+    @staticmethod
+    def _finditer(name, regex, text):
+        """
+        Helper function which returns the matches of a registered pattern in
+        the text, like regex.finditer. Patterns in BLOCK_HEADERS are instead
+        matched once at the start of each block, with the match ending
+        before the next block header at the latest, so a malformed block
+        cannot make a ".*?" span scan the rest of the text. Matches never
+        span block headers in well-formed output, so they are the same,
+        while a malformed block is skipped rather than joined to the next.
+        """
+        if name not in BLOCK_HEADERS:
+            return regex.finditer(text)
+
+        header = PATTERNS.compile(name + ".block", BLOCK_HEADERS[name])
+        starts = [match.start() for match in header.finditer(text)]
+        matches = [
+            regex.match(text, start, end)
+            for start, end in zip(starts, starts[1:] + [len(text)])
+        ]
+        return [match for match in matches if match]
+
+    @staticmethod
+    def _get_shard_items(name, pattern, text, workers=0):
+        """
+        Helper function which returns the same list as _get_match_items.
+        When workers is positive and the text is at least SHARD_CHARS long,
+        the text is split into one shard per worker at the start of "Area"
+        or "Process" database summary header lines, which no block spans.
+        The first shard is matched in this process while the others are
+        matched in a pool, and the blocks of each shard are then merged in
+        their original order.
+        """
+        shards = ParserHelpers._shards(text, workers) if len(text) >= SHARD_CHARS else []
+        if len(shards) < 2:
+            return ParserHelpers._get_match_items(name, pattern, text)
+
+        # Fork so the pool inherits this module as loaded by Ansible
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=len(shards) - 1, mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            futures = [
+                pool.submit(ParserHelpers._get_match_items, name, pattern, shard)
+                for shard in shards[1:]
+            ]
+            items = ParserHelpers._get_match_items(name, pattern, shards[0])
+            for future in futures:
+                items.extend(future.result())
+
+        return items
+
+    @staticmethod
+    def _shards(text, count):
+        """
+        Helper function which splits text into at most count shards of about
+        the same length, each ending just before a database summary header
+        line. Text without enough headers is split into fewer shards.
+        """
+        header = PATTERNS.compile(
+            "dbsum.shard",
+            r"^[ \t]*(?:Area|Process)[ \t]+\S+[ \t]+database[ \t]+summary",
+            re.MULTILINE,
+        )
+        bounds = [0]
+        for num in range(1, count):
+            match = header.search(text, max(len(text) * num // count, bounds[-1] + 1))
+            if not match:
+                break
+            bounds.append(match.start())
+
+        bounds.append(len(text))
+        return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    @staticmethod
+    def _compact(records):
+        """
+        Helper function which converts an iterable of dictionaries with the
+        same keys into a list of compact records. Each record is an
+        immutable namedtuple, which has no per-record dictionary, so the
+        keys are stored once per record type rather than once per record.
+        IPv4 addresses in the IPV4_KEYS fields are stored as integers and
+        all other strings are interned, so repeated values such as "full"
+        or "dr" are stored only once. Records still support attribute
+        access (record.peer) and are converted back using compact_to_dict.
+        """
+        compact_records = []
+        record_type = None
+        for record in records:
+            if not record_type:
+                fields = tuple(record)
+                record_type = COMPACT_TYPES.get(fields)
+                if not record_type:
+                    record_type = collections.namedtuple("CompactRecord", fields)
+                    COMPACT_TYPES[fields] = record_type
+
+            values = []
+            for key, value in record.items():
+                if key in IPV4_KEYS:
+                    value = int.from_bytes(socket.inet_aton(value), "big")
+                elif isinstance(value, str):
+                    value = sys.intern(value)
+                values.append(value)
+            compact_records.append(record_type._make(values))
+
+        return compact_records
+
+    @staticmethod
+    def _get_match_columns(name, pattern, text, extra_flags=0):
+        """
+        Helper function like _get_match_items, but which returns the
+        matches in columnar form. The captured strings of each group are
+        collected into one list per group and converted in bulk, so no
+        dictionary is built per match. The pattern must have at least two
+        groups, all of them named.
+        """
+        regex = PATTERNS.compile(name, pattern, extra_flags)
+        keys = sorted(regex.groupindex, key=regex.groupindex.get)
+        rows = [
+            match.group(*keys) for match in ParserHelpers._finditer(name, regex, text)
+        ]
+        return ParserHelpers._columnar(keys, rows)
+
+    @staticmethod
+    def _columnar(keys, rows):
+        """
+        Helper function which converts rows of values, in the same order as
+        keys, into a dictionary mapping each key to a NumPy array holding
+        that value from every row. Columns whose values are all integers
+        (or integer strings) become int64 arrays and all other columns
+        become string arrays. Returns an empty dictionary when there are no
+        rows. Columnar mode requires NumPy, which is an optional dependency.
+        """
+        if numpy is None:
+            raise ImportError("columnar mode requires numpy")
+
+        columns = {}
+        for key, column in zip(keys, zip(*rows)):
+            try:
+                columns[key] = numpy.array(column, dtype=numpy.int64)
+            except ValueError:
+                columns[key] = numpy.array(column, dtype=str)
+
+        return columns
+
+    @staticmethod
+    def _traffic_output(records, compact=False, columnar=False):
+        """
+        Helper function which returns the traffic records from a stream
+        engine generator as a list of dictionaries, compact records, or
+        columns, depending on the output mode.
+        """
+        if columnar:
+            records = list(records)
+            keys = list(records[0]) if records else []
+            return ParserHelpers._columnar(keys, [tuple(rec.values()) for rec in records])
+        return ParserHelpers._compact(records) if compact else list(records)
+
+    @staticmethod
+    def _check_output(compact, columnar):
+        """
+        Helper function which raises a ValueError when more than one
+        output mode is requested.
+        """
+        if compact and columnar:
+            raise ValueError("compact and columnar modes are mutually exclusive")
+
+    @staticmethod
+    def _stream_counters(name, text, header_pattern, sections):
+        """
+        Helper function that parses counter blocks as a generator by
+        matching counters by label, rather than running one large DOTALL
+        pattern which expects every counter in a fixed order. Each block
+        begins with a line matching header_pattern, whose named groups start
+        a new record. The sections argument maps each section heading line
+        (such as "OSPF header errors") to a list of (label, key) tuples for
+        the "Label <int>" counters in that section. Header and heading lines
+        are found by searching for their literal text, so only those lines
+        are visited in Python, and the counters of each section (up to the
+        next such line) are read with one findall. Once every key is
+        collected, the record is yielded with keys in the same order as the
+        equivalent regex-based parser and collection restarts at the next
+        header. Incomplete blocks are skipped. Runtime is linear in the size
+        of the text.
+        """
+        header = PATTERNS.compile(name + ".header", header_pattern)
+        label_maps = {heading: dict(pairs) for heading, pairs in sections.items()}
+        keys = list(header.groupindex)
+        for pairs in sections.values():
+            keys.extend([key for _, key in pairs])
+
+        # Each section ends at the next header or heading line, or the end
+        record = {}
+        section = None
+        literals = ["Interface"] + list(sections)
+        for line, start, end in ParserHelpers._marker_lines(literals, text):
+            match = header.match(line) if "Interface" in line else None
+            if not match and line.strip() not in label_maps:
+                continue
+
+            if record and section:
+                record.update(ParserHelpers._section_counters(text, section, start))
+                if len(record) == len(keys):
+                    yield {key: record[key] for key in keys}
+                    record = {}
+
+            record = ParserHelpers._read_match(match) if match else record
+            section = None if match else (label_maps[line.strip()], end)
+
+        if record and section:
+            record.update(ParserHelpers._section_counters(text, section, len(text)))
+            if len(record) == len(keys):
+                yield {key: record[key] for key in keys}
+
+    @staticmethod
+    def _marker_lines(literals, text):
+        """
+        Helper generator which yields (line, start, end) for each line of
+        text containing any of the literal strings, in order and without
+        visiting the other lines. Each literal is found with str.find,
+        which is much faster than a regex alternation of the literals. The
+        end is the position of the line's newline.
+        """
+        starts = set()
+        for literal in literals:
+            pos = text.find(literal)
+            while pos >= 0:
+                starts.add(text.rfind("\n", 0, pos) + 1)
+                pos = text.find(literal, pos + len(literal))
+        for start in sorted(starts):
+            end = text.find("\n", start)
+            end = len(text) if end < 0 else end
+            yield text[start:end], start, end
+
+    @staticmethod
+    def _section_counters(text, section, end):
+        """
+        Helper function which returns a dictionary of the "Label <int>"
+        counters in text from the start of a section to end, for each label
+        in the section's labels. The section is a (labels, start) tuple,
+        where labels maps each label to its record key. When a label
+        appears more than once, the last value is used.
+        """
+        counter = PATTERNS.compile(
+            "_stream_counters.counter",
+            r"(?P<label>[A-Za-z][A-Za-z/]*(?:\ +[A-Za-z/]+)*)[^\S\n]+(?P<value>\d+)",
+        )
+        labels, start = section
+        found = dict(counter.findall(text, start, end))
+        return {key: int(found[label]) for label, key in labels.items() if label in found}
+
+    @staticmethod
+    def _try_int(text):
+        """
+        Attempts to parse an integer from the input text. If it fails, just
+        return the text as it was passed in. This is useful for iterating
+        across structures with many integers which should be stored as
+        integers, not strings.
+        """
+        try:
+            return int(text)
+        except ValueError:
+            return text
+
+    @staticmethod
+    def _check_engine(engine, engines=("regex", "stream")):
+        """
+        Raises a ValueError if the parsing engine requested by the caller is
+        not one of the supported engines for a given filter.
+        """
+        if engine not in engines:
+            raise ValueError("engine {0} not in {1}".format(engine, engines))
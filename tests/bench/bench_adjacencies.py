@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the check_adjacencies filter on fleets generated by fleet.py,
+in which every adjacency is seen from both routers. Each fleet is checked
+as generated, then with three faults: a neighbor removed from one router,
+which leaves the other router's adjacency one-sided, a neighbor stuck in
+the "init" state, and a neighbor whose RID is changed to one not in the
+fleet. The indexed filter is compared to searching the fleet for the other
+end of each adjacency, which is only timed up to --naive-max hosts. The
+script exits non-zero if the filter does not find exactly these faults.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import fleet
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from checks import FilterModule
+
+# RID which no router in a generated fleet uses
+UNKNOWN_RID = "192.0.2.1"
+
+
+def naive_one_sided(hostvars, group):
+    """
+    Return the one-sided adjacencies by searching every host for the RID
+    of each neighbor and then that host's neighbors for this host's RID,
+    which takes time proportional to adjacencies times hosts.
+    """
+    one_sided = []
+    for host in group:
+        rid = hostvars[host]["OSPF_BASIC"]["process"]["rid"]
+        for nbr in hostvars[host]["OSPF_NBR"]:
+            for other in group:
+                if hostvars[other]["OSPF_BASIC"]["process"]["rid"] == nbr["rid"]:
+                    if not any(o["rid"] == rid for o in hostvars[other]["OSPF_NBR"]):
+                        one_sided.append((host, nbr["rid"]))
+                    break
+    return one_sided
+
+
+def add_faults(hostvars, names):
+    """
+    Add the three faults to the first routers of the fleet, in place, and
+    return the expected (host, neighbor RID) tuples of each kind.
+    """
+    rids = {name: hostvars[name]["OSPF_BASIC"]["process"]["rid"] for name in names}
+    hosts = {rid: name for name, rid in rids.items()}
+
+    removed = hostvars[names[0]]["OSPF_NBR"].pop(0)
+    hostvars[names[1]]["OSPF_NBR"][0]["state"] = "init"
+    changed = hostvars[names[2]]["OSPF_NBR"][0]
+    expected = {
+        "one_sided": {
+            (hosts[removed["rid"]], rids[names[0]]),
+            (hosts[changed["rid"]], rids[names[2]]),
+        },
+        "stuck": {(names[1], hostvars[names[1]]["OSPF_NBR"][0]["rid"])},
+        "orphan": {(names[2], UNKNOWN_RID)},
+    }
+    changed["rid"] = UNKNOWN_RID
+    return expected
+
+
+def best_of(func, args, repeat):
+    """
+    Return the fastest wall time in seconds of several calls and the
+    result of the last call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_fleet(hosts, args):
+    """
+    Time the filter on one fleet with and without faults, returning the
+    table row values and a list of failures.
+    """
+    _, _, hostvars = fleet.build_fleet(
+        hosts, areas=2, neighbors=args.neighbors, interfaces=1
+    )
+    names = list(hostvars)
+    adjs = sum(len(host["OSPF_NBR"]) for host in hostvars.values())
+    failures = []
+
+    seconds, result = best_of(FilterModule.check_adjacencies, (hostvars, names), 3)
+    if any(result.values()):
+        failures.append("{0} hosts: found faults in a clean fleet".format(hosts))
+
+    expected = add_faults(hostvars, names)
+    faulty_sec, result = best_of(FilterModule.check_adjacencies, (hostvars, names), 3)
+    found = {
+        kind: {(adj["host"], adj["rid"]) for adj in result[kind]} for kind in expected
+    }
+    if found != expected:
+        failures.append("{0} hosts: found {1}".format(hosts, found))
+
+    naive_ms = None
+    if hosts <= args.naive_max:
+        naive_sec, naive = best_of(naive_one_sided, (hostvars, names), 1)
+        naive_ms = naive_sec * 1000
+        if set(naive) != expected["one_sided"]:
+            failures.append("{0} hosts: naive search disagrees".format(hosts))
+
+    values = [hosts, adjs, seconds * 1000, faulty_sec * 1000, adjs / seconds / 1e6]
+    return values, naive_ms, failures
+
+
+def main(argv=None):
+    """
+    Parse the command line, time every fleet size, and return a non-zero
+    exit code if any fleet's faults are not found exactly.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--neighbors", type=int, default=8, help="per router, even")
+    parser.add_argument("--naive-max", type=int, default=1000, help="hosts")
+    args = parser.parse_args(argv)
+
+    header = "{0:>6} {1:>7} {2:>10} {3:>10} {4:>9} {5:>10}"
+    print(header.format("hosts", "adjs", "clean ms", "faults ms", "M adj/s", "naive ms"))
+    row = "{0:>6} {1:>7} {2:>10.1f} {3:>10.1f} {4:>9.2f} {5:>10}"
+    failures = []
+    for hosts in args.hosts:
+        values, naive_ms, fleet_failures = bench_fleet(hosts, args)
+        naive = "-" if naive_ms is None else "{0:.1f}".format(naive_ms)
+        print(row.format(*values + [naive]))
+        failures.extend(fleet_failures)
+
+    for failure in failures:
+        print("FAIL: {0}".format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
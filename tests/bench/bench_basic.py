@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the "show ospf" basic parsers on large multi-process and
+multi-area output. The process fields are read by scanning each section
+(such as the header and SPF timers) forward once, which is compared to the
+single DOTALL pattern joining the same sections with greedy ".*\\s*" that
+the parsers used before, whose backtracking retries every later section at
+each position of the text.
+
+The "1scan" column times a single regex which only finds the first word of
+each process section and area pattern, in one pass over the text. This is
+a lower bound for a parser which reads the process fields, flags, and areas
+in one scan, which would still have to match each pattern where its word is
+found. It takes several times as long as the section scan, to which the
+flags only add one str.find per flag, so the parsers keep separate scans.
+The script exits non-zero if the two disagree on any field.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule, PATTERNS
+
+# Each case is (filter name, generator, process header regex, process section
+# names in the order they appear in the text)
+CASES = [
+    (
+        "ios_ospf_basic",
+        generators.ios_ospf_basic,
+        r'Routing Process "ospf 1" with ID',
+        ["header", "spf", "ref_bw"],
+    ),
+    (
+        "iosxr_ospf_basic",
+        generators.iosxr_ospf_basic,
+        r'Routing Process "ospf 1" with ID',
+        ["header", "spf"],
+    ),
+    (
+        "nxos_ospf_basic",
+        generators.nxos_ospf_basic,
+        r"Routing Process 1 with ID",
+        ["header", "ref_bw", "spf"],
+    ),
+]
+
+
+def multi_process(generator, header, processes, areas):
+    """
+    Return the output of several OSPF processes, each with its own process
+    ID and SPF timers and the given number of areas.
+    """
+    blocks = []
+    for num in range(1, processes + 1):
+        text = generator(areas).replace(" 50", " {0}".format(50 + num))
+        blocks.append(text.replace(header, header.replace("1", str(num))))
+    return "\n".join(blocks)
+
+
+def greedy_pattern(name, sections):
+    """
+    Return the list of (section, pattern) tuples registered by the parser
+    and the single DOTALL pattern made of them joined by greedy ".*\\s*",
+    exactly as used before. The parser must have been called once.
+    """
+    pairs = [
+        (section, PATTERNS.compile("{0}.{1}".format(name, section), "").pattern)
+        for section in sections
+    ]
+    patterns = [pattern for _, pattern in pairs]
+    return pairs, re.compile("\n.*\\s*\n".join(patterns), re.VERBOSE + re.DOTALL)
+
+
+def one_scan(name, sections):
+    """
+    Return a regex which finds the first word of each process section and
+    area pattern registered by the parser, as one alternation. The parser
+    must have been called once.
+    """
+    words = [
+        re.match(r"\s*(\w+)", PATTERNS.compile(name + "." + section, "").pattern).group(1)
+        for section in sections + ["area"]
+    ]
+    return re.compile("|".join(sorted(set(words))))
+
+
+def best_of(func, text, repeat):
+    """
+    Return the fastest wall time in seconds of several calls and the
+    result of the last call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def time_sections(name, text, sections, repeat):
+    """
+    Time the greedy pattern, the section scan, a single scan for the first
+    word of every pattern, and the full parser on the text, returning the
+    four timings and whether the fields agree.
+    """
+    parser = getattr(FilterModule, name)
+    parser(text)
+    pairs, greedy = greedy_pattern(name, sections)
+    greedy_sec, match = best_of(greedy.search, text, repeat)
+    # pylint: disable=protected-access
+    scan_sec, fields = best_of(
+        lambda text: FilterModule._read_sections(name, text, pairs), text, repeat
+    )
+    one_sec, _ = best_of(
+        lambda text: list(one_scan(name, sections).finditer(text)), text, repeat
+    )
+    parse_sec, result = best_of(parser, text, repeat)
+
+    same = FilterModule._read_match(match) == fields and all(
+        result["process"][key] == value for key, value in fields.items()
+    )
+    return greedy_sec, scan_sec, one_sec, parse_sec, same
+
+
+def bench_case(case, args, areas):
+    """
+    Time one case at one size, returning the table row values and whether
+    the fields agree.
+    """
+    name, generator, header, sections = case
+    text = multi_process(generator, header, args.processes, areas)
+    greedy_sec, scan_sec, one_sec, parse_sec, same = time_sections(
+        name, text, sections, args.repeat
+    )
+    values = [
+        name,
+        areas * args.processes,
+        len(text) / 1024,
+        greedy_sec * 1000,
+        scan_sec * 1000,
+        greedy_sec / scan_sec,
+        one_sec * 1000,
+        parse_sec * 1000,
+        len(text) / 1e6 / parse_sec,
+    ]
+    return values, same
+
+
+def main(argv=None):
+    """
+    Parse the command line, time every case at each size, and return a
+    non-zero exit code if any section scan disagrees with the greedy pattern.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument(
+        "--areas", type=int, nargs="+", default=[10, 100, 500], help="per process"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    header = "{0:<18} {1:>6} {2:>6} {3:>10} {4:>9} {5:>8} {6:>9} {7:>9} {8:>7}"
+    row = (
+        "{0:<18} {1:>6} {2:>6.0f} {3:>10.3f} {4:>9.3f} {5:>7.1f}x {6:>9.3f} {7:>9.3f} "
+        "{8:>7.1f}"
+    )
+    columns = ["case", "areas", "KiB", "greedy ms", "scan ms", "speedup", "1scan ms"]
+    print(header.format(*columns + ["parse ms", "MB/s"]))
+    errors = []
+    for case in CASES:
+        for areas in args.areas:
+            values, same = bench_case(case, args, areas)
+            print(row.format(*values))
+            if not same:
+                errors.append("{0}: process fields do not match".format(values[0]))
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
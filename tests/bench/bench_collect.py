@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the asyncio collector in tools/collect.py against local mock
+devices from tools/mock_device.py. The inventory hosts are cloned into a
+larger fleet and collected at several global session limits, with a fixed
+delay per command simulating device response time. The script exits
+non-zero if any clone fails or parses differently from its original host.
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../tools"))
+# pylint: disable=import-error,wrong-import-position
+import collect
+
+
+def clone_targets(targets, count):
+    """
+    Return a dictionary of count targets named "<host>-<n>", cycling
+    through the inventory targets, along with the original host of each.
+    """
+    hosts = sorted(targets)
+    clones = {}
+    origin = {}
+    for num in range(count):
+        host = hosts[num % len(hosts)]
+        name = "{0}-{1}".format(host, num)
+        clones[name] = copy.deepcopy(targets[host])
+        origin[name] = host
+    return clones, origin
+
+
+def strip_timing(facts):
+    """
+    Return the facts without the per-host collection time, for comparison.
+    """
+    return {key: value for key, value in facts.items() if key != "collect_sec"}
+
+
+def bench_limit(targets, expected, limit, args):
+    """
+    Collect from a fleet of cloned targets at one global session limit.
+    Returns the table row values and a list of clones whose results differ
+    from their original host.
+    """
+    clones, origin = clone_targets(targets, args.hosts)
+    start = time.perf_counter()
+    results = asyncio.run(
+        collect.collect_mock(clones, args.delay, limit=limit, per_host=args.per_host)
+    )
+    seconds = time.perf_counter() - start
+    differ = [
+        name
+        for name, facts in sorted(results.items())
+        if strip_timing(facts) != expected[origin[name]]
+    ]
+    return [len(results), limit, seconds, len(results) / seconds], differ
+
+
+def main(argv=None):
+    """
+    Parse the command line, collect from the fleet at each limit, and
+    return a non-zero exit code if any result is incorrect.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=60)
+    parser.add_argument("--delay", type=float, default=0.01)
+    parser.add_argument("--limits", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--per-host", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    root = os.path.join(os.path.dirname(__file__), "../..")
+    targets = collect.load_targets(
+        os.path.join(root, "hosts.yml"), os.path.join(root, "group_vars")
+    )
+    expected = {
+        host: strip_timing(facts)
+        for host, facts in asyncio.run(collect.collect_mock(targets)).items()
+    }
+
+    errors = []
+    print("{0:>6} {1:>6} {2:>10} {3:>10}".format("hosts", "limit", "seconds", "hosts/s"))
+    for limit in args.limits:
+        values, differ = bench_limit(targets, expected, limit, args)
+        print("{0:>6} {1:>6} {2:>10.3f} {3:>10.1f}".format(*values))
+        for name in differ:
+            errors.append("{0} (limit {1}): result differs".format(name, limit))
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of fleet-wide traffic error analytics using the default list of
+dictionaries compared to the columnar mode, which returns NumPy arrays.
+Traffic output is generated for many hosts and parsed in both modes, then
+the same analytics run on each: every counter is checked against a
+threshold, every counter is summed, and the interfaces with the most
+errors are found. The list mode uses check_traffic and Python loops while
+the columnar mode concatenates the hosts with traffic_concat and uses the
+vectorized traffic_* filters. The script exits non-zero if the two modes
+disagree. NumPy must be installed.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+from checks import FilterModule as Checks
+from counters import FilterModule as Counters, ID_KEYS
+
+# Each case is (case name, filter, generator, counters), where the counters
+# are checked against the threshold and the first one is ranked
+CASES = [
+    (
+        "ios_ospf_traffic",
+        FilterModule.ios_ospf_traffic,
+        generators.ios_ospf_traffic,
+        ("auth", "checksum", "dup_rid", "length", "version"),
+    ),
+    (
+        "iosxr_ospf_traffic",
+        FilterModule.iosxr_ospf_traffic,
+        generators.iosxr_ospf_traffic,
+        ("auth_rx", "checksum", "dup_rid", "length", "version"),
+    ),
+]
+
+
+def list_analytics(host_records, stats, top):
+    """
+    Return the violations, sums, and top interfaces by the first counter in
+    stats across every host using the list of dictionaries from each host.
+    """
+    ranked = list(stats)[0]
+    violations = []
+    for host, records in host_records.items():
+        for violation in Checks.check_traffic(records, stats):
+            violations.append(dict({"host": host}, **violation))
+
+    first = next(iter(host_records.values()))[0]
+    sums = {counter: 0 for counter in first if counter not in ID_KEYS}
+    rows = []
+    for host, records in host_records.items():
+        for record in records:
+            for counter in sums:
+                sums[counter] += record[counter]
+            rows.append({"host": host, "intf": record["intf"], "value": record[ranked]})
+
+    rows.sort(key=lambda row: -row["value"])
+    return violations, sums, rows[:top]
+
+
+def columnar_analytics(host_columns, stats, top):
+    """
+    Return the violations, sums, and top interfaces across every host using
+    the columns from each host.
+    """
+    fleet = Counters.traffic_concat(host_columns)
+    return (
+        Counters.traffic_threshold(fleet, stats),
+        Counters.traffic_sum(fleet),
+        Counters.traffic_top(fleet, list(stats)[0], top),
+    )
+
+
+def timed(func, *args):
+    """
+    Return the seconds taken by one call to func and its result.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_case(func, generator, counters, args):
+    """
+    Parse and analyze one case in both modes, returning the table row
+    values and whether both modes produced the same results.
+    """
+    texts = {
+        "host{0}".format(num): generator(args.interfaces, seed=num)
+        for num in range(args.hosts)
+    }
+    list_parse, host_records = timed(
+        lambda: {host: func(text) for host, text in texts.items()}
+    )
+    col_parse, host_columns = timed(
+        lambda: {host: func(text, columnar=True) for host, text in texts.items()}
+    )
+
+    stats = {counter: args.limit for counter in counters}
+    list_sec, list_result = timed(list_analytics, host_records, stats, args.top)
+    col_sec, col_result = timed(columnar_analytics, host_columns, stats, args.top)
+
+    values = [
+        args.hosts * args.interfaces,
+        len(list_result[0]),
+        list_parse,
+        col_parse,
+        list_sec,
+        col_sec,
+        list_sec / col_sec,
+    ]
+    return values, list_result == col_result
+
+
+def main(argv=None):
+    """
+    Parse the command line, run both modes for every case, and return a
+    non-zero exit code if the modes disagree.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=200)
+    parser.add_argument("--interfaces", type=int, default=100, help="per host")
+    parser.add_argument("--limit", type=int, default=2, help="error threshold")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    header = "{0:<20} {1:>8} {2:>10} {3:>10} {4:>10} {5:>10} {6:>10} {7:>8}"
+    row = "{0:<20} {1:>8} {2:>10} {3:>10.3f} {4:>10.3f} {5:>10.4f} {6:>10.4f} {7:>7.1f}x"
+    columns = ["case", "rows", "violations", "list parse", "col parse", "list sec"]
+    print(header.format(*columns + ["col sec", "speedup"]))
+    errors = []
+    for case, func, generator, counters in CASES:
+        values, same = bench_case(func, generator, counters, args)
+        print(row.format(case, *values))
+        if not same:
+            errors.append("{0}: columnar results do not match".format(case))
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the memory retained by parsed neighbor, BFD, and traffic
+records in the default dictionary mode compared to the compact mode, which
+returns namedtuple records with integer IPv4 addresses and interned
+strings. Memory is reported in KiB per 10,000 records, along with the parse
+time of each mode. The script exits non-zero if converting the compact
+records back with compact_to_dict does not reproduce the default output.
+"""
+
+import argparse
+import functools
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+
+# Each case is (case name, filter, generator)
+CASES = [
+    ("ios_ospf_neighbor", FilterModule.ios_ospf_neighbor, generators.ios_ospf_neighbor),
+    (
+        "iosxr_ospf_neighbor",
+        FilterModule.iosxr_ospf_neighbor,
+        generators.iosxr_ospf_neighbor,
+    ),
+    (
+        "nxos_ospf_neighbor",
+        FilterModule.nxos_ospf_neighbor,
+        generators.nxos_ospf_neighbor,
+    ),
+    ("ios_bfd_neighbor", FilterModule.ios_bfd_neighbor, generators.ios_bfd_neighbor),
+    ("ios_ospf_traffic", FilterModule.ios_ospf_traffic, generators.ios_ospf_traffic),
+    (
+        "iosxr_ospf_traffic",
+        FilterModule.iosxr_ospf_traffic,
+        generators.iosxr_ospf_traffic,
+    ),
+    ("nxos_ospf_traffic", FilterModule.nxos_ospf_traffic, generators.nxos_ospf_traffic),
+]
+
+
+def retained(func, text):
+    """
+    Return the parse time in seconds, the number of bytes still allocated
+    by the result after parsing, and the result itself. Temporary objects
+    freed during parsing are not counted.
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = func(text)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    tracemalloc.start()
+    result = func(text)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return seconds, size, result
+
+
+def bench_case(case, func, generator, records):
+    """
+    Measure both modes for one case, returning the table row values and
+    whether the compact records convert back to the default output.
+    """
+    # NX-OS traffic has one record per process, so fewer are generated
+    text = generator(records // 100 if case == "nxos_ospf_traffic" else records)
+    dict_sec, dict_size, dict_result = retained(func, text)
+    comp_sec, comp_size, comp_result = retained(
+        functools.partial(func, compact=True), text
+    )
+    same = FilterModule.compact_to_dict(comp_result) == dict_result
+
+    per_10k = 10000 / 1024 / max(len(dict_result), 1)
+    values = [
+        case,
+        len(dict_result),
+        dict_size * per_10k,
+        comp_size * per_10k,
+        1 - comp_size / dict_size,
+        dict_sec,
+        comp_sec,
+    ]
+    return values, same
+
+
+def main(argv=None):
+    """
+    Parse the command line, measure both modes for every case, and return
+    a non-zero exit code if compact records do not convert back exactly.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    header = "{0:<22} {1:>8} {2:>12} {3:>12} {4:>8} {5:>10} {6:>10}"
+    row = "{0:<22} {1:>8} {2:>12.1f} {3:>12.1f} {4:>7.0%} {5:>10.4f} {6:>10.4f}"
+    columns = ["case", "records", "dict KiB/10k", "comp KiB/10k", "saved"]
+    print(header.format(*columns + ["dict sec", "comp sec"]))
+    errors = []
+    for case, func, generator in CASES:
+        values, same = bench_case(case, func, generator, args.records)
+        print(row.format(*values))
+        if not same:
+            errors.append("{0}: compact records do not match".format(case))
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
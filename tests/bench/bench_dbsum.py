@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the database summary parsers on very large multi-area output,
+such as from ABRs with thousands of areas. Each output is parsed in this
+process and then split into shards at the area and process header lines,
+which are parsed in a pool with different numbers of workers. Sharding is
+only used above SHARD_CHARS, so the sizes should reach it, and it only
+helps when the machine has spare CPU cores. The script exits non-zero if
+the sharded results differ from the results of parsing in this process.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/plugin_utils"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+from nots_parsing import SHARD_CHARS
+
+# Each case is (filter, generator)
+CASES = [
+    (FilterModule.ios_ospf_dbsum, generators.ios_ospf_dbsum),
+    (FilterModule.nxos_ospf_dbsum, generators.nxos_ospf_dbsum),
+]
+
+
+def best_of(func, text, workers, repeat):
+    """
+    Return the fastest wall time in seconds of several calls and the
+    result of the last call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text, workers=workers)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def main(argv=None):
+    """
+    Parse the command line, time every case at each size and number of
+    workers, and return a non-zero exit code if any results differ.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--areas", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(
+        "{0} CPU cores, shards above {1} KiB".format(os.cpu_count(), SHARD_CHARS // 1024)
+    )
+    print(
+        "{0:<16} {1:>7} {2:>8} {3:>8} {4:>10} {5:>8}".format(
+            "case", "areas", "KiB", "workers", "ms", "speedup"
+        )
+    )
+    errors = []
+    for func, generator in CASES:
+        for areas in args.areas:
+            text = generator(areas)
+            serial, expected = best_of(func, text, 0, args.repeat)
+            for workers in [0] + args.workers:
+                seconds, result = best_of(func, text, workers, args.repeat)
+                print(
+                    "{0:<16} {1:>7} {2:>8.0f} {3:>8} {4:>10.1f} {5:>7.2f}x".format(
+                        func.__name__,
+                        areas,
+                        len(text) / 1024,
+                        workers,
+                        seconds * 1000,
+                        serial / seconds,
+                    )
+                )
+                if result != expected:
+                    errors.append("{0} with {1} workers".format(func.__name__, workers))
+
+    for error in errors:
+        print("FAIL: {0} does not match".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
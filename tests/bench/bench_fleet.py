@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Scaling benchmark of the playbook itself. A synthetic fleet is generated
+with fleet.py, then nots_playbook.yml is run against it in CI mode using
+the "json" stdout callback, which records the start and end of every task.
+Task durations are summed into phases, one per task file (such as
+devices/ios/areas.yml) plus one per task in the main playbook, to show
+where the time goes as the fleet grows. The script exits non-zero if the
+playbook fails on any host.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import shutil
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+
+import fleet
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def run_playbook(fleet_dir, forks, command="ansible-playbook"):
+    """
+    Run the playbook against a generated fleet and return the wall time in
+    seconds and the parsed output of the json callback.
+    """
+    env = dict(os.environ, ANSIBLE_STDOUT_CALLBACK="json")
+    args = [
+        shutil.which(command) or command,
+        "nots_playbook.yml",
+        "--inventory",
+        os.path.join(fleet_dir, "hosts.yml"),
+        "--extra-vars",
+        "@" + os.path.join(fleet_dir, "vars.yml"),
+        "--forks",
+        str(forks),
+    ]
+    start = time.perf_counter()
+    # The command is built from fixed arguments, without a shell. Ansible
+    # requires blocking handles, so none are inherited from the caller.
+    proc = subprocess.run(  # nosec B603
+        args,
+        cwd=ROOT,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+    )
+    if not proc.stdout.strip():
+        raise RuntimeError(proc.stderr.decode("utf-8", "replace").strip())
+    return time.perf_counter() - start, json.loads(proc.stdout)
+
+
+def _timestamp(value):
+    """
+    Return the seconds since the epoch of a json callback timestamp.
+    """
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").timestamp()
+
+
+def phase_times(output):
+    """
+    Return a dictionary mapping each phase to a dictionary of the number of
+    tasks run and their total duration in seconds. Tasks from an included
+    file are grouped by the file, and main playbook tasks by their name.
+    """
+    phases = {}
+    for play in output["plays"]:
+        for task in play["tasks"]:
+            info = task["task"]
+            path = os.path.relpath(info.get("path", "").rsplit(":", 1)[0], ROOT)
+            phase = info["name"] if path == "nots_playbook.yml" else path
+            duration = info["duration"]
+            seconds = _timestamp(duration["end"]) - _timestamp(duration["start"])
+            stats = phases.setdefault(phase, {"tasks": 0, "sec": 0.0})
+            stats["tasks"] += 1
+            stats["sec"] += seconds
+    return phases
+
+
+def main(argv=None):
+    """
+    Parse the command line, generate the fleet, run the playbook, and print
+    the duration of each phase. Returns a non-zero exit code if any host
+    failed or was unreachable.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=30)
+    parser.add_argument("--areas", type=int, default=4)
+    parser.add_argument("--neighbors", type=int, default=4)
+    parser.add_argument("--interfaces", type=int, default=8)
+    parser.add_argument("--forks", type=int, default=10)
+    parser.add_argument("--ansible-playbook", default="ansible-playbook")
+    parser.add_argument("--save", help="write the phase timings to a JSON file")
+    args = parser.parse_args(argv)
+
+    fleet_dir = tempfile.mkdtemp(prefix="nots_fleet_")
+    try:
+        fleet.write_fleet(
+            fleet_dir,
+            *fleet.build_fleet(args.hosts, args.areas, args.neighbors, args.interfaces)
+        )
+        seconds, output = run_playbook(fleet_dir, args.forks, args.ansible_playbook)
+    finally:
+        shutil.rmtree(fleet_dir)
+
+    phases = phase_times(output)
+    print("{0:<56} {1:>6} {2:>10} {3:>7}".format("phase", "tasks", "seconds", "share"))
+    for phase, stats in sorted(phases.items(), key=lambda item: -item[1]["sec"]):
+        print(
+            "{0:<56} {1:>6} {2:>10.3f} {3:>7.1%}".format(
+                phase[:56], stats["tasks"], stats["sec"], stats["sec"] / seconds
+            )
+        )
+    print("{0} hosts in {1:.3f} seconds".format(args.hosts, seconds))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump({"hosts": args.hosts, "sec": seconds, "phases": phases}, handle)
+
+    failed = [
+        host
+        for host, stats in output["stats"].items()
+        if stats.get("failures") or stats.get("unreachable")
+    ]
+    for host in failed:
+        print("FAIL: {0}".format(host))
+    return 1 if failed or len(output["stats"]) != args.hosts else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
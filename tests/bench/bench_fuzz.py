@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Fuzz test and benchmark of every parser on adversarial output, checking
+that parse time grows linearly with the size of the output. Each parser is
+given generated output at two sizes, --factor apart, and these variants:
+output truncated part way through a line, duplicated, shuffled line by
+line, and with every line of one kind removed (one variant per kind of
+line, such as every "BFD" counter line), which leaves ".*?" spans with
+nothing to stop at. Every call first runs under a ParseBudget of --budget
+seconds, so a runaway pattern fails the script rather than hanging it. The
+script exits non-zero if any call runs out of budget or raises, or if
+the time of any variant grows faster than size to the --max-exponent
+power at every scale up to --max-scale. Variants which parse too fast to
+judge (under --min-ms) are timed again at larger scales, and fail the
+script if they are still too fast at --max-scale. Finally, the budget
+itself is checked on a giant output.
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/plugin_utils"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+from nots_parse_budget import ParseBudget, ParseTimeout
+
+# Each case is (filter name, generator, keyword arguments)
+CASES = [
+    ("ios_ospf_neighbor", generators.ios_ospf_neighbor, {}),
+    ("ios_bfd_neighbor", generators.ios_bfd_neighbor, {}),
+    ("ios_ospf_basic", generators.ios_ospf_basic, {}),
+    ("ios_ospf_dbsum", generators.ios_ospf_dbsum, {}),
+    ("ios_ospf_dbsum", generators.iosxr_ospf_dbsum, {}),
+    ("ios_ospf_traffic", generators.ios_ospf_traffic, {}),
+    ("ios_ospf_traffic", generators.ios_ospf_traffic, {"engine": "stream"}),
+    ("ios_ospf_frr", generators.ios_ospf_frr, {}),
+    ("iosxr_ospf_basic", generators.iosxr_ospf_basic, {}),
+    ("iosxr_ospf_neighbor", generators.iosxr_ospf_neighbor, {}),
+    ("iosxr_ospf_traffic", generators.iosxr_ospf_traffic, {}),
+    ("iosxr_ospf_traffic", generators.iosxr_ospf_traffic, {"engine": "stream"}),
+    ("nxos_ospf_basic", generators.nxos_ospf_basic, {}),
+    ("nxos_ospf_dbsum", generators.nxos_ospf_dbsum, {}),
+    ("nxos_ospf_neighbor", generators.nxos_ospf_neighbor, {}),
+    ("nxos_ospf_traffic", generators.nxos_ospf_traffic, {}),
+]
+
+
+def line_kind(line):
+    """
+    Return the kind of a line, which is the line without its numbers and
+    surrounding whitespace, so counter lines from every block are the same.
+    """
+    return re.sub(r"\d+", "#", line.strip())
+
+
+def variants(text):
+    """
+    Return a dictionary of adversarial variants of the text by name.
+    """
+    lines = text.splitlines()
+    shuffled = list(lines)
+    random.Random(0).shuffle(shuffled)  # nosec
+    result = {
+        "valid": text,
+        "cut": text[: len(text) * 2 // 3],
+        "dup": "\n".join([text] * 3),
+        "shuffle": "\n".join(shuffled),
+    }
+    for kind in sorted({line_kind(line) for line in lines} - {""}):
+        result["drop " + kind] = "\n".join(
+            line for line in lines if line_kind(line) != kind
+        )
+    return result
+
+
+def best_of(func, text, repeat):
+    """
+    Return the fastest wall time in seconds of several calls.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def growth(func, guarded, texts, args):
+    """
+    Parse the smaller and larger text under the budget, then return the
+    exponent of the growth in parse time from one to the other, with both
+    times in milliseconds. The exponent is None when the larger text takes
+    less than --min-ms to parse, which is too fast to judge.
+    """
+    for text in texts:
+        guarded(text)
+    small_ms, large_ms = [best_of(func, text, args.repeat) * 1000 for text in texts]
+    if large_ms < args.min_ms:
+        return None, small_ms, large_ms
+    return math.log(large_ms / small_ms, args.factor), small_ms, large_ms
+
+
+def judge_variants(case, scale, only, args):
+    """
+    Time the variants of one case at one scale, or only those in the only
+    set when given, returning a dictionary of (exponent, small ms, large ms)
+    tuples by variant and the list of failures.
+    """
+    name, generator, kwargs = case
+
+    def func(text):
+        return getattr(FilterModule, name)(text, **kwargs)
+
+    guarded = ParseBudget(args.budget).limit(name, func)
+    small, large = (variants(generator(size)) for size in (scale, scale * args.factor))
+    results = {}
+    failures = []
+    for variant in sorted(set(small) & set(large) & set(only or small)):
+        try:
+            results[variant] = growth(
+                func, guarded, (small[variant], large[variant]), args
+            )
+        except ParseTimeout as exc:
+            failures.append("{0} ({1})".format(exc, variant))
+        # Parsers must handle any text, so any exception is a failure
+        except Exception as exc:  # pylint: disable=broad-except
+            failures.append("{0} raised {1!r} ({2})".format(name, exc, variant))
+    return results, failures
+
+
+def bench_case(case, args):
+    """
+    Time every variant of one case at both sizes, returning the variant
+    whose time grows fastest, as (exponent, name, small ms, large ms,
+    scale), and the list of failures. Variants too fast to judge are timed
+    again at --factor times the scale, up to --max-scale, and fail the
+    case if they are still too fast. So do variants growing faster than
+    --max-exponent, since one step in which the text outgrows a CPU cache
+    can look superlinear, and these fail only if they never grow slower.
+    Each variant is reported by its result at the largest scale timed.
+    """
+    judged = {}
+    scale = args.scale
+    pending = None
+    failures = []
+    while pending is None or (pending and scale <= args.max_scale):
+        results, case_failures = judge_variants(case, scale, pending, args)
+        failures.extend(case_failures)
+        judged.update((variant, result + (scale,)) for variant, result in results.items())
+        pending = [
+            variant
+            for variant, result in sorted(results.items())
+            if result[0] is None or result[0] > args.max_exponent
+        ]
+        scale *= args.factor
+
+    for variant in pending:
+        exponent = judged[variant][0]
+        if exponent is None:
+            message = "under {0} ms, too fast to judge".format(args.min_ms)
+        else:
+            message = "grows as size^{0:.2f}".format(exponent)
+        failures.append(
+            "{0} {1} up to scale {2} ({3})".format(
+                case[0], message, scale // args.factor, variant
+            )
+        )
+
+    worst = (0.0, "-", 0.0, 0.0, args.scale)
+    for variant, result in sorted(judged.items()):
+        if result[0] is not None and result[0] > worst[0]:
+            worst = (result[0], variant) + result[1:]
+    return worst, failures
+
+
+def check_budget(budget):
+    """
+    Return a list of failures of the budget itself: a parser given far more
+    output than it can parse within the budget must stop at the budget and
+    return its result for empty text.
+    """
+    name = "ios_ospf_neighbor"
+    parser = getattr(FilterModule, name)
+    limiter = ParseBudget(budget)
+    wrapped = limiter.fallback(name, limiter.limit(name, parser), parser)
+    text = generators.ios_ospf_neighbor(100000)
+
+    start = time.perf_counter()
+    result = wrapped(text)
+    seconds = time.perf_counter() - start
+    print(
+        "budget of {0:.0f} ms stopped {1} after {2:.0f} ms".format(
+            budget * 1000, name, seconds * 1000
+        )
+    )
+    failures = []
+    if result != parser("") or limiter.expired[name] != 1:
+        failures.append("budget did not return the empty result")
+    if seconds > budget + 0.5:
+        failures.append("budget took {0:.0f} ms to stop".format(seconds * 1000))
+    return failures
+
+
+def main(argv=None):
+    """
+    Parse the command line, fuzz every case, and return a non-zero exit
+    code if any case fails.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=200, help="smaller size")
+    parser.add_argument("--max-scale", type=int, default=12800, help="to judge growth")
+    parser.add_argument("--factor", type=int, default=4, help="larger / smaller")
+    parser.add_argument("--max-exponent", type=float, default=1.5)
+    parser.add_argument("--min-ms", type=float, default=10.0, help="to judge growth")
+    parser.add_argument("--budget", type=float, default=10.0, help="seconds per call")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    header = "{0:<20} {1:<8} {2:>8} {3:>6} {4:>10} {5:>10}  {6}"
+    row = "{0:<20} {1:<8} {2:>8.2f} {3:>6} {4:>10.1f} {5:>10.1f}  {6}"
+    print(
+        header.format(
+            "case", "engine", "exponent", "scale", "small ms", "large ms", "worst"
+        )
+    )
+    failures = []
+    for case in CASES:
+        worst, case_failures = bench_case(case, args)
+        engine = case[2].get("engine", "-")
+        print(
+            row.format(
+                case[0], engine, worst[0], worst[4], worst[2], worst[3], worst[1][:40]
+            )
+        )
+        failures.extend(case_failures)
+
+    failures.extend(check_budget(0.05))
+    for failure in failures:
+        print("FAIL: {0}".format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the check_lsdb filter on fleets generated by fleet.py, in
+which every router in an area has the same LSA counts. Each fleet is
+checked as generated, then with two faults: a router in area 0 with an
+extra router LSA, as if it were partitioned from the area, and a router
+in another area with an extra NSSA-external LSA, as if it held a stale
+one. The script exits non-zero if the filter does not find exactly the
+routers with these faults.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import fleet
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from checks import FilterModule
+
+
+def add_faults(hostvars, names):
+    """
+    Add the two faults to the first routers of the fleet, in place, and
+    return the expected (area ID, host) tuples. The first router is in
+    area 0 and the second is only in another area.
+    """
+    backbone = hostvars[names[0]]["OSPF_DB"]["areas"][0]
+    backbone["num_lsa1"] += 1
+    other = hostvars[names[1]]["OSPF_DB"]["areas"][0]
+    other["num_lsa7"] += 1
+    return {(backbone["id"], names[0]), (other["id"], names[1])}
+
+
+def best_of(func, args, repeat):
+    """
+    Return the fastest wall time in seconds of several calls and the
+    result of the last call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_fleet(hosts, args):
+    """
+    Time the filter on one fleet with and without faults, returning the
+    table row values and a list of failures.
+    """
+    _, _, hostvars = fleet.build_fleet(hosts, areas=args.areas, neighbors=2, interfaces=1)
+    names = list(hostvars)
+    views = sum(len(host["OSPF_DB"]["areas"]) for host in hostvars.values())
+    failures = []
+
+    seconds, result = best_of(FilterModule.check_lsdb, (hostvars, names), args.repeat)
+    if result:
+        failures.append("{0} hosts: found differences in a clean fleet".format(hosts))
+
+    expected = add_faults(hostvars, names)
+    faulty_sec, result = best_of(FilterModule.check_lsdb, (hostvars, names), args.repeat)
+    found = {(diff["area_id"], diff["host"]) for diff in result}
+    if found != expected or any(diff["majority"] is None for diff in result):
+        failures.append("{0} hosts: found {1}".format(hosts, sorted(found)))
+
+    values = [hosts, views, seconds * 1000, faulty_sec * 1000, views / seconds / 1e6]
+    return values, failures
+
+
+def main(argv=None):
+    """
+    Parse the command line, time every fleet size, and return a non-zero
+    exit code if any fleet's faults are not found exactly.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--areas", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(
+        "{0:>6} {1:>7} {2:>10} {3:>10} {4:>11}".format(
+            "hosts", "views", "clean ms", "faults ms", "M views/s"
+        )
+    )
+    failures = []
+    for hosts in args.hosts:
+        values, fleet_failures = bench_fleet(hosts, args)
+        print("{0:>6} {1:>7} {2:>10.1f} {3:>10.1f} {4:>11.2f}".format(*values))
+        failures.extend(fleet_failures)
+
+    for failure in failures:
+        print("FAIL: {0}".format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the NX-OS parsers on large text output compared to the same
+output in the structured "| json" and "| xml" formats. The structured
+output is built from the result of parsing the text using the NX-API keys
+in NXOS_KEYS, so all three formats describe the same data, and each is
+timed with the same parser. The script exits non-zero if the formats do
+not parse identically, except for neighbor uptimes, which are durations
+such as "PT1H2M3S" in structured output.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule, NXOS_KEYS
+
+# Each case is (filter, generator, NXOS_KEYS table of each process row,
+# NXOS_KEYS table of each nested row, name of the nested rows)
+CASES = [
+    (FilterModule.nxos_ospf_basic, generators.nxos_ospf_basic, "basic", None, None),
+    (
+        FilterModule.nxos_ospf_neighbor,
+        generators.nxos_ospf_neighbor,
+        None,
+        "neighbor",
+        "nbr",
+    ),
+    (
+        FilterModule.nxos_ospf_dbsum,
+        generators.nxos_ospf_dbsum,
+        "dbsum",
+        "dbsum_area",
+        "area",
+    ),
+    (FilterModule.nxos_ospf_traffic, generators.nxos_ospf_traffic, "traffic", None, None),
+]
+
+# Table row of the case, format, size in KiB, time in ms, and text time over
+# this time, which is below 1.0x when the format is slower than text
+ROW = "{0:<20} {1:<6} {2:>8.0f} {3:>10.1f} {4:>7.1f}x"
+
+
+def nxapi_row(record, table):
+    """
+    Return the NX-API row of a parsed record, with every value as text.
+    """
+    row = {}
+    for key, nx_key in NXOS_KEYS[table]:
+        value = record[key]
+        if isinstance(value, bool):
+            value = str(value).lower()
+        elif key == "uptime" and value.count(":") == 2:
+            value = "PT{0}H{1}M{2}S".format(*[int(part) for part in value.split(":")])
+        elif table == "basic_spf":
+            value = "{0}.000".format(value)
+        row[nx_key] = str(value)
+    return row
+
+
+def basic_context(result):
+    """
+    Return the NX-API process row of a parsed nxos_ospf_basic result.
+    """
+    process = result["process"]
+    context = {}
+    for table in ("basic", "basic_spf", "basic_flags"):
+        context.update(nxapi_row(process, table))
+    areas = []
+    for area in result["areas"]:
+        row = nxapi_row(area, "basic_area")
+        if area["type"] != "standard":
+            row[area["type"]] = "true"
+        areas.append(row)
+    context["TABLE_area"] = {"ROW_area": areas}
+    return context
+
+
+def nxapi_output(result, table, row_table, rows):
+    """
+    Return the NX-API structured output of a parsed result.
+    """
+    if table == "basic":
+        contexts = [basic_context(result)]
+    elif rows is None:
+        contexts = [nxapi_row(record, table) for record in result]
+    else:
+        records = result[rows + "s"] if table else result
+        contexts = [nxapi_row(result["process"], table) if table else {"ptag": "1"}]
+        contexts[0]["TABLE_" + rows] = {
+            "ROW_" + rows: [nxapi_row(record, row_table) for record in records]
+        }
+    return {"TABLE_ctx": {"ROW_ctx": contexts}}
+
+
+def xml_element(tag, value, parts):
+    """
+    Append the XML text of one element, and its children, to parts.
+    """
+    if isinstance(value, list):
+        for item in value:
+            xml_element(tag, item, parts)
+        return
+    parts.append("<{0}>".format(tag))
+    if isinstance(value, dict):
+        for child, child_value in value.items():
+            xml_element(child, child_value, parts)
+    else:
+        parts.append(value)
+    parts.append("</{0}>".format(tag))
+
+
+def xml_output(data):
+    """
+    Return structured output as NX-OS "| xml" text.
+    """
+    parts = [
+        '<?xml version="1.0" encoding="ISO-8859-1"?>\n',
+        '<nf:rpc-reply xmlns:nf="urn:ietf:params:xml:ns:netconf:base:1.0">',
+        "<nf:data><show><ip><ospf>",
+    ]
+    xml_element("__readonly__", data, parts)
+    parts.append("</ospf></ip></show></nf:data></nf:rpc-reply>\n]]>]]>")
+    return "".join(parts)
+
+
+def without_uptime(result):
+    """
+    Return a parsed result without the neighbor uptime text.
+    """
+    if isinstance(result, list):
+        return [{k: v for k, v in rec.items() if k != "uptime"} for rec in result]
+    return result
+
+
+def best_of(func, data, repeat):
+    """
+    Return the fastest wall time in seconds of several calls and the
+    result of the last call.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+
+def bench_case(case, args):
+    """
+    Time one case in each format, printing a table row per format, and
+    return the formats which parse differently from the text.
+    """
+    func, table = case[0], case[2]
+    text = case[1](args.processes if table == "traffic" else args.scale)
+    text_sec, expected = best_of(func, text, args.repeat)
+    data = nxapi_output(expected, *case[2:])
+
+    errors = []
+    print(ROW.format(func.__name__, "text", len(text) / 1024, text_sec * 1000, 1))
+    formats = [("json", json.dumps(data)), ("xml", xml_output(data)), ("dict", data)]
+    for name, output in formats:
+        seconds, result = best_of(func, output, args.repeat)
+        kib = len(output) / 1024 if isinstance(output, str) else 0
+        print(ROW.format(func.__name__, name, kib, seconds * 1000, text_sec / seconds))
+        if without_uptime(result) != without_uptime(expected):
+            errors.append("{0} {1}".format(func.__name__, name))
+    return errors
+
+
+def main(argv=None):
+    """
+    Parse the command line, time every case in each format, and return a
+    non-zero exit code if any format parses differently from the text. The
+    dict format is the JSON output as already decoded by nxos_command.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=20000, help="areas or neighbors")
+    parser.add_argument("--processes", type=int, default=2000, help="traffic")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    header = "{0:<20} {1:<6} {2:>8} {3:>10} {4:>8}"
+    print(header.format("case", "format", "KiB", "ms", "vs text"))
+    errors = []
+    for case in CASES:
+        errors.extend(bench_case(case, args))
+
+    for error in errors:
+        print("FAIL: {0} does not match text".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the optional parse cache. Every parsing case from
+bench_parsers.py is timed uncached, then through a cache on a miss, a
+memory hit, and a disk hit (a new cache instance sharing the same
+directory, as seen by a later Ansible worker or playbook run). The script
+exits non-zero if any cached result differs from the uncached result.
+"""
+
+import argparse
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import bench_parsers
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule, ParseCache
+
+
+def timed(func, text):
+    """
+    Return the wall time in seconds and result of a single call.
+    """
+    start = time.perf_counter()
+    result = func(text)
+    return time.perf_counter() - start, result
+
+
+def bench_case(case, filter_name, kwargs, text, path):
+    """
+    Time one case uncached and through the cache at each level, then call
+    it once more with the keyword arguments given positionally, which must
+    also be a memory hit. Returns the row of timings and whether all
+    results were identical.
+    """
+    raw = FilterModule.filters()[filter_name]
+    memory = ParseCache(path=path)
+    cached = functools.partial(memory.wrap(case, raw), **kwargs)
+    disk = ParseCache(path=path)
+    from_disk = functools.partial(disk.wrap(case, raw), **kwargs)
+
+    row = []
+    results = []
+    for call in (functools.partial(raw, **kwargs), cached, cached, from_disk):
+        seconds, result = timed(call, text)
+        row.append(seconds)
+        results.append(result)
+
+    # The only keyword argument of the cases is the first after the text
+    results.append(memory.wrap(case, raw)(text, *kwargs.values()))
+    if memory.stats()["hits"] != 2 or disk.stats()["disk_hits"] != 1:
+        return row, False
+    return row, all(result == results[0] for result in results)
+
+
+def main(argv=None):
+    """
+    Parse the command line, run each case at the selected scale, and
+    return a non-zero exit code if any cached result is incorrect.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--profile", choices=sorted(bench_parsers.PROFILES), default="medium"
+    )
+    scale = bench_parsers.PROFILES[parser.parse_args(argv).profile]
+
+    path = tempfile.mkdtemp(prefix="nots_parse_cache_")
+    errors = []
+    row = "{0:<26} {1:>10.5f} {2:>10.5f} {3:>10.5f} {4:>10.5f}"
+    print(
+        "{0:<26} {1:>10} {2:>10} {3:>10} {4:>10}".format(
+            "case (seconds)", "uncached", "miss", "memory", "disk"
+        )
+    )
+    try:
+        for case, filter_name, kwargs, generator, dimension in bench_parsers.CASES:
+            text = generator(scale[dimension])
+            timings, same = bench_case(case, filter_name, kwargs, text, path)
+            print(row.format(case, *timings))
+            if not same:
+                errors.append("{0}: cached result differs".format(case))
+    finally:
+        shutil.rmtree(path)
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
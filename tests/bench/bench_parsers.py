@@ -0,0 +1,294 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark harness for the custom parsing filters which runs without
+Ansible. Synthetic CLI output is generated at a configurable scale for each
+platform, every filter is timed, and the throughput (MB/s and records/s)
+plus peak memory are reported. Results can be saved as a JSON baseline and
+later runs can be checked against it, returning a non-zero exit code when
+a filter regresses beyond the allowed tolerance.
+
+Timings are normalized using a fixed calibration workload so baselines
+recorded on one machine remain meaningful on another.
+"""
+
+import argparse
+import functools
+import gc
+import json
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+
+# Preset scales; each can be overridden individually from the CLI
+PROFILES = {
+    "small": {"neighbors": 10, "interfaces": 1, "areas": 1},
+    "medium": {"neighbors": 1000, "interfaces": 200, "areas": 50},
+    "large": {"neighbors": 10000, "interfaces": 2000, "areas": 500},
+}
+
+# Each case is (case name, filter name, filter kwargs, generator, dimension)
+# where dimension is the scale key used to size the generated output. The
+# case name differs from the filter name when one filter parses output
+# from several platforms (ios_ospf_dbsum for IOS-XR) or when an alternate
+# parsing engine is selected with kwargs.
+G = generators
+CASES = [
+    ("ios_ospf_neighbor", "ios_ospf_neighbor", {}, G.ios_ospf_neighbor, "neighbors"),
+    ("ios_bfd_neighbor", "ios_bfd_neighbor", {}, G.ios_bfd_neighbor, "neighbors"),
+    ("ios_ospf_basic", "ios_ospf_basic", {}, G.ios_ospf_basic, "areas"),
+    ("ios_ospf_dbsum", "ios_ospf_dbsum", {}, G.ios_ospf_dbsum, "areas"),
+    ("ios_ospf_traffic", "ios_ospf_traffic", {}, G.ios_ospf_traffic, "interfaces"),
+    (
+        "ios_ospf_traffic_stream",
+        "ios_ospf_traffic",
+        {"engine": "stream"},
+        G.ios_ospf_traffic,
+        "interfaces",
+    ),
+    ("iosxe_ospf_frr", "ios_ospf_frr", {}, G.ios_ospf_frr, "areas"),
+    (
+        "iosxr_ospf_neighbor",
+        "iosxr_ospf_neighbor",
+        {},
+        G.iosxr_ospf_neighbor,
+        "neighbors",
+    ),
+    ("iosxr_ospf_basic", "iosxr_ospf_basic", {}, G.iosxr_ospf_basic, "areas"),
+    ("iosxr_ospf_dbsum", "ios_ospf_dbsum", {}, G.iosxr_ospf_dbsum, "areas"),
+    ("iosxr_ospf_traffic", "iosxr_ospf_traffic", {}, G.iosxr_ospf_traffic, "interfaces"),
+    (
+        "iosxr_ospf_traffic_stream",
+        "iosxr_ospf_traffic",
+        {"engine": "stream"},
+        G.iosxr_ospf_traffic,
+        "interfaces",
+    ),
+    ("nxos_ospf_neighbor", "nxos_ospf_neighbor", {}, G.nxos_ospf_neighbor, "neighbors"),
+    ("nxos_ospf_basic", "nxos_ospf_basic", {}, G.nxos_ospf_basic, "areas"),
+    ("nxos_ospf_dbsum", "nxos_ospf_dbsum", {}, G.nxos_ospf_dbsum, "areas"),
+    ("nxos_ospf_traffic", "nxos_ospf_traffic", {}, G.nxos_ospf_traffic, "interfaces"),
+]
+
+
+def count_records(result):
+    """
+    Return the number of records in a parsed result. Lists and dicts
+    (such as FRR output) count their elements while "basic" and "dbsum"
+    output counts the areas plus one for the process.
+    """
+    if isinstance(result, dict) and "areas" in result:
+        return len(result["areas"]) + (1 if result.get("process") else 0)
+    return len(result)
+
+
+def calibrate(number=3):
+    """
+    Time a fixed pure-Python and regex workload, returning the best of
+    several runs in seconds. Filter timings are divided by this value to
+    produce machine-independent scores for baseline comparison.
+    """
+    regex = re.compile(r"(?P<a>\d+)\.(?P<b>\d+)")
+    text = "\n".join("{0}.{1} filler text".format(i, i * 7) for i in range(20000))
+    best = None
+    for _ in range(number):
+        start = time.perf_counter()
+        sum(int(m.group("a")) + int(m.group("b")) for m in regex.finditer(text))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(func, text, repeat):
+    """
+    Run a filter against the text several times and return a dictionary
+    of measurements using the best wall time. Like timeit, garbage
+    collection is disabled while timing. The calibration workload is
+    timed immediately beforehand so that the normalized score is not skewed
+    by changes in machine load during a long run. Peak memory is measured
+    from one additional run under tracemalloc, which is too slow to time.
+    """
+    calibration = calibrate(repeat)
+    best = None
+    result = None
+    for _ in range(repeat):
+        result = None
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        result = func(text)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    func(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    records = count_records(result)
+    size = len(text.encode("utf-8"))
+    return {
+        "bytes": size,
+        "records": records,
+        "seconds": round(best, 6),
+        "calibration_sec": round(calibration, 6),
+        "score": round(best / calibration, 4),
+        "mb_per_sec": round(size / best / 1e6, 3),
+        "records_per_sec": round(records / best, 1),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(scale, repeat=5, only=None):
+    """
+    Generate input and benchmark every case at the given scale. The only
+    argument is an optional substring used to select a subset of cases.
+    Returns a dictionary suitable for printing or saving as a baseline.
+    """
+    filters = FilterModule.filters()
+    results = {}
+    for case, filter_name, kwargs, generator, dimension in CASES:
+        if only and only not in case:
+            continue
+
+        text = generator(scale[dimension])
+        func = functools.partial(filters[filter_name], **kwargs)
+        results[case] = {
+            "filter": filter_name,
+            "kwargs": kwargs,
+            "dimension": dimension,
+            "count": scale[dimension],
+        }
+        results[case].update(run_case(func, text, repeat))
+
+    return {
+        "python": platform.python_version(),
+        "scale": scale,
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    """
+    Compare a report against a baseline, returning a list of strings
+    describing each regression. A regression is a change in the number of
+    records parsed (correctness) or a normalized score which exceeds the
+    baseline score by more than the tolerance (1.0 means twice as slow).
+    """
+    errors = []
+    if report["scale"] != baseline["scale"]:
+        errors.append(
+            "scale mismatch {0} != {1}".format(report["scale"], baseline["scale"])
+        )
+        return errors
+
+    for case, base in sorted(baseline["results"].items()):
+        new = report["results"].get(case)
+        if not new:
+            continue
+        if new["records"] != base["records"]:
+            errors.append(
+                "{0}: parsed {1} records, baseline {2}".format(
+                    case, new["records"], base["records"]
+                )
+            )
+        limit = base["score"] * (1 + tolerance)
+        if new["score"] > limit:
+            errors.append(
+                "{0}: score {1} exceeds baseline {2} by more than {3:.0%}".format(
+                    case, new["score"], base["score"], tolerance
+                )
+            )
+    return errors
+
+
+def print_report(report):
+    """
+    Print the benchmark results as a human-readable table.
+    """
+    header = "{0:<20} {1:>7} {2:>10} {3:>8} {4:>10} {5:>8} {6:>12} {7:>10}"
+    row = "{0:<20} {1:>7} {2:>10} {3:>8} {4:>10.4f} {5:>8.2f} {6:>12.0f} {7:>10.1f}"
+    print(
+        header.format(
+            "case",
+            "count",
+            "bytes",
+            "records",
+            "seconds",
+            "MB/s",
+            "records/s",
+            "peak KiB",
+        )
+    )
+    for case, res in report["results"].items():
+        print(
+            row.format(
+                case,
+                res["count"],
+                res["bytes"],
+                res["records"],
+                res["seconds"],
+                res["mb_per_sec"],
+                res["records_per_sec"],
+                res["peak_kib"],
+            )
+        )
+
+
+def main(argv=None):
+    """
+    Parse the command line, run the benchmarks, then optionally save and/or
+    check the results against a JSON baseline file.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    parser.add_argument("--neighbors", type=int, help="override neighbor count")
+    parser.add_argument("--interfaces", type=int, help="override interface count")
+    parser.add_argument("--areas", type=int, help="override area count")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N runs")
+    parser.add_argument("--only", help="run only cases containing this string")
+    parser.add_argument("--save", help="write results to this JSON baseline file")
+    parser.add_argument("--check", help="compare results to this JSON baseline file")
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    scale = dict(PROFILES[args.profile])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    report = run(scale, repeat=args.repeat, only=args.only)
+    print_report(report)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print("saved baseline to {0}".format(args.save))
+
+    if args.check:
+        with open(args.check, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        errors = compare(report, baseline, args.tolerance)
+        for error in errors:
+            print("REGRESSION: {0}".format(error))
+        if errors:
+            return 1
+        print("no regressions against {0}".format(args.check))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
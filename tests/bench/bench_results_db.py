@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark of the SQLite results store written by the nots_results module
+and queried by tools/query_results.py. A history of hourly runs (--runs,
+default 90 days) for a fleet of IOS and NX-OS routers is inserted one run
+at a time, as the playbook does, with neighbors that sometimes go down, LSA
+counts that grow, and traffic counters that grow and are sometimes cleared.
+Each trend query is then timed over every run and over the last 30 days.
+The script exits non-zero if any query disagrees with the answer computed
+from the generated history, or takes longer than --max-ms.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import yaml
+
+from generators import ipv4
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/modules"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../tools"))
+# pylint: disable=import-error,wrong-import-position
+from nots_results import DB_AREA_KEYS, connect, store_run
+from query_results import counter_growth, lsa_growth, neighbor_flaps
+
+# Traffic counter names, from the hand-written IOS mock
+with open(
+    os.path.join(os.path.dirname(__file__), "../vars/mock_csr1.yml"), encoding="utf-8"
+) as _fh:
+    COUNTERS = sorted(set(yaml.safe_load(_fh)["OSPF_TRAF"][0]) - {"intf"})
+
+# Runs per day, and the first run's time, in seconds since the epoch
+RUNS_PER_DAY = 24
+EPOCH = 1767225600
+
+
+def chance(*key):
+    """
+    Return a repeatable number from 0 to 999 for a key, such as a host,
+    neighbor, and run, so the history can be generated again when checking.
+    """
+    return zlib.crc32(repr(key).encode("utf-8")) % 1000
+
+
+def run_name(run):
+    """
+    Return the DTG name of a run, one hour after the one before.
+    """
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime(EPOCH + run * 3600))
+
+
+def nbr_up(host, nbr, run):
+    """
+    Return True if a neighbor is up in a run; about 1 run in 200 it is not.
+    """
+    return chance(host, nbr, run) >= 5
+
+
+def counter_value(host, intf, counter, run):
+    """
+    Return the value of a traffic counter, which grows at its own rate and
+    is cleared every 1000 runs.
+    """
+    return (run % 1000) * (chance(host, intf, counter) % 4)
+
+
+def lsa_count(host, area, key, run):
+    """
+    Return the number of LSAs of one type in an area, which grows slowly.
+    """
+    return 10 + area + run * (chance(host, area, key) % 3) // 100
+
+
+def host_facts(host, run, args):
+    """
+    Return the parsed facts of one host in one run. Odd hosts have the
+    dotted-decimal database summary area IDs of NX-OS.
+    """
+    areas = range(args.areas)
+    intfs = ["gigabitethernet0/{0}".format(num) for num in range(args.neighbors)]
+    db_areas = [
+        dict(
+            {key: lsa_count(host, area, key, run) for key in DB_AREA_KEYS},
+            id=ipv4(area, first_octet=0) if host % 2 else area,
+        )
+        for area in areas
+    ]
+    return {
+        "OSPF_BASIC": {
+            "process": {"id": 1, "rid": ipv4(host + 1), "is_abr": True},
+            "areas": [{"id": area, "num_intfs": 1, "type": "standard"} for area in areas],
+        },
+        "OSPF_NBR": [
+            {"rid": ipv4(1000 + num), "intf": intf, "state": "full", "priority": 0}
+            for num, intf in enumerate(intfs)
+            if nbr_up(host, num, run)
+        ],
+        "OSPF_DB": {"process": {"process_id": 1}, "areas": db_areas},
+        "OSPF_TRAF": [
+            dict(
+                {key: counter_value(host, intf, key, run) for key in COUNTERS}, intf=intf
+            )
+            for intf in intfs
+        ],
+        "BFD_NBR": [],
+    }
+
+
+def expected_flaps(host, first, last, args):
+    """
+    Return the expected flaps of a host's neighbors over the runs from
+    first to last, where a flap is a neighbor up in one run and down in
+    the next.
+    """
+    flaps = set()
+    for num in range(args.neighbors):
+        count = sum(
+            1
+            for run in range(max(first, 1), last + 1)
+            if nbr_up(host, num, run - 1) and not nbr_up(host, num, run)
+        )
+        if count:
+            intf = "gigabitethernet0/{0}".format(num)
+            flaps.add(("r{0}".format(host), ipv4(1000 + num), intf, count))
+    return flaps
+
+
+def expected_counters(host, first, last, args):
+    """
+    Return the expected growth of a host's traffic counters from the first
+    to the last run, only for counters which grew.
+    """
+    counters = set()
+    for num in range(args.neighbors):
+        intf = "gigabitethernet0/{0}".format(num)
+        for key in COUNTERS:
+            before = counter_value(host, intf, key, first)
+            value = counter_value(host, intf, key, last)
+            growth = value - before if value >= before else value
+            if growth:
+                counters.add(("r{0}".format(host), intf, key, growth))
+    return counters
+
+
+def expected_answers(first, last, args):
+    """
+    Return the expected flaps, LSA growth, and counter growth over the
+    runs from first to last, as sets comparable to the query results.
+    """
+    flaps, lsas, counters = set(), set(), set()
+    for host in range(args.hosts):
+        flaps |= expected_flaps(host, first, last, args)
+        for area in range(args.areas):
+            growth = sum(
+                lsa_count(host, area, key, last) - lsa_count(host, area, key, first)
+                for key in DB_AREA_KEYS
+            )
+            lsas.add(("r{0}".format(host), area, growth))
+        counters |= expected_counters(host, first, last, args)
+    return flaps, lsas, counters
+
+
+def query_answers(conn, since):
+    """
+    Return the result of each query since a run name, as sets comparable
+    to the expected answers, and the time of each query in milliseconds.
+    """
+    times = []
+    answers = []
+    queries = [
+        (
+            neighbor_flaps,
+            lambda row: (row["host"], row["rid"], row["intf"], row["flaps"]),
+        ),
+        (lsa_growth, lambda row: (row["host"], row["area_id"], row["total"])),
+        (
+            counter_growth,
+            lambda row: (row["host"], row["intf"], row["counter"], row["growth"]),
+        ),
+    ]
+    for query, key in queries:
+        best = None
+        for _ in range(3):
+            start = time.perf_counter()
+            rows = query(conn, since=since)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+        times.append(best * 1000)
+        answers.append({key(row) for row in rows})
+    return answers, times
+
+
+def insert_history(conn, args):
+    """
+    Insert every run into the database, returning the slowest insert in
+    milliseconds.
+    """
+    slowest = 0.0
+    for run in range(args.runs):
+        results = {
+            "r{0}".format(host): host_facts(host, run, args) for host in range(args.hosts)
+        }
+        start = time.perf_counter()
+        store_run(conn, run_name(run), results)
+        slowest = max(slowest, (time.perf_counter() - start) * 1000)
+    return slowest
+
+
+def check_window(conn, window, days, args):
+    """
+    Time every query over the last days of runs, or every run if days is
+    None, printing a table row, and return the list of failures.
+    """
+    first = 0 if days is None else max(args.runs - days * RUNS_PER_DAY, 0)
+    answers, times = query_answers(conn, None if days is None else run_name(first))
+    print(
+        "{0:<10} {1:>6} {2:>10.2f} {3:>10.2f} {4:>10.2f}".format(
+            window, args.runs - first, *times
+        )
+    )
+    failures = []
+    expected = expected_answers(first, args.runs - 1, args)
+    for name, answer, want, msecs in zip(
+        ("flaps", "lsa", "counters"), answers, expected, times
+    ):
+        if answer != want:
+            failures.append("{0} over {1} does not match".format(name, window))
+        if msecs > args.max_ms:
+            failures.append("{0} over {1} took {2:.0f} ms".format(name, window, msecs))
+    return failures
+
+
+def main(argv=None):
+    """
+    Parse the command line, insert the history, time every query over each
+    window, and return a non-zero exit code if any query is wrong or slow.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hosts", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=90 * RUNS_PER_DAY, help="hourly")
+    parser.add_argument("--areas", type=int, default=3)
+    parser.add_argument("--neighbors", type=int, default=4, help="and interfaces")
+    parser.add_argument("--max-ms", type=float, default=100.0, help="per query")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "results.db")
+        conn = connect(path)
+        start = time.perf_counter()
+        slowest = insert_history(conn, args)
+        print(
+            "inserted {0} runs of {1} hosts in {2:.1f} s, slowest {3:.1f} ms, "
+            "{4:.0f} MiB".format(
+                args.runs,
+                args.hosts,
+                time.perf_counter() - start,
+                slowest,
+                os.path.getsize(path) / 2**20,
+            )
+        )
+
+        header = "{0:<10} {1:>6} {2:>10} {3:>10} {4:>10}"
+        print(header.format("window", "runs", "flaps ms", "lsa ms", "errors ms"))
+        failures = []
+        for window, days in (("all", None), ("30 days", 30)):
+            failures.extend(check_window(conn, window, days, args))
+        conn.close()
+
+    for failure in failures:
+        print("FAIL: {0}".format(failure))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Benchmark comparing the "regex" and "stream" engines of the IOS and IOS-XR
+traffic filters on multi-megabyte output. Both well-formed output and
+malformed output (where every interface block is missing its final
+section, such as from a truncated capture or a different software version)
+are measured, with both engines timed at every size.
+
+The script exits non-zero if the stream engine is not linear, meaning the
+time per MB at the largest size exceeds the time per MB at the smallest
+size by more than the tolerance, or if the engines disagree on output.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import generators
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../../plugins/filter"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+
+# Each platform maps to (filter, generator, (marker, replacement)) where
+# the replacement breaks the last section of every block.
+PLATFORMS = {
+    "ios": (
+        FilterModule.ios_ospf_traffic,
+        generators.ios_ospf_traffic,
+        ("OSPF LSA errors", "OSPF LSA errs"),
+    ),
+    "iosxr": (
+        FilterModule.iosxr_ospf_traffic,
+        generators.iosxr_ospf_traffic,
+        ("Socket ", "Sockets "),
+    ),
+}
+
+
+def timed(func, text, engine, repeat=3):
+    """
+    Return the wall time in seconds and result of parsing text with a
+    specific engine, using the best of several runs.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def build_text(name, kind, size):
+    """
+    Return generated traffic output for a platform with the number of
+    interfaces given by size. Malformed output has the final section of
+    every interface block broken so that no block is complete.
+    """
+    _, generator, (marker, broken) = PLATFORMS[name]
+    text = generator(size)
+    if kind == "malformed":
+        text = text.replace(marker, broken)
+    return text
+
+
+def bench_size(name, kind, size):
+    """
+    Time both engines on one input size, printing a row for each. Returns
+    the stream engine time per MB and whether the engines produced
+    identical output.
+    """
+    func = PLATFORMS[name][0]
+    text = build_text(name, kind, size)
+    mbytes = len(text) / 1e6
+    row = "{0:<6} {1:<10} {2:>6} {3:>8.2f} {4:>8} {5:>10.4f} {6:>10.4f}"
+    seconds = {}
+    results = {}
+    for engine in ("stream", "regex"):
+        seconds[engine], results[engine] = timed(func, text, engine)
+        print(
+            row.format(
+                "", kind, size, mbytes, engine, seconds[engine], seconds[engine] / mbytes
+            )
+        )
+
+    same = results["regex"] == results["stream"]
+    return seconds["stream"] / mbytes, same
+
+
+def bench_platform(name, sizes, tolerance):
+    """
+    Benchmark one platform across all sizes for both well-formed and
+    malformed input. Returns a list of strings describing each failure.
+    """
+    errors = []
+    print("{0:<6} input       intfs       MB   engine    seconds     sec/MB".format(name))
+    for kind in ("valid", "malformed"):
+        per_mb = []
+        for size in sizes:
+            stream_per_mb, same = bench_size(name, kind, size)
+            per_mb.append(stream_per_mb)
+            if not same:
+                errors.append("{0} {1} {2}: engines disagree".format(name, kind, size))
+
+        growth = per_mb[-1] / per_mb[0]
+        print("{0:<6} {1:<10} stream sec/MB growth: {2:.2f}x".format("", kind, growth))
+        if growth > 1 + tolerance:
+            errors.append("{0} {1}: stream engine is not linear".format(name, kind))
+
+    return errors
+
+
+def main(argv=None):
+    """
+    Parse the command line, run the benchmark for each platform, and
+    return a non-zero exit code if the stream engine is not linear or the
+    engines disagree.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 500, 2000, 8000])
+    parser.add_argument("--tolerance", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    errors = []
+    for name in sorted(PLATFORMS):
+        errors.extend(bench_platform(name, args.sizes, args.tolerance))
+
+    for error in errors:
+        print("FAIL: {0}".format(error))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Synthetic fleet generator used to benchmark the playbook at scale in CI
+mode. It writes an inventory of routers spread across IOS, IOS-XR, and
+NX-OS, an extra variables file with the matching all_areas specification,
+and one mock variables file per router in the format of tests/vars/. Each
+mock file is built from the hand-written mock of the same platform, so it
+has the same keys, and is scaled by the number of areas, neighbors, and
+interfaces. The generated data is "right", so every router passes every
+check and runs every task. Neighbors form a ring so that each adjacency
+is seen from both routers.
+"""
+
+import argparse
+import copy
+import os
+import sys
+
+import yaml
+
+from generators import _area_type, dotted_area, ipv4
+
+VARS_DIR = os.path.join(os.path.dirname(__file__), "../vars")
+
+# Each platform maps to (inventory group, host name prefix, template mock)
+PLATFORMS = {
+    "ios": ("iosxe", "csr", "mock_csr1.yml"),
+    "iosxr": ("iosxr", "xrv", "mock_xrv1.yml"),
+    "nxos": ("nxos", "n3k", "mock_n3k1.yml"),
+}
+
+# Interface names for each platform, formatted with the interface index
+INTF_NAMES = {
+    "ios": "gigabitethernet0/{0}",
+    "iosxr": "gigabitethernet0/0/0/{0}",
+    "nxos": "ethernet1/{0}",
+}
+
+
+def load_templates(vars_dir=VARS_DIR):
+    """
+    Return a dictionary mapping each platform to its template mock data.
+    """
+    templates = {}
+    for platform, (_, _, filename) in PLATFORMS.items():
+        with open(os.path.join(vars_dir, filename), "r", encoding="utf-8") as handle:
+            templates[platform] = yaml.safe_load(handle)
+    return templates
+
+
+def host_areas(index, areas):
+    """
+    Return the list of area IDs for the router at a given index. Every
+    router joins one non-backbone area in turn and every other router is
+    also in area 0, making it an ABR. With one area, all routers are in
+    area 0.
+    """
+    if areas < 2:
+        return [0]
+    area_id = 1 + index % (areas - 1)
+    return [0, area_id] if index % 2 == 0 else [area_id]
+
+
+def ring_links(hosts, neighbors):
+    """
+    Return a dictionary mapping each host index to a list of (neighbor
+    router ID, local address) tuples. Each router peers with the routers
+    up to neighbors / 2 positions away in both directions around the ring,
+    and each link has its own pair of addresses.
+    """
+    count = len(hosts)
+    links = {index: [] for index in range(count)}
+    link_id = 0
+    for offset in range(1, min(neighbors // 2, (count - 1) // 2) + 1):
+        for index in range(count):
+            other = (index + offset) % count
+            links[index].append((ipv4(other + 1), ipv4(link_id * 4 + 1, first_octet=172)))
+            links[other].append((ipv4(index + 1), ipv4(link_id * 4 + 2, first_octet=172)))
+            link_id += 1
+    return links
+
+
+def _mock_process(mock, rid, my_areas):
+    """
+    Update the OSPF process, area, and database mock data in place for a
+    router with the given router ID and list of area IDs.
+    """
+    basic = mock["OSPF_BASIC"]
+    basic["process"].update({"rid": rid, "is_abr": len(my_areas) > 1 and 0 in my_areas})
+    area_proto = basic["areas"][0]
+    basic["areas"] = [
+        dict(area_proto, id=area, type=_area_type(area)) for area in my_areas
+    ]
+    for area in basic["areas"]:
+        if "id_dd" in area:
+            area["id_dd"] = dotted_area(area["id"])
+
+    db_proto = mock["OSPF_DB"]["areas"][0]
+    mock["OSPF_DB"]["areas"] = [
+        dict(db_proto, id=area, num_lsa4=0, num_lsa7=0) for area in my_areas
+    ]
+
+
+def build_mock(template, platform, rid, my_areas, nbrs):
+    """
+    Return the mock data for one router from its platform template. The
+    nbrs argument is a list of (router ID, peer address) tuples.
+    """
+    mock = copy.deepcopy(template)
+    _mock_process(mock, rid, my_areas)
+
+    nbr_proto = dict(template["OSPF_NBR"][0], state="full", role="-")
+    mock["OSPF_NBR"] = [
+        dict(nbr_proto, rid=nbr_rid, peer=peer, intf=INTF_NAMES[platform].format(num))
+        for num, (nbr_rid, peer) in enumerate(nbrs)
+    ]
+    if "BFD_NBR" in mock:
+        bfd_proto = dict(template["BFD_NBR"][0], state="up", rhrs="up")
+        mock["BFD_NBR"] = [
+            dict(bfd_proto, peer=peer, intf="gi0/{0}".format(num), ld=4096 + num)
+            for num, (_, peer) in enumerate(nbrs)
+        ]
+    if "OSPF_FRR" in mock:
+        mock["OSPF_FRR"] = {}
+    return mock
+
+
+def build_traffic(template, platform, interfaces):
+    """
+    Return the traffic statistics mock data for a router with the given
+    number of interfaces. NX-OS statistics are per process rather than per
+    interface, so they are returned unchanged.
+    """
+    traf_proto = template["OSPF_TRAF"][0]
+    if "intf" not in traf_proto:
+        return copy.deepcopy(template["OSPF_TRAF"])
+    return [
+        dict(traf_proto, intf=INTF_NAMES[platform].format(num))
+        for num in range(interfaces)
+    ]
+
+
+def fleet_inventory(groups):
+    """
+    Return the inventory for a dictionary mapping each platform group to
+    its hosts, with the same group hierarchy as hosts.yml.
+    """
+    return {
+        "all": {
+            "children": {
+                "ospf_routers": {
+                    "children": {
+                        "ios": {"children": {"iosxe": groups["iosxe"]}},
+                        "iosxr": groups["iosxr"],
+                        "nxos": groups["nxos"],
+                    }
+                }
+            }
+        }
+    }
+
+
+def fleet_vars(areas):
+    """
+    Return the extra variables to run the playbook in CI mode against a
+    fleet with the given number of areas.
+    """
+    return {
+        "ci_test": True,
+        "log": False,
+        "all_areas": {
+            "area{0}".format(area): {"type": _area_type(area)}
+            for area in range(max(areas, 1))
+        },
+    }
+
+
+def build_fleet(hosts, areas=4, neighbors=4, interfaces=8, templates=None):
+    """
+    Return a tuple of (inventory, extra variables, mocks) for a fleet of
+    routers, spread evenly across the platforms. The mocks dictionary maps
+    each host name to its mock data.
+    """
+    templates = templates or load_templates()
+    platforms = sorted(PLATFORMS)
+    names = [
+        "{0}{1}".format(PLATFORMS[platforms[index % 3]][1], index + 1)
+        for index in range(hosts)
+    ]
+    links = ring_links(names, neighbors)
+
+    groups = {PLATFORMS[platform][0]: {"hosts": {}} for platform in platforms}
+    mocks = {}
+    for index, name in enumerate(names):
+        platform = platforms[index % 3]
+        my_areas = host_areas(index, areas)
+        mock = build_mock(
+            templates[platform], platform, ipv4(index + 1), my_areas, links[index]
+        )
+        mock["OSPF_TRAF"] = build_traffic(templates[platform], platform, interfaces)
+        mocks[name] = mock
+        groups[PLATFORMS[platform][0]]["hosts"][name] = {
+            "my_areas": my_areas,
+            "my_nbr_count": len(links[index]),
+            "should_be_asbr": mock["OSPF_BASIC"]["process"]["is_asbr"],
+            "should_be_stub_rtr": mock["OSPF_BASIC"]["process"]["is_stub_rtr"],
+        }
+
+    return fleet_inventory(groups), fleet_vars(areas), mocks
+
+
+def write_fleet(out_dir, inventory, extra_vars, mocks):
+    """
+    Write the fleet to a directory as hosts.yml, vars.yml, and one
+    mocks/mock_<host>.yml file per router. The mock_path variable in
+    vars.yml points the playbook at the generated mock files.
+    """
+    mock_dir = os.path.join(os.path.abspath(out_dir), "mocks")
+    os.makedirs(mock_dir, exist_ok=True)
+    extra_vars = dict(extra_vars, mock_path=mock_dir + os.sep)
+    for filename, data in [("hosts.yml", inventory), ("vars.yml", extra_vars)]:
+        with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as handle:
+            yaml.safe_dump(data, handle, explicit_start=True, default_flow_style=False)
+
+    for name, mock in mocks.items():
+        filename = os.path.join(mock_dir, "mock_{0}.yml".format(name))
+        with open(filename, "w", encoding="utf-8") as handle:
+            yaml.safe_dump(mock, handle, explicit_start=True, default_flow_style=False)
+
+
+def main(argv=None):
+    """
+    Parse the command line and write a fleet to the output directory.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out_dir", help="directory for the generated fleet")
+    parser.add_argument("--hosts", type=int, default=1000)
+    parser.add_argument("--areas", type=int, default=4)
+    parser.add_argument("--neighbors", type=int, default=4, help="per router, even")
+    parser.add_argument("--interfaces", type=int, default=8, help="per router")
+    args = parser.parse_args(argv)
+
+    inventory, extra_vars, mocks = build_fleet(
+        args.hosts, args.areas, args.neighbors, args.interfaces
+    )
+    write_fleet(args.out_dir, inventory, extra_vars, mocks)
+    print("wrote {0} hosts to {1}".format(len(mocks), args.out_dir))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,597 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Synthetic CLI output generators used for benchmarking the custom filters.
+Each function returns text formatted like the real device output for one
+command (based on the samples in tests/tasks/) and is scaled by a single
+count, such as the number of neighbors, interfaces, or areas. Output is
+deterministic for a given count and seed so that benchmark runs are
+repeatable and comparable against saved baselines.
+"""
+
+import random
+
+# Abbreviated interface names seen in neighbor and BFD tables
+SHORT_INTFS = ["Gi0/0/{0}", "Te0/1/{0}", "Po8.{0}", "Tu{0}", "Vl{0}"]
+
+# Full interface names seen in traffic statistics output
+LONG_INTFS = ["GigabitEthernet0/0/{0}", "TenGigabitEthernet0/1/{0}", "Tunnel{0}"]
+
+
+def ipv4(index, first_octet=10):
+    """
+    Return a unique dotted-decimal IPv4 address for a given index,
+    beginning from the first octet specified.
+    """
+    return "{0}.{1}.{2}.{3}".format(
+        first_octet, (index >> 16) & 255, (index >> 8) & 255, index & 255
+    )
+
+
+def dotted_area(area_id):
+    """
+    Return the dotted-decimal format of an integer area ID, as used by NX-OS.
+    """
+    return ipv4(area_id, first_octet=(area_id >> 24) & 255)
+
+
+def _intf(index, names=None):
+    """
+    Return an interface name for a given index, cycling through the
+    interface name formats supplied.
+    """
+    names = names or SHORT_INTFS
+    return names[index % len(names)].format(index)
+
+
+def _area_type(area_id):
+    """
+    Return the area type for a given area ID. Area 0 is always standard and
+    the rest cycle through standard, stub, and nssa.
+    """
+    if area_id == 0:
+        return "standard"
+    return ["standard", "stub", "nssa"][area_id % 3]
+
+
+def ios_ospf_neighbor(count, seed=0):
+    """
+    Generate "show ip ospf neighbor" output for IOS and IOS-XE.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = [
+        "Neighbor ID     Pri   State           Dead Time   Address         Interface"
+    ]
+    for i in range(count):
+        role = rand.choice(["DR", "BDR", "DROTHER", " -"])
+        lines.append(
+            "{0:<15} {1:>3}   FULL/{2:<10} 00:00:{3:02d}    {4:<15} {5}".format(
+                ipv4(i, 172), rand.randint(0, 255), role, 30 + i % 10, ipv4(i), _intf(i)
+            )
+        )
+    return "\n".join(lines)
+
+
+def ios_bfd_neighbor(count, seed=0):
+    """
+    Generate "show bfd neighbor client ospf" output for IOS and IOS-XE.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = [
+        "IPv4 Sessions",
+        "NeighAddr                LD/RD         RH/RS     State     Int",
+    ]
+    for i in range(count):
+        state = "Up" if rand.random() > 0.01 else "Down"
+        lines.append(
+            "{0:<22} {1:>4}/{2:<10} {3:<9} {3:<9} {4}".format(
+                ipv4(i), 4097 + i, 4100 + i, state, _intf(i)
+            )
+        )
+    return "\n".join(lines)
+
+
+def ios_ospf_basic(areas):
+    """
+    Generate "show ip ospf" output for IOS and IOS-XE with one block per area.
+    """
+    lines = [
+        'Routing Process "ospf 1" with ID 10.0.0.5',
+        "Start time: 00:00:17.043, Time elapsed: 00:00:30.262",
+        "Supports only single TOS(TOS0) routes",
+        "Supports opaque LSA",
+        "Supports Link-local Signaling (LLS)",
+        "Supports area transit capability",
+        "Supports NSSA (compatible with RFC 3101)",
+        "Event-log enabled, Maximum number of events: 1000, Mode: cyclic",
+        "It is an area border and autonomous system boundary router",
+        "Redistributing External Routes from,",
+        "Router is not originating router-LSAs with maximum metric",
+        "Initial SPF schedule delay 50 msecs",
+        "Minimum hold time between two consecutive SPFs 200 msecs",
+        "Maximum wait time between two consecutive SPFs 5000 msecs",
+        "Incremental-SPF disabled",
+        "Minimum LSA interval 5 secs",
+        "Minimum LSA arrival 1000 msecs",
+        "LSA group pacing timer 240 secs",
+        "Interface flood pacing timer 33 msecs",
+        "Retransmission pacing timer 66 msecs",
+        "Number of external LSA 1. Checksum Sum 0x006D01",
+        "Number of areas in this router is {0}. {0} normal 0 stub 0 nssa".format(areas),
+        "External flood list length 1",
+        "BFD is enabled in strict mode",
+        "Reference bandwidth unit is 1000 mbps",
+    ]
+    for area_id in range(areas):
+        area_type = _area_type(area_id)
+        name = "BACKBONE(0)" if area_id == 0 else str(area_id)
+        lines.append("   Area {0}".format(name))
+        lines.append(
+            "       Number of interfaces in this area is {0}".format(area_id + 1)
+        )
+        if area_type != "standard":
+            lines.append("       It is a {0} area".format(area_type.upper()))
+        lines.extend(
+            [
+                "       Area has no authentication",
+                "       SPF algorithm last executed 00:00:01.771 ago",
+                "       SPF algorithm executed 4 times",
+                "       Area ranges are",
+                "       Number of LSA 58. Checksum Sum 0x1BEC4B",
+                "       Number of opaque link LSA 0. Checksum Sum 0x000000",
+                "       Number of DCbitless LSA 0",
+                "       Number of indication LSA 0",
+                "       Number of DoNotAge LSA 17",
+                "       Flood list length 1",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def ios_ospf_dbsum(areas, prefixes=True):
+    """
+    Generate "show ip ospf database database-summary" output for IOS,
+    IOS-XE, and IOS-XR with one block per area. IOS-XE includes the
+    redistributed prefix counts while IOS-XR (prefixes=False) does not.
+    """
+    lines = ["OSPF Router with ID (192.168.0.12) (Process ID 1)", ""]
+    for area_id in range(areas):
+        lines.extend(
+            [
+                "Area {0} database summary".format(area_id),
+                "  LSA Type      Count    Delete   Maxage",
+                "  Router        {0:<8} 0        0".format(area_id + 1),
+                "  Network       {0:<8} 0        0".format(area_id + 2),
+                "  Summary Net   {0:<8} 0        0".format(area_id + 3),
+                "  Summary ASBR  {0:<8} 0        0".format(area_id + 4),
+                "  Type-7 Ext    {0:<8} 0        0".format(area_id + 7),
+            ]
+        )
+        if prefixes:
+            lines.append("    Prefixes redistributed in Type-7  {0}".format(area_id))
+        lines.extend(
+            [
+                "  Opaque Link   0        0        0",
+                "  Opaque Area   0        0        0",
+                "  Subtotal      {0:<8} 0        0".format(area_id * 5 + 17),
+                "",
+            ]
+        )
+    lines.extend(
+        [
+            "Process 1 database summary",
+            "  LSA Type      Count    Delete   Maxage",
+            "  Router        41       0        0",
+            "  Network       42       0        0",
+            "  Summary Net   43       0        0",
+            "  Summary ASBR  44       0        0",
+            "  Type-7 Ext    45       0        0",
+            "  Opaque Link   46       0        0",
+            "  Opaque Area   47       0        0",
+            "  Type-5 Ext    48       0        0",
+            "  Opaque AS     49       0        0",
+            "  Total         50       0        0",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def ios_ospf_traffic(interfaces, seed=0):
+    """
+    Generate "show ip ospf traffic" output for IOS and IOS-XE with one
+    statistics block per interface.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = ["Interface statistics", ""]
+    for i in range(interfaces):
+        errs = [rand.randint(0, 3) for _ in range(25)]
+        lines.extend(
+            [
+                "    Interface {0}".format(_intf(i, LONG_INTFS)),
+                "",
+                "Last clearing of interface traffic counters never",
+                "",
+                "OSPF packets received/sent",
+                "  Type          Packets              Bytes",
+                "  RX Invalid    0                    0",
+                "  RX Hello      49                   2348",
+                "  RX DB des     2                    84",
+                "  RX LS req     0                    0",
+                "  RX LS upd     6                    524",
+                "  RX LS ack     3                    152",
+                "  RX Total      60                   3108",
+                "",
+                "  TX Failed     0                    0",
+                "  TX Hello      49                   4504",
+                "  TX DB des     4                    336",
+                "  TX LS req     0                    0",
+                "  TX LS upd     3                    448",
+                "  TX LS ack     2                    188",
+                "  TX Total      58                   5476",
+                "",
+                "OSPF header errors",
+                "  Length {0}, Instance ID {1}, Checksum {2}, Auth Type {3},".format(
+                    *errs[0:4]
+                ),
+                "  Version {0}, Bad Source {1}, No Virtual Link {2},".format(*errs[4:7]),
+                "  Area Mismatch {0}, No Sham Link {1}, Self Originated {2},".format(
+                    *errs[7:10]
+                ),
+                "  Duplicate ID {0}, Hello {1}, MTU Mismatch {2},".format(*errs[10:13]),
+                "  Nbr Ignored {0}, LLS {1}, Unknown Neighbor {2},".format(*errs[13:16]),
+                "  Authentication {0}, TTL Check Fail {1}, Adjacency Throttle {2},".format(
+                    *errs[16:19]
+                ),
+                "  BFD {0}, Test discard {1}".format(*errs[19:21]),
+                "",
+                "OSPF LSA errors",
+                "  Type {0}, Length {1}, Data {2}, Checksum {3}".format(*errs[21:25]),
+                "",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def ios_ospf_frr(areas):
+    """
+    Generate "show ip ospf fast-reroute" output for IOS-XE with one row
+    per area.
+    """
+    lines = [
+        "OSPF Router with ID (10.0.0.2) (Process ID 1)",
+        "Microloop avoidance is enabled for protected prefixes, delay 5000 msec",
+        "Loop-free Fast Reroute protected prefixes",
+        "Area  Topology name   Priority   Remote LFA Enabled  TI-LFA Enabled",
+    ]
+    for area_id in range(areas):
+        lines.append(
+            "{0:>6} {1:>14} {2:>10} {3:>20} {4:>15}".format(
+                area_id,
+                "Base",
+                "High" if area_id % 2 else "Low",
+                "Yes" if area_id % 3 else "No",
+                "No",
+            )
+        )
+    return "\n".join(lines)
+
+
+def iosxr_ospf_basic(areas):
+    """
+    Generate "show ospf" output for IOS-XR with one block per area.
+    """
+    lines = [
+        'Routing Process "ospf 1" with ID 192.168.0.12',
+        "Role: Primary Active",
+        "NSR (Non-stop routing) is Disabled",
+        "Supports only single TOS(TOS0) routes",
+        "Supports opaque LSA",
+        "It is an area border and autonomous system boundary router",
+        "Router is not originating router-LSAs with maximum metric",
+        "Initial SPF schedule delay 50 msecs",
+        "Minimum hold time between two consecutive SPFs 200 msecs",
+        "Maximum wait time between two consecutive SPFs 5000 msecs",
+        "Initial LSA throttle delay 50 msecs",
+        "Minimum hold time for LSA throttle 200 msecs",
+        "Maximum wait time for LSA throttle 5000 msecs",
+        "Minimum LSA interval 200 msecs. Minimum LSA arrival 100 msecs",
+        "LSA refresh interval 1800 seconds",
+        "Flood pacing interval 33 msecs. Retransmission pacing interval 66 msecs",
+        "Maximum number of configured interfaces 1024",
+        "Number of external LSA 0. Checksum Sum 00000000",
+        "Number of areas in this router is {0}. {0} normal 0 stub 0 nssa".format(areas),
+        "External flood list length 0",
+        "SNMP trap is enabled",
+    ]
+    for area_id in range(areas):
+        area_type = _area_type(area_id)
+        name = "BACKBONE(0)" if area_id == 0 else str(area_id)
+        lines.append("   Area {0}".format(name))
+        lines.append(
+            "       Number of interfaces in this area is {0}".format(area_id + 1)
+        )
+        if area_type != "standard":
+            lines.append("       It is a {0} area".format(area_type.upper()))
+        lines.extend(
+            [
+                "       SPF algorithm executed 7 times",
+                "       Number of LSA 4.  Checksum Sum 0x018095",
+                "       Number of opaque link LSA 0.  Checksum Sum 00000000",
+                "       Number of DCbitless LSA 0",
+                "       Number of indication LSA 0",
+                "       Number of DoNotAge LSA 0",
+                "       Flood list length 0",
+                "       Number of LFA enabled interfaces {0}, LFA revision 0".format(
+                    area_id % 2
+                ),
+                "       Number of Per Prefix LFA enabled interfaces 0",
+                "       Number of neighbors forming in staggered mode 0, 1 full",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def iosxr_ospf_dbsum(areas):
+    """
+    Generate "show ospf database database-summary" output for IOS-XR.
+    """
+    return ios_ospf_dbsum(areas, prefixes=False)
+
+
+def iosxr_ospf_neighbor(count, seed=0, areas=4):
+    """
+    Generate "show ospf neighbor area-sorted" output for IOS-XR, spreading
+    the neighbors evenly across the number of areas specified.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = ["* Indicates MADJ interface", "", "Neighbors for OSPF 1", ""]
+    per_area = max(1, count // areas)
+    for i in range(count):
+        if i % per_area == 0:
+            lines.extend(
+                [
+                    "",
+                    "Area {0}".format(i // per_area),
+                    "Neighbor ID   Pri State    Dead Time Address       Up Time  Interface",
+                ]
+            )
+        lines.append(
+            "{0:<13} {1:<3} FULL/{2:<3} 00:00:{3:02d}  {4:<13} {5:02d}:18:57 {6}".format(
+                ipv4(i, 172),
+                rand.randint(0, 255),
+                rand.choice(["DR", "BDR", " -"]),
+                30 + i % 10,
+                ipv4(i),
+                i % 24,
+                _intf(i),
+            )
+        )
+    return "\n".join(lines)
+
+
+def iosxr_ospf_traffic(interfaces, seed=0):
+    """
+    Generate "show ospf statistics interface" output for IOS-XR with one
+    statistics block per interface.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = []
+    for i in range(interfaces):
+        err = [rand.randint(0, 3) for _ in range(29)]
+        row = "{0:<26} {1:<6} {2:<26} {3}"
+        lines.extend(
+            [
+                "Interface {0} Process ID 1 Area {1}".format(_intf(i, LONG_INTFS), i % 8),
+                "",
+                "OSPF packet and LSA statistics",
+                "          RX(hello) RX(router)        TX     LSA RX     LSA TX",
+                "Hello           36          -         37          -          -",
+                "DB Des           7          7          2          1          1",
+                "LS Req           1          1          1          1          0",
+                "LS Upd           3          3          6          3          6",
+                "LS Ack           3          3          2          5          2",
+                "TOTAL           50         14         48         10          9",
+                "",
+                "  OSPF Header Errors",
+                row.format("Version", err[0], "LLS", err[1]),
+                row.format("Type", err[2], "Auth RX", err[3]),
+                row.format("Length", err[4], "Auth TX", err[5]),
+                "{0:<26} {1}".format("Checksum", err[6]),
+                "",
+                "  OSPF LSA Errors",
+                row.format("Type", err[7], "Checksum", err[8]),
+                row.format("Length", err[9], "Data", err[10]),
+                "",
+                "  OSPF Errors",
+                row.format("Bad Source", err[11], "Area Mismatch", err[12]),
+                row.format("No Virtual Link", err[13], "Self Originated", err[14]),
+                row.format("No Sham Link", err[15], "Duplicate ID", err[16]),
+                row.format("Nbr ignored", err[17], "Graceful Shutdown", err[18]),
+                row.format("Unknown nbr", err[19], "Passive intf", err[20]),
+                row.format("No DR/BDR", err[21], "Disabled intf", err[22]),
+                row.format("Enqueue hello", err[23], "Enqueue router", err[24]),
+                row.format("Unspecified RX", err[25], "Unspecified TX", err[26]),
+                "{0:<26} {1}".format("Socket", err[27]),
+                "",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def nxos_ospf_basic(areas):
+    """
+    Generate "show ip ospf" output for NX-OS with one block per area.
+    """
+    lines = [
+        " Routing Process 1 with ID 10.0.0.3 VRF default",
+        " Routing Process Instance Number 2",
+        " Stateful High Availability enabled",
+        " Graceful-restart is configured",
+        "   Grace period: 90 state: Inactive",
+        "   Last graceful restart exit status: None",
+        " Supports only single TOS(TOS0) routes",
+        " Supports opaque LSA",
+        " This router is an area border",
+        " Administrative distance 110",
+        " Reference Bandwidth is 1000 Mbps",
+        " SPF throttling delay time of 50.000 msecs,",
+        "   SPF throttling hold time of 200.000 msecs,",
+        "   SPF throttling maximum wait time of 5000.000 msecs",
+        " LSA throttling start time of 0.000 msecs,",
+        "   LSA throttling hold interval of 5000.000 msecs,",
+        "   LSA throttling maximum wait time of 5000.000 msecs",
+        " Minimum LSA arrival 1000.000 msec",
+        " LSA group pacing timer 10 secs",
+        " Maximum paths to destination 8",
+        " Number of external LSAs 0, checksum sum 0",
+        " Number of opaque AS LSAs 0, checksum sum 0",
+        " Number of areas is {0}, {0} normal, 0 stub, 0 nssa".format(areas),
+        " Number of active areas is {0}, {0} normal, 0 stub, 0 nssa".format(areas),
+    ]
+    for area_id in range(areas):
+        area_type = _area_type(area_id)
+        prefix = "BACKBONE" if area_id == 0 else ""
+        lines.extend(
+            [
+                "   Area {0}({1})".format(prefix, dotted_area(area_id)),
+                "        Area has existed for 00:23:58",
+                "        Interfaces in this area: {0} Active interfaces: 1".format(
+                    area_id + 1
+                ),
+                "        Passive interfaces: 0  Loopback interfaces: 0",
+            ]
+        )
+        if area_type != "standard":
+            lines.append("        This area is a {0} area".format(area_type.upper()))
+        lines.extend(
+            [
+                "        No authentication available",
+                "        SPF calculation has run 14 times",
+                "         Last SPF ran for 0.000139s",
+                "        Area ranges are",
+                "        Number of LSAs: 4, checksum sum 0x2d757",
+            ]
+        )
+    return "\n".join(lines)
+
+
+def nxos_ospf_dbsum(areas):
+    """
+    Generate "show ip ospf database database-summary" output for NX-OS with
+    one block per area.
+    """
+    lines = ["OSPF Router with ID (10.0.0.3) (Process ID 1 VRF default)", ""]
+    for area_id in range(areas):
+        lines.extend(
+            [
+                "Area {0} database summary".format(dotted_area(area_id)),
+                "  LSA Type            Count",
+                "  Opaque Link         0",
+                "  Router              {0}".format(area_id + 1),
+                "  Network             {0}".format(area_id + 2),
+                "  Summary Network     {0}".format(area_id + 3),
+                "  Summary ASBR        {0}".format(area_id + 4),
+                "  Type-7 AS External  {0}".format(area_id + 7),
+                "  Opaque Area         0",
+                "  Subtotal            {0}".format(area_id * 5 + 17),
+                "",
+            ]
+        )
+    lines.extend(
+        [
+            "Process 1 database summary",
+            "  LSA Type            Count",
+            "  Opaque Link         0",
+            "  Router              111",
+            "  Network             222",
+            "  Summary Network     333",
+            "  Summary ASBR        444",
+            "  Type-7 AS External  777",
+            "  Opaque Area         0",
+            "  Type-5 AS External  555",
+            "  Opaque AS           0",
+            "  Non-self            5",
+            "  Total               10",
+        ]
+    )
+    return "\n".join(lines)
+
+
+def nxos_ospf_neighbor(count, seed=0):
+    """
+    Generate "show ip ospf neighbor" output for NX-OS.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = [
+        "OSPF Process ID 1 VRF default",
+        "Total number of neighbors: {0}".format(count),
+        "Neighbor ID     Pri State      Up Time  Address       Interface",
+    ]
+    for i in range(count):
+        lines.append(
+            "{0:<15} {1:>3} FULL/{2:<5} {3:02d}:01:05 {4:<13} Eth1/{5}".format(
+                ipv4(i, 172),
+                rand.randint(0, 255),
+                rand.choice(["DR", "BDR", " -"]),
+                i % 24,
+                ipv4(i),
+                i % 48 + 1,
+            )
+        )
+    return "\n".join(lines)
+
+
+def nxos_ospf_traffic(processes, seed=0):
+    """
+    Generate "show ip ospf traffic" output for NX-OS. This command reports
+    counters per OSPF process/VRF rather than per interface, so the count
+    sets the number of VRF blocks.
+    """
+    rand = random.Random(seed)  # nosec
+    lines = []
+    for vrf in range(processes):
+        err = [rand.randint(0, 3) for _ in range(28)]
+        lines.extend(
+            [
+                "OSPF Process ID 1 VRF vrf{0}, Packet Counters (cleared 00:26:37 ago)".format(
+                    vrf
+                ),
+                "Total: 184 in, 343 out",
+                "LSU transmissions: first 4, rxmit 2, for req 2 nbr xmit 0",
+                "Flooding packets output throttled (IP/tokens): 0 (0/0)",
+                "Ignored LSAs: {0}, LSAs dropped during SPF: {1}".format(*err[0:2]),
+                "LSAs dropped during graceful restart: {0}".format(err[2]),
+                "Errors: drops in {0:>8}, drops out {1:>7}, errors in {2:>7},".format(
+                    *err[3:6]
+                ),
+                "        errors out {0:>6}, hellos in {1:>7}, dbds in {2:>9},".format(
+                    *err[6:9]
+                ),
+                "        lsreq in {0:>8}, lsu in {1:>10}, lsacks in {2:>7},".format(
+                    *err[9:12]
+                ),
+                "        unknown in {0:>6}, unknown out {1:>5}, no ospf {2:>9},".format(
+                    *err[12:15]
+                ),
+                "        bad version {0:>5}, bad crc {1:>9}, dup rid {2:>9},".format(
+                    *err[15:18]
+                ),
+                "        dup src {0:>9}, invalid src {1:>5}, invalid dst {2:>5},".format(
+                    *err[18:21]
+                ),
+                "        no nbr {0:>10}, passive {1:>9}, wrong area {2:>6},".format(
+                    *err[21:24]
+                ),
+                "        pkt length {0:>6}, nbr changed rid/ip addr {1:>11}".format(
+                    *err[24:26]
+                ),
+                "        bad auth {0:>8}, no vrf {1:>10}".format(*err[26:28]),
+                "",
+                "          hellos       dbds     lsreqs       lsus       acks",
+                " In:        164          7          2          8          3",
+                "Out:        167        163          2          8          3",
+                "",
+            ]
+        )
+    return "\n".join(lines)
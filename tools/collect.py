@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Concurrent collection of OSPF CLI output using asyncio SSH sessions instead
+of Ansible. Hosts, platforms, and command lists are read from the inventory
+and group_vars, just like the playbook. Each host has one pooled SSH
+connection and each command runs in its own exec session on it, with the
+number of sessions in flight capped per host and across all hosts. Output
+is parsed by the same filters as the playbook and the structured data for
+each host is written as JSON, in the same format as tools/reparse_logs.py.
+The --mock option collects from local mock devices (tools/mock_device.py)
+instead, so the collector can be tested and benchmarked offline.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import json
+import os
+import re
+import sys
+import time
+
+import asyncssh
+
+import mock_device
+import reparse_logs
+
+# Simple "{{ process.id }}" style variable references in command lists
+VARIABLE = re.compile(r"{{\s*([\w.]+)\s*}}")
+
+
+def render(command, host_vars):
+    """
+    Return the command with each variable reference replaced by its value
+    from the host's variables, following dots into nested dictionaries.
+    """
+
+    def lookup(match):
+        value = host_vars
+        for key in match.group(1).split("."):
+            value = value[key]
+        return str(value)
+
+    return VARIABLE.sub(lookup, command)
+
+
+def load_targets(inventory, group_vars, username=None, password=None):
+    """
+    Return a dictionary mapping each host with a supported platform to its
+    target, a dictionary of the platform, SSH address, port, credentials,
+    and rendered command list. Vault-encrypted passwords cannot be read, so
+    the password is taken from the arguments instead.
+    """
+    targets = {}
+    for host, host_vars in reparse_logs.load_host_vars(inventory, group_vars).items():
+        platform = host_vars.get("ansible_network_os")
+        if platform not in reparse_logs.ROUTES:
+            continue
+        targets[host] = {
+            "platform": platform,
+            "address": host_vars.get("ansible_host", host),
+            "port": int(host_vars.get("ansible_port", 22)),
+            "username": username or host_vars.get("ansible_user"),
+            "password": password,
+            "commands": [render(cmd, host_vars) for cmd in host_vars["commands"]],
+            "traffic_engine": host_vars.get("traffic_engine", "regex"),
+        }
+    return targets
+
+
+class SessionPool(object):
+    """
+    Pool of SSH connections, one per host, opened on first use and shared
+    by every command sent to that host. Each command runs in its own exec
+    session. Many network devices accept only a few sessions at once, so a
+    per-host semaphore caps the sessions in flight on each connection and
+    a global semaphore caps the total across all hosts. Must be created
+    inside the running event loop.
+    """
+
+    def __init__(self, limit=100, per_host=1, timeout=30.0):
+        self.limit = asyncio.Semaphore(limit)
+        self.per_host = per_host
+        self.timeout = timeout
+        self._conns = {}
+        self._locks = {}
+        self._slots = {}
+
+    async def _connection(self, host, target):
+        """
+        Return the pooled connection to a host, opening it if needed. Like
+        ansible.cfg, SSH host keys are not verified.
+        """
+        async with self._locks.setdefault(host, asyncio.Lock()):
+            if host not in self._conns:
+                self._conns[host] = await asyncio.wait_for(
+                    asyncssh.connect(
+                        target["address"],
+                        port=target["port"],
+                        username=target["username"],
+                        password=target["password"],
+                        known_hosts=None,
+                    ),
+                    self.timeout,
+                )
+        return self._conns[host]
+
+    async def run(self, host, target, command):
+        """
+        Run one command on a host once a session slot is free on both the
+        host and the pool, returning its output without surrounding
+        whitespace, as the *_command modules do.
+        """
+        slots = self._slots.setdefault(host, asyncio.Semaphore(self.per_host))
+        async with slots, self.limit:
+            conn = await self._connection(host, target)
+            result = await asyncio.wait_for(conn.run(command), self.timeout)
+        return (result.stdout or "").strip()
+
+    async def close(self):
+        """
+        Close every pooled connection.
+        """
+        for conn in self._conns.values():
+            conn.close()
+        for conn in self._conns.values():
+            await conn.wait_closed()
+        self._conns.clear()
+
+
+async def collect_host(pool, host, target, executor=None):
+    """
+    Run every command on one host concurrently through the pool, then parse
+    the output in the executor (or the loop's default thread pool) so the
+    event loop keeps servicing other sessions. Returns the host's facts, or
+    a dictionary with only the platform and connection error on failure.
+    """
+    start = time.perf_counter()
+    try:
+        outputs = await asyncio.gather(
+            *(pool.run(host, target, cmd) for cmd in target["commands"])
+        )
+    except (OSError, asyncssh.Error, asyncio.TimeoutError) as exc:
+        return {"platform": target["platform"], "errors": {"connect": repr(exc)}}
+
+    facts = await asyncio.get_running_loop().run_in_executor(
+        executor,
+        reparse_logs.parse_outputs,
+        list(zip(target["commands"], outputs)),
+        target["platform"],
+        target["traffic_engine"],
+    )
+    facts["collect_sec"] = round(time.perf_counter() - start, 4)
+    return facts
+
+
+async def collect(targets, limit=100, per_host=1, timeout=30.0, executor=None):
+    """
+    Collect and parse output from every target concurrently, returning a
+    dictionary mapping each host to its facts.
+    """
+    pool = SessionPool(limit, per_host, timeout)
+    try:
+        results = await asyncio.gather(
+            *(
+                collect_host(pool, host, target, executor)
+                for host, target in targets.items()
+            )
+        )
+    finally:
+        await pool.close()
+    return dict(zip(targets, results))
+
+
+async def collect_mock(targets, delay=0.0, **kwargs):
+    """
+    Start a local mock device for each target, point the targets at them,
+    and collect from them as in collect().
+    """
+    platforms = {host: target["platform"] for host, target in targets.items()}
+    servers, ports = await mock_device.start(platforms, delay=delay)
+    try:
+        for host, target in targets.items():
+            target.update({"address": "127.0.0.1", "port": ports[host]})
+        return await collect(targets, **kwargs)
+    finally:
+        for server in servers:
+            server.close()
+
+
+def write_facts(results, out_dir):
+    """
+    Write each host's facts to <out_dir>/<host>.json. Returns the number of
+    hosts with errors.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    failures = 0
+    for host, facts in sorted(results.items()):
+        with open(os.path.join(out_dir, host + ".json"), "w", encoding="utf-8") as handle:
+            json.dump(facts, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(
+            "{0}: parsed {1} commands, {2} errors".format(
+                host, reparse_logs.count_facts(facts), len(facts["errors"])
+            )
+        )
+        failures += 1 if facts["errors"] else 0
+    return failures
+
+
+def main(argv=None):
+    """
+    Parse the command line, collect from every host concurrently, and write
+    the results. Returns a non-zero exit code if any host failed.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("--inventory", default="hosts.yml")
+    parser.add_argument("--group-vars", default="group_vars")
+    parser.add_argument(
+        "--output", help="JSON output directory (default: logs/collect_<DTG>)"
+    )
+    parser.add_argument("--username", help="override ansible_user")
+    parser.add_argument(
+        "--password",
+        default=os.environ.get("NOTS_SSH_PASSWORD"),
+        help="SSH password (default: NOTS_SSH_PASSWORD environment variable)",
+    )
+    parser.add_argument("--limit", type=int, default=100, help="sessions in flight")
+    parser.add_argument("--per-host", type=int, default=1, help="sessions per host")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds")
+    parser.add_argument("--workers", type=int, default=0, help="parsing processes")
+    parser.add_argument("--mock", action="store_true", help="use local mock devices")
+    parser.add_argument("--mock-delay", type=float, default=0.0, help="seconds")
+    args = parser.parse_args(argv)
+
+    targets = load_targets(args.inventory, args.group_vars, args.username, args.password)
+    out_dir = args.output or os.path.join(
+        "logs", "collect_" + time.strftime("%Y%m%dT%H%M%S")
+    )
+    executor = None
+    if args.workers:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=args.workers)
+
+    kwargs = {
+        "limit": args.limit,
+        "per_host": args.per_host,
+        "timeout": args.timeout,
+        "executor": executor,
+    }
+    start = time.perf_counter()
+    try:
+        if args.mock:
+            results = asyncio.run(collect_mock(targets, args.mock_delay, **kwargs))
+        else:
+            results = asyncio.run(collect(targets, **kwargs))
+    finally:
+        if executor:
+            executor.shutdown()
+
+    failures = write_facts(results, out_dir)
+    print(
+        "collected {0} hosts in {1:.3f} seconds into {2}".format(
+            len(results), time.perf_counter() - start, out_dir
+        )
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Print the filter instrumentation report for a stats directory written by
+the playbook when NOTS_FILTER_STATS is set. The playbook writes the same
+report at the end of a run; this script is useful when a run was stopped
+early or to view the report in another format.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugins/plugin_utils"))
+# pylint: disable=import-error,wrong-import-position
+from nots_filter_stats import FilterStats
+
+
+def main(argv=None):
+    """
+    Parse the command line and print the report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("stats_dir", help="directory such as logs/filter_stats")
+    parser.add_argument("--format", choices=["json", "prometheus"], default="json")
+    args = parser.parse_args(argv)
+
+    print(FilterStats.report(args.stats_dir, args.format), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Local mock SSH server which simulates the network devices in the inventory
+for offline testing and benchmarking of tools/collect.py. Each host listens
+on its own port and answers every command routed by tools/reparse_logs.py
+with the sample CLI output from the matching tests/tasks unit test, so the
+parsed results are known in advance. Other commands, such as "show version",
+return no output. No authentication is required, and an optional delay
+before each reply simulates the response time of a real device.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+
+import asyncssh
+import yaml
+
+import reparse_logs
+
+TASKS_DIR = os.path.join(os.path.dirname(__file__), "../tests/tasks")
+
+
+def load_samples(tasks_dir=TASKS_DIR):
+    """
+    Return a dictionary mapping each filter name used in reparse_logs.ROUTES
+    to the sample "text" stored by its unit test, tests/tasks/test_<name>.yml.
+    """
+    samples = {}
+    for routes in reparse_logs.ROUTES.values():
+        for _, _, name in routes:
+            path = os.path.join(tasks_dir, "test_{0}.yml".format(name))
+            if name not in samples and os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as handle:
+                    samples[name] = yaml.safe_load(handle)[0]["set_fact"]["text"]
+    return samples
+
+
+class MockDevice(asyncssh.SSHServer):
+    """
+    SSH server connection handler which lets any user in without
+    authentication.
+    """
+
+    def begin_auth(self, username):
+        return False
+
+
+def make_handler(platform, samples, delay=0.0):
+    """
+    Return an asyncssh process handler which replies to each exec request
+    with the sample output of the first route matching the command on the
+    given platform, after waiting delay seconds.
+    """
+    replies = [
+        (re.compile(cmd), samples.get(name, ""))
+        for cmd, _, name in reparse_logs.ROUTES[platform]
+    ]
+
+    async def handle(process):
+        command = (process.command or "").strip()
+        if delay:
+            await asyncio.sleep(delay)
+        for regex, text in replies:
+            if regex.match(command):
+                process.stdout.write(text + "\n")
+                break
+        process.exit(0)
+
+    return handle
+
+
+async def start(platforms, address="127.0.0.1", base_port=0, delay=0.0):
+    """
+    Start one mock device for each host in the platforms dictionary, which
+    maps host names to ansible_network_os. Hosts are assigned consecutive
+    ports from base_port in sorted order, or ports chosen by the operating
+    system when base_port is 0. Returns a list of servers, which must be
+    closed by the caller, and a dictionary mapping each host to its port.
+    """
+    samples = load_samples()
+    key = asyncssh.generate_private_key("ssh-ed25519")
+    servers = []
+    ports = {}
+    for offset, host in enumerate(sorted(platforms)):
+        server = await asyncssh.create_server(
+            MockDevice,
+            address,
+            base_port + offset if base_port else 0,
+            server_host_keys=[key],
+            process_factory=make_handler(platforms[host], samples, delay),
+        )
+        servers.append(server)
+        ports[host] = server.get_port()
+
+    return servers, ports
+
+
+async def serve(platforms, address, base_port, delay):
+    """
+    Start the mock devices, print the port of each host, and serve until
+    interrupted.
+    """
+    servers, ports = await start(platforms, address, base_port, delay)
+    for host, port in sorted(ports.items()):
+        print("{0} ({1}): {2}:{3}".format(host, platforms[host], address, port))
+    try:
+        await asyncio.gather(*(server.wait_closed() for server in servers))
+    finally:
+        for server in servers:
+            server.close()
+
+
+def main(argv=None):
+    """
+    Parse the command line and serve a mock device for every host in the
+    inventory with a supported platform.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("--inventory", default="hosts.yml")
+    parser.add_argument("--group-vars", default="group_vars")
+    parser.add_argument("--address", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8022, help="port of first host")
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds per reply")
+    args = parser.parse_args(argv)
+
+    platforms = {
+        host: platform
+        for host, platform in reparse_logs.load_platforms(
+            args.inventory, args.group_vars
+        ).items()
+        if platform in reparse_logs.ROUTES
+    }
+    try:
+        asyncio.run(serve(platforms, args.address, args.port, args.delay))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Query trends from the results database written by the playbook when
+NOTS_RESULTS_DB is set. Each query covers the runs between --since and
+--until, which are run names (DTGs) or prefixes of them, such as
+"201805" for every run in May 2018, and reads only the indexed rows of
+the first and last run of each host, or the small table of neighbor
+events, so it answers in milliseconds no matter how many runs are stored.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugins/modules"))
+# pylint: disable=import-error,wrong-import-position
+from nots_results import DB_AREA_KEYS, connect
+
+# Run IDs of the first and last run of each host within a range of run IDs,
+# each found with a single index seek on the processes primary key
+HOST_ENDS = """
+SELECT host_id, name,
+    (SELECT MIN(run_id) FROM processes AS p
+     WHERE p.host_id = h.host_id AND p.run_id BETWEEN :first AND :last),
+    (SELECT MAX(run_id) FROM processes AS p
+     WHERE p.host_id = h.host_id AND p.run_id BETWEEN :first AND :last)
+FROM hosts AS h
+"""
+
+# Growth of each LSA type count in each area of a host from its first to its
+# last run. The columns come from DB_AREA_KEYS rather than any input.
+LSA_GROWTH = (
+    "SELECT b.area_id, {0} FROM areas AS b LEFT JOIN areas AS a "
+    "ON a.host_id = b.host_id AND a.run_id = ? AND a.area_id = b.area_id "
+    "WHERE b.host_id = ? AND b.run_id = ? AND (? IS NULL OR b.area_id = ?)"
+).format(  # nosec B608
+    ", ".join("IFNULL(b.{0}, 0) - IFNULL(a.{0}, 0)".format(key) for key in DB_AREA_KEYS)
+)
+
+# Growth of each traffic counter of a host from its first to its last run,
+# which is the last value if the counter was cleared in between
+COUNTER_GROWTH = """
+SELECT b.pid, b.intf, b.name,
+    CASE WHEN b.value >= IFNULL(a.value, 0) THEN b.value - IFNULL(a.value, 0)
+    ELSE b.value END
+FROM counters AS b LEFT JOIN counters AS a
+    ON a.host_id = b.host_id AND a.run_id = ? AND a.pid = b.pid
+    AND a.intf = b.intf AND a.name = b.name
+WHERE b.host_id = ? AND b.run_id = ?
+"""
+
+
+def run_range(conn, since=None, until=None):
+    """
+    Return the (first, last) run IDs of the runs whose names are between
+    since and until, both inclusive prefixes, such as "20180522". Run names
+    are DTGs, which sort in time order.
+    """
+    row = conn.execute(
+        "SELECT MIN(run_id), MAX(run_id) FROM runs WHERE name >= ? AND name <= ?",
+        (since or "", (until or "") + "~"),
+    ).fetchone()
+    return row if row[0] is not None else (0, -1)
+
+
+def _host_ends(conn, since, until, host):
+    """
+    Return a list of (host ID, host name, first run ID, last run ID) for
+    each host, or only the named host, stored within the range of runs.
+    """
+    first, last = run_range(conn, since, until)
+    rows = conn.execute(HOST_ENDS, {"first": first, "last": last}).fetchall()
+    return [row for row in rows if row[2] is not None and host in (None, row[1])]
+
+
+def neighbor_flaps(conn, since=None, until=None, host=None):
+    """
+    Return a list of dictionaries, one per neighbor which flapped within
+    the range of runs, with the number of flaps, most first. A flap is a
+    neighbor seen going down, or whose uptime went backwards between runs.
+    """
+    first, last = run_range(conn, since, until)
+    sql = (
+        "SELECT h.name, e.rid, e.intf, COUNT(*), MAX(r.name) "
+        "FROM neighbor_events AS e JOIN hosts AS h USING (host_id) "
+        "JOIN runs AS r USING (run_id) "
+        "WHERE e.run_id BETWEEN ? AND ? AND e.event IN ('down', 'reset') "
+        "AND (? IS NULL OR h.name = ?) "
+        "GROUP BY e.host_id, e.rid, e.intf ORDER BY 4 DESC, 1, 2, 3"
+    )
+    keys = ("host", "rid", "intf", "flaps", "last_run")
+    return [dict(zip(keys, row)) for row in conn.execute(sql, (first, last, host, host))]
+
+
+def lsa_growth(conn, since=None, until=None, host=None, area=None):
+    """
+    Return a list of dictionaries, one per host and area, with the growth
+    in each LSA type count and their total from each host's first to last
+    run within the range of runs, largest total growth first. An area
+    which is new in the last run grows from zero.
+    """
+    result = []
+    for host_id, name, first, last in _host_ends(conn, since, until, host):
+        for row in conn.execute(LSA_GROWTH, (first, host_id, last, area, area)):
+            growth = {"host": name, "area_id": row[0]}
+            growth.update(zip(DB_AREA_KEYS, row[1:]))
+            growth["total"] = sum(row[1:])
+            result.append(growth)
+    return sorted(
+        result, key=lambda item: (-item["total"], item["host"], item["area_id"])
+    )
+
+
+def counter_growth(conn, since=None, until=None, host=None, names=None):
+    """
+    Return a list of dictionaries, one per traffic counter which grew from
+    each host's first to last run within the range of runs, optionally
+    only the counters in names, largest growth first. A counter lower in
+    the last run was cleared in between, so its growth is its last value.
+    """
+    result = []
+    for host_id, name, first, last in _host_ends(conn, since, until, host):
+        for pid, intf, counter, growth in conn.execute(
+            COUNTER_GROWTH, (first, host_id, last)
+        ):
+            if growth > 0 and (not names or counter in names):
+                result.append(
+                    {
+                        "host": name,
+                        "pid": pid,
+                        "intf": intf,
+                        "counter": counter,
+                        "growth": growth,
+                    }
+                )
+    return sorted(result, key=lambda item: (-item["growth"], item["host"]))
+
+
+def print_table(rows, limit):
+    """
+    Print up to limit rows of dictionaries as a table with a column per key.
+    """
+    if not rows:
+        print("no results")
+        return
+    keys = list(rows[0])
+    widths = [
+        max(len(str(key)), *[len(str(row[key])) for row in rows[:limit]]) for key in keys
+    ]
+    print("  ".join(str(key).ljust(width) for key, width in zip(keys, widths)))
+    for row in rows[:limit]:
+        print("  ".join(str(row[key]).ljust(width) for key, width in zip(keys, widths)))
+
+
+def main(argv=None):
+    """
+    Parse the command line and print the results of one query.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("db", help="database such as logs/results.db")
+    parser.add_argument("query", choices=["flaps", "lsa", "counters"])
+    parser.add_argument("--since", help="first run name or prefix, such as 201805")
+    parser.add_argument("--until", help="last run name or prefix")
+    parser.add_argument("--host", help="only this host")
+    parser.add_argument("--area", type=int, help="only this area (lsa)")
+    parser.add_argument("--counter", nargs="+", help="only these counters (counters)")
+    parser.add_argument("--limit", type=int, default=50, help="rows to print")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        parser.error("{0} does not exist".format(args.db))
+    conn = connect(args.db)
+    window = (conn, args.since, args.until, args.host)
+    if args.query == "flaps":
+        rows = neighbor_flaps(*window)
+    elif args.query == "lsa":
+        rows = lsa_growth(*window, area=args.area)
+    else:
+        rows = counter_growth(*window, names=args.counter)
+    conn.close()
+
+    print_table(rows, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
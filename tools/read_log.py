@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Read the output of a single command from a compressed log file written
+with log_format "gzip". The sidecar index gives the byte offset and length
+of the gzip member holding each command, so only that member is read and
+decompressed, regardless of the size of the log file. Without a command,
+the commands in the index are listed along with their sizes.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugins/modules"))
+# pylint: disable=import-error,wrong-import-position
+from nots_log import index_path
+
+
+def load_index(path):
+    """
+    Return the sidecar index for a compressed log file as a dictionary.
+    """
+    with open(index_path(path), "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def read_command(path, command):
+    """
+    Return the output of one command from a compressed log file, without
+    the surrounding markers. Raises a ValueError if the command is not in
+    the index.
+    """
+    index = load_index(path)
+    for entry in index["commands"]:
+        if entry["command"] == command:
+            with open(path, "rb") as handle:
+                handle.seek(entry["offset"])
+                member = handle.read(entry["length"])
+            lines = gzip.decompress(member).decode("utf-8").split(index["newline"])
+            # Remove 3 marker lines from each end, plus the final empty string
+            return "\n".join(lines[3:-4])
+
+    raise ValueError("{0} not in index for {1}".format(command, path))
+
+
+def main(argv=None):
+    """
+    Parse the command line and print either one command's output or a
+    summary of all commands in the log file.
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="compressed log file, such as csr1.txt.gz")
+    parser.add_argument("command", nargs="?", help="command whose output to print")
+    args = parser.parse_args(argv)
+
+    if args.command:
+        print(read_command(args.path, args.command))
+        return 0
+
+    for entry in load_index(args.path)["commands"]:
+        print(
+            "{0:>10} {1:>8} {2:>8}  {3}".format(
+                entry["offset"], entry["length"], entry["size"], entry["command"]
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
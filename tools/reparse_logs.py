@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+"""
+Author: Nick Russo <njrusmc@gmail.com>
+
+Offline batch re-parse of archived playbook logs. Every log file under a
+directory (such as "logs/" or "logs/nots_<DTG>/") is split into commands
+using the "!!! Start command:" and "!!! End command:" markers written by
+templates/log.j2. Each command is routed to the same parser used by the
+playbook for that host's platform, and the structured data for each host
+is written as JSON, mirroring the log directory layout. Files are spread
+across a process pool so large archives are parsed using every core,
+without logging into any network devices.
+"""
+
+import argparse
+import concurrent.futures
+import gzip
+import json
+import os
+import sys
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugins/filter"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "../plugins/plugin_utils"))
+# pylint: disable=import-error,wrong-import-position
+from filter import FilterModule
+from nots_dispatch import ROUTES, dispatch
+
+START = "!!! Start command: "
+END = "!!! End command: "
+
+# Vault-encrypted values in group_vars are not needed and are ignored
+yaml.SafeLoader.add_constructor("!vault", lambda loader, node: None)
+
+
+def load_host_vars(inventory, group_vars):
+    """
+    Return a dictionary mapping each host in the YAML inventory to its
+    variables. Like Ansible, a key defined in a child group's variables
+    replaces one from a parent group, and host variables replace both.
+    """
+    host_vars = {}
+
+    def walk(name, group, inherited):
+        merged = dict(inherited)
+        path = os.path.join(group_vars, name + ".yml")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                merged.update(yaml.safe_load(handle) or {})
+        for host, values in ((group or {}).get("hosts") or {}).items():
+            host_vars[host] = dict(merged, **(values or {}))
+        for child, child_group in ((group or {}).get("children") or {}).items():
+            walk(child, child_group, merged)
+
+    with open(inventory, "r", encoding="utf-8") as handle:
+        for name, group in yaml.safe_load(handle).items():
+            walk(name, group, {})
+    return host_vars
+
+
+def load_platforms(inventory, group_vars):
+    """
+    Return a dictionary mapping each host in the YAML inventory to its
+    ansible_network_os.
+    """
+    return {
+        host: values.get("ansible_network_os")
+        for host, values in load_host_vars(inventory, group_vars).items()
+    }
+
+
+def split_commands(path):
+    """
+    Generator which reads a log file line by line and yields a
+    (command, output) tuple for each command between the start and end
+    markers. The "!!!" border lines around each marker are discarded.
+    Compressed logs (ending in ".gz") are decompressed as they are read.
+    """
+    command = None
+    lines = []
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.rstrip("\r\n")
+            if line.startswith(START):
+                command = line[len(START) :].strip()
+                lines = []
+            elif line.startswith(END) and command:
+                # Drop the "!!!" border line written before the end marker
+                yield command, "\n".join(lines[:-1] if lines[-1:] == ["!!!"] else lines)
+                command = None
+            elif command is not None:
+                if lines or line != "!!!":
+                    lines.append(line)
+
+
+def parse_outputs(outputs, platform, traffic_engine="regex"):
+    """
+    Parse every routed command from an iterable of (command, output)
+    tuples, returning a dictionary of facts keyed by fact name. Commands
+    are routed by the same dispatch used by the playbook. Failures are
+    recorded by command in an "errors" key rather than stopping the batch.
+    """
+    # pylint: disable=protected-access
+    facts = {"platform": platform, "errors": {}}
+    for command, output in outputs:
+        # One command at a time, so each failure is recorded by command
+        jobs = dispatch(platform, [output], [command], traffic_engine)
+        for fact, name, text, kwargs in jobs:
+            try:
+                facts[fact] = FilterModule._parse(name, text, kwargs)
+            except (ValueError, KeyError, TypeError) as exc:
+                facts["errors"][command] = repr(exc)
+
+    return facts
+
+
+def count_facts(facts):
+    """
+    Return the number of parsed facts in a dictionary from parse_outputs,
+    counting only the fact names in the ROUTES of its platform, so other
+    keys such as "errors" are never counted.
+    """
+    names = {fact for _, fact, _ in ROUTES.get(facts.get("platform"), [])}
+    return len(names.intersection(facts))
+
+
+def parse_log(path, platform, traffic_engine="regex"):
+    """
+    Parse every routed command in one log file, returning a dictionary of
+    facts keyed by fact name as described in parse_outputs.
+    """
+    return parse_outputs(split_commands(path), platform, traffic_engine)
+
+
+def reparse_file(job):
+    """
+    Process pool worker which parses one log file and writes the facts to
+    a JSON file. The job is a tuple of (log path, output path, platform,
+    traffic engine). Returns a tuple of (log path, facts parsed, errors).
+    """
+    path, out_path, platform, traffic_engine = job
+    facts = parse_log(path, platform, traffic_engine)
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as handle:
+        json.dump(facts, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    return path, count_facts(facts), len(facts["errors"])
+
+
+def find_jobs(log_dir, out_dir, platforms, traffic_engine):
+    """
+    Walk the log directory and return a list of jobs for each log file,
+    plain text or compressed, whose host (the file name) has a supported platform, along with a list
+    of skipped files. Output paths mirror the log directory structure.
+    """
+    jobs = []
+    skipped = []
+    for root, _, files in os.walk(log_dir):
+        for name in sorted(files):
+            host, ext = os.path.splitext(
+                name[: -len(".gz")] if name.endswith(".gz") else name
+            )
+            path = os.path.join(root, name)
+            if ext != ".txt":
+                continue
+            if platforms.get(host) not in ROUTES:
+                skipped.append(path)
+                continue
+            rel_dir = os.path.relpath(root, log_dir)
+            out_path = os.path.normpath(os.path.join(out_dir, rel_dir, host + ".json"))
+            jobs.append((path, out_path, platforms[host], traffic_engine))
+
+    return jobs, skipped
+
+
+def main(argv=None):
+    """
+    Parse the command line, discover the log files, then parse them in a
+    process pool. Returns a non-zero exit code if any command failed to
+    parse or any log file belonged to an unknown host.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[2])
+    parser.add_argument("log_dir", help="directory of log files, such as logs/")
+    parser.add_argument("--output", default="logs/json", help="JSON output directory")
+    parser.add_argument("--inventory", default="hosts.yml")
+    parser.add_argument("--group-vars", default="group_vars")
+    parser.add_argument(
+        "--platform",
+        action="append",
+        default=[],
+        metavar="HOST=OS",
+        help="set or override the platform for a host (repeatable)",
+    )
+    parser.add_argument("--traffic-engine", choices=["regex", "stream"], default="regex")
+    parser.add_argument("--workers", type=int, help="processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    platforms = {}
+    if os.path.exists(args.inventory):
+        platforms = load_platforms(args.inventory, args.group_vars)
+    platforms.update(item.split("=", 1) for item in args.platform)
+
+    jobs, skipped = find_jobs(args.log_dir, args.output, platforms, args.traffic_engine)
+    workers = args.workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * workers))
+    failures = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, parsed, errors in pool.map(reparse_file, jobs, chunksize=chunksize):
+            print("{0}: parsed {1} commands, {2} errors".format(path, parsed, errors))
+            failures += errors
+
+    for path in skipped:
+        print("{0}: skipped, unknown platform for host".format(path))
+    print("parsed {0} log files into {1}".format(len(jobs), args.output))
+    return 1 if failures or skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())